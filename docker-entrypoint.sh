@@ -9,6 +9,11 @@ set -e
 echo "[entrypoint] Running database migrations..."
 python manage.py migrate --noinput
 
+# The slideshow feed and cleanup only read the Image table. Installs that
+# predate it have files in media/ but no rows, so index them once.
+echo "[entrypoint] Indexing existing media (if the image index is empty)..."
+python manage.py rebuild_image_index --if-empty
+
 echo "[entrypoint] Creating default admin user (if not exists)..."
 python manage.py shell -c "
 from django.contrib.auth.models import User
@@ -5,9 +5,9 @@ import logging
 from django.contrib import admin, messages
 from django.http import HttpRequest
 
-from .models import HttpFetcherSourceConfig, TelegramSourceConfig
+from .models import HttpFetcherSourceConfig, IngestJob, TelegramSourceConfig
 from .services.http_fetcher import fetch_image
-from .services.pipeline import generate_preview, save_image
+from .services.pipeline import ingest_image
 
 logger = logging.getLogger(__name__)
 
@@ -15,9 +15,11 @@ logger = logging.getLogger(__name__)
 @admin.register(TelegramSourceConfig)
 class TelegramSourceConfigAdmin(admin.ModelAdmin):
     list_display = ("chat_id", "webhook_url", "enabled")
+    readonly_fields = ("update_offset",)
     fieldsets = (
         ("Bot credentials", {"fields": ("bot_token", "chat_id")}),
         ("Webhook", {"fields": ("webhook_url",)}),
+        ("Polling", {"fields": ("update_offset",)}),
         ("Status", {"fields": ("enabled",)}),
     )
 
@@ -26,19 +28,24 @@ class TelegramSourceConfigAdmin(admin.ModelAdmin):
 class HttpFetcherSourceConfigAdmin(admin.ModelAdmin):
     list_display = ("name", "url", "fetch_interval", "enabled", "last_fetched_at")
     list_filter = ("fetch_interval", "enabled")
-    readonly_fields = ("last_fetched_at",)
+    readonly_fields = ("last_fetched_at", "etag", "last_modified")
     fieldsets = (
         ("Source", {"fields": ("name", "url")}),
         ("Schedule", {"fields": ("fetch_interval", "enabled")}),
-        ("State", {"fields": ("last_fetched_at",)}),
+        ("State", {"fields": ("last_fetched_at", "etag", "last_modified")}),
     )
 
     def save_model(self, request: HttpRequest, obj: HttpFetcherSourceConfig,
                    form: object, change: bool) -> None:
         """On create or URL change: immediately test-fetch the endpoint."""
+        url_changed = not change or "url" in getattr(form, "changed_data", [])
+        if url_changed:
+            # Validators belong to the old URL; the next fetch must be unconditional.
+            obj.etag = ""
+            obj.last_modified = ""
+
         super().save_model(request, obj, form, change)
 
-        url_changed = not change or "url" in getattr(form, "changed_data", [])
         if not url_changed:
             return
 
@@ -46,14 +53,29 @@ class HttpFetcherSourceConfigAdmin(admin.ModelAdmin):
         logger.info("%s HTTP source '%s' — testing endpoint: %s", action, obj.name, obj.url)
 
         try:
-            data = fetch_image(obj.url)
-            image_path = save_image(data)
-            generate_preview(image_path)
+            with fetch_image(obj.url) as data:
+                image_path = ingest_image(data, source=f"http:{obj.name}")
             msg = (f"Endpoint test succeeded for '{obj.name}': "
-                   f"fetched {len(data) / 1024:.1f} KB → saved {image_path.name}")
+                   f"fetched {data.size / 1024:.1f} KB → saved {image_path.name}")
             logger.info(msg)
             self.message_user(request, msg, messages.SUCCESS)
         except Exception as exc:
             msg = f"Endpoint test failed for '{obj.name}' ({obj.url}): {exc}"
             logger.error(msg, exc_info=True)
             self.message_user(request, msg, messages.ERROR)
+
+
+@admin.register(IngestJob)
+class IngestJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "status", "attempts", "next_attempt_at", "created_at", "file_id",
+                    "media_group_id")
+    list_filter = ("status",)
+    readonly_fields = ("file_id", "file_unique_id", "media_group_id", "status", "attempts",
+                       "next_attempt_at", "last_error", "created_at", "updated_at")
+    ordering = ("-created_at",)
+
+    def has_add_permission(self, request: HttpRequest) -> bool:
+        return False
+
+    def has_change_permission(self, request: HttpRequest, obj: object = None) -> bool:
+        return False
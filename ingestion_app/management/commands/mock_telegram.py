@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import io
+import json
+import logging
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+_IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
+
+# Longest getUpdates wait the mock honours, so the server shuts down promptly
+MAX_POLL_SECONDS = 60
+
+
+def _generated_image() -> bytes:
+    """A 1600x1000 JPEG gradient in a random colour."""
+    r, g, b = (random.randrange(256) for _ in range(3))
+    img = Image.linear_gradient("L").resize((1600, 1000)).convert("RGB")
+    img = Image.blend(img, Image.new("RGB", img.size, (r, g, b)), 0.6)
+    buf = io.BytesIO()
+    img.save(buf, "JPEG", quality=85)
+    return buf.getvalue()
+
+
+class MockTelegram:
+    """In-memory stand-in for the Bot API calls the ingestion app makes.
+
+    Photo messages added with add_photos() are returned by getUpdates until
+    a later offset confirms them, like the real API; their files are served
+    under /file/bot<token>/<file_path>.
+    """
+
+    def __init__(self, chat_id: str) -> None:
+        self.chat_id = chat_id
+        self.webhook_url = ""
+        self._cond = threading.Condition()
+        self._updates: list[dict[str, Any]] = []
+        self._files: dict[str, bytes] = {}
+        self._next_update_id = random.randrange(100_000, 900_000)
+        self._next_message_id = 1
+        self._next_group_id = 1
+        # Distinct file_unique_ids per run, so photos from an earlier run are not reposts
+        self._run = f"{random.getrandbits(32):08x}"
+
+    def add_photos(self, images: list[bytes]) -> list[int]:
+        """Queue one message per image, as an album when there are several."""
+        with self._cond:
+            group = ""
+            if len(images) > 1:
+                group = f"mock-album-{self._run}-{self._next_group_id}"
+                self._next_group_id += 1
+            ids: list[int] = []
+            for data in images:
+                file_id = f"mock-{self._run}-{self._next_message_id}"
+                self._files[file_id] = data
+                message: dict[str, Any] = {
+                    "message_id": self._next_message_id,
+                    "date": int(time.time()),
+                    "chat": {"id": int(self.chat_id), "type": "channel"},
+                    "photo": [{
+                        "file_id": file_id,
+                        "file_unique_id": f"unique-{file_id}",
+                        "file_size": len(data),
+                        "width": 0,
+                        "height": 0,
+                    }],
+                }
+                if group:
+                    message["media_group_id"] = group
+                self._updates.append({"update_id": self._next_update_id, "channel_post": message})
+                ids.append(self._next_update_id)
+                self._next_update_id += 1
+                self._next_message_id += 1
+            self._cond.notify_all()
+            return ids
+
+    def get_updates(self, offset: int, timeout: float) -> list[dict[str, Any]]:
+        deadline = time.monotonic() + min(timeout, MAX_POLL_SECONDS)
+        with self._cond:
+            # An offset confirms, and forgets, every earlier update
+            self._updates = [u for u in self._updates if u["update_id"] >= offset]
+            while not self._updates and self._cond.wait(max(deadline - time.monotonic(), 0)):
+                pass
+            return list(self._updates)
+
+    def file_size(self, file_id: str) -> int | None:
+        data = self._files.get(file_id)
+        return None if data is None else len(data)
+
+    def file(self, file_id: str) -> bytes | None:
+        return self._files.get(file_id)
+
+
+def _handler(mock: MockTelegram) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, fmt: str, *args: Any) -> None:
+            logger.debug("mock_telegram: " + fmt, *args)
+
+        def _send(self, status: int, body: bytes, content_type: str) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _json(self, payload: dict[str, Any], status: int = 200) -> None:
+            self._send(status, json.dumps(payload).encode(), "application/json")
+
+        def _params(self) -> dict[str, str]:
+            url = urlsplit(self.path)
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length) if length else b""
+            if body and self.headers.get("Content-Type", "").startswith("application/json"):
+                params.update(json.loads(body))
+            elif body:
+                params.update({k: v[-1] for k, v in parse_qs(body.decode()).items()})
+            return params
+
+        def _route(self) -> None:
+            path = urlsplit(self.path).path
+            if path == "/mock/photos" and self.command == "POST":
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                count = int(parse_qs(urlsplit(self.path).query).get("count", ["1"])[0])
+                images = [body] if body else [_generated_image() for _ in range(count)]
+                self._json({"ok": True, "result": mock.add_photos(images)})
+                return
+
+            match = re.fullmatch(r"/file/bot[^/]+/photos/(.+)\.jpg", path)
+            if match:
+                data = mock.file(match.group(1))
+                if data is None:
+                    self._json({"ok": False, "error_code": 404}, 404)
+                else:
+                    self._send(200, data, "application/octet-stream")
+                return
+
+            match = re.fullmatch(r"/bot[^/]+/(\w+)", path)
+            method = match.group(1) if match else ""
+            params = self._params()
+            if method == "getUpdates":
+                if mock.webhook_url:
+                    self._json({"ok": False, "error_code": 409, "description":
+                                "Conflict: can't use getUpdates method while webhook is active"},
+                               409)
+                    return
+                updates = mock.get_updates(int(params.get("offset", 0)),
+                                           float(params.get("timeout", 0)))
+                self._json({"ok": True, "result": updates})
+            elif method == "getFile":
+                file_id = params.get("file_id", "")
+                size = mock.file_size(file_id)
+                if size is None:
+                    self._json({"ok": False, "error_code": 400,
+                                "description": "Bad Request: invalid file_id"}, 400)
+                else:
+                    self._json({"ok": True, "result": {
+                        "file_id": file_id, "file_unique_id": f"unique-{file_id}",
+                        "file_size": size, "file_path": f"photos/{file_id}.jpg"}})
+            elif method == "setWebhook":
+                mock.webhook_url = params.get("url", "")
+                self._json({"ok": True, "result": True})
+            elif method == "deleteWebhook":
+                mock.webhook_url = ""
+                self._json({"ok": True, "result": True})
+            else:
+                self._json({"ok": False, "error_code": 404, "description": "Not Found"}, 404)
+
+        do_GET = do_POST = _route
+
+    return Handler
+
+
+class Command(BaseCommand):
+    help = ("Serve a local mock of the Telegram Bot API (getUpdates, getFile, file downloads) "
+            "for testing run_telegram_poller and run_ingest_worker offline. Set "
+            "TELEGRAM_API_URL to its address. POST /mock/photos?count=N (optionally with an "
+            "image as the body) posts a photo or an album to the chat.")
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--port", type=int, default=8081, help="Port to listen on.")
+        parser.add_argument("--host", default="127.0.0.1", help="Address to listen on.")
+        parser.add_argument(
+            "--chat-id", default="-1000000000001",
+            help="Chat id the mock posts to; must match TelegramSourceConfig.chat_id.",
+        )
+        parser.add_argument(
+            "--images",
+            help="Directory of images to post, in name order. Generated images are "
+                 "posted when omitted.",
+        )
+        parser.add_argument(
+            "--interval", type=float, default=0.0,
+            help="Post a photo (or album) every this many seconds; 0 posts only on request.",
+        )
+        parser.add_argument(
+            "--album-size", type=int, default=1,
+            help="Photos per automatic post; more than one makes an album.",
+        )
+
+    def handle(self, *args: object, **options: object) -> None:
+        images: list[bytes] = []
+        if options["images"]:
+            folder = Path(str(options["images"]))
+            if not folder.is_dir():
+                raise CommandError(f"Not a directory: {folder}")
+            images = [p.read_bytes() for p in sorted(folder.iterdir())
+                      if p.suffix.lower() in _IMAGE_SUFFIXES]
+            if not images:
+                raise CommandError(f"No images found in {folder}")
+
+        mock = MockTelegram(str(options["chat_id"]))
+        server = ThreadingHTTPServer((str(options["host"]), int(options["port"])),
+                                     _handler(mock))
+        server.daemon_threads = True
+
+        interval = float(options["interval"])
+        album_size = max(1, int(options["album_size"]))
+        if interval > 0:
+            def _post_periodically() -> None:
+                n = 0
+                while True:
+                    time.sleep(interval)
+                    if images:
+                        batch = [images[(n + i) % len(images)] for i in range(album_size)]
+                    else:
+                        batch = [_generated_image() for _ in range(album_size)]
+                    n += album_size
+                    mock.add_photos(batch)
+
+            threading.Thread(target=_post_periodically, daemon=True).start()
+
+        self.stdout.write(f"Mock Telegram API on http://{options['host']}:{options['port']} "
+                          f"(chat_id={mock.chat_id})")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
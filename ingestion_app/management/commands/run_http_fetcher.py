@@ -1,55 +1,81 @@
 from __future__ import annotations
 
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from django.core.management.base import BaseCommand
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import connection
 from django.utils import timezone
 
 from ingestion_app.models import HttpFetcherSourceConfig
-from ingestion_app.services.http_fetcher import fetch_image, is_due
-from ingestion_app.services.pipeline import generate_preview, save_image
+from ingestion_app.services.http_fetcher import FetchResult, build_session, fetch_source, is_due
 
 logger = logging.getLogger(__name__)
 
 
+def _fetch(source: HttpFetcherSourceConfig, session: requests.Session) -> FetchResult:
+    try:
+        return fetch_source(source, session)
+    finally:
+        # Worker threads each open their own DB connection; release it.
+        connection.close()
+
+
 class Command(BaseCommand):
     help = "Fetch images from all enabled HTTP sources that are due for a refresh."
 
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--concurrency", type=int, default=settings.HTTP_FETCHER_CONCURRENCY,
+            help="Maximum number of sources fetched at the same time.",
+        )
+
     def handle(self, *args: object, **options: object) -> None:
         started_at = timezone.now()
-        logger.info("run_http_fetcher started at %s", started_at.isoformat())
+        concurrency = max(1, int(options["concurrency"]))
+        logger.info("run_http_fetcher started at %s (concurrency=%d)",
+                    started_at.isoformat(), concurrency)
 
-        sources = HttpFetcherSourceConfig.objects.filter(enabled=True)
-        total = sources.count()
-        logger.info("run_http_fetcher: %d enabled source(s) found", total)
-
-        fetched = 0
-        skipped = 0
-        failed = 0
+        sources = list(HttpFetcherSourceConfig.objects.filter(enabled=True))
+        logger.info("run_http_fetcher: %d enabled source(s) found", len(sources))
 
+        due: list[HttpFetcherSourceConfig] = []
         for source in sources:
-            if not is_due(source):
+            if is_due(source):
+                logger.info("[%s] due — fetching %s", source.name, source.url)
+                due.append(source)
+            else:
                 logger.info("[%s] not due yet (interval=%s, last_fetched=%s), skipping",
                             source.name, source.fetch_interval, source.last_fetched_at)
-                skipped += 1
-                continue
-
-            logger.info("[%s] due — fetching %s", source.name, source.url)
-            try:
-                data = fetch_image(source.url)
-                image_path = save_image(data)
-                generate_preview(image_path)
-                source.last_fetched_at = timezone.now()
-                source.save(update_fields=["last_fetched_at"])
-                logger.info("[%s] fetch complete: saved %s (%.1f KB)",
-                            source.name, image_path.name, len(data) / 1024)
-                fetched += 1
-            except Exception as exc:
-                logger.error("[%s] fetch failed: %s", source.name, exc, exc_info=True)
-                failed += 1
+
+        fetched = 0
+        unchanged = 0
+        failed = 0
+
+        # One slow endpoint only occupies its own worker; the pooled session
+        # reuses connections to hosts that serve several sources.
+        with build_session(pool_size=concurrency) as session, \
+                ThreadPoolExecutor(max_workers=concurrency,
+                                   thread_name_prefix="http-fetch") as executor:
+            futures = {executor.submit(_fetch, source, session): source for source in due}
+            for future in as_completed(futures):
+                source = futures[future]
+                try:
+                    result = future.result()
+                except Exception as exc:
+                    logger.error("[%s] fetch failed: %s", source.name, exc, exc_info=True)
+                    failed += 1
+                    continue
+                if result.not_modified:
+                    unchanged += 1
+                else:
+                    fetched += 1
 
         logger.info(
-            "run_http_fetcher finished: %d fetched, %d skipped, %d failed (took %.1fs)",
-            fetched, skipped, failed,
+            "run_http_fetcher finished: %d fetched, %d unchanged, %d skipped, %d failed "
+            "(took %.1fs)",
+            fetched, unchanged, len(sources) - len(due), failed,
             (timezone.now() - started_at).total_seconds(),
         )
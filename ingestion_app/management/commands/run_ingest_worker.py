@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import connection
+
+from ingestion_app.models import IngestJob
+from ingestion_app.services.ingest_queue import (
+    claim_jobs,
+    group_jobs,
+    process_job,
+    recover_stale_jobs,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _run_job(job: IngestJob) -> bool:
+    try:
+        return process_job(job)
+    finally:
+        # Worker threads each open their own DB connection; release it.
+        connection.close()
+
+
+def _run_group(jobs: list[IngestJob]) -> list[bool]:
+    """Run a single job, or the jobs of an album on up to TELEGRAM_ALBUM_CONCURRENCY threads."""
+    if len(jobs) == 1:
+        return [_run_job(jobs[0])]
+    logger.debug("Dispatching album %s: %d photo(s)", jobs[0].media_group_id, len(jobs))
+    workers = min(len(jobs), settings.TELEGRAM_ALBUM_CONCURRENCY)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="album") as album:
+        return list(album.map(_run_job, jobs))
+
+
+class Command(BaseCommand):
+    help = "Drain the Telegram ingest queue, downloading and processing queued photos."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--concurrency", type=int, default=settings.INGEST_WORKER_CONCURRENCY,
+            help="Maximum number of jobs processed at the same time.",
+        )
+        parser.add_argument(
+            "--poll-interval", type=float, default=2.0,
+            help="Seconds to wait between queue checks when idle.",
+        )
+        parser.add_argument(
+            "--once", action="store_true",
+            help="Exit once no ready jobs remain instead of running forever.",
+        )
+
+    def handle(self, *args: object, **options: object) -> None:
+        concurrency = max(1, int(options["concurrency"]))
+        poll_interval = float(options["poll_interval"])
+        once = bool(options["once"])
+        logger.info("run_ingest_worker started (concurrency=%d)", concurrency)
+
+        recover_stale_jobs()
+        processed = 0
+        failed = 0
+        running: set[Future[list[bool]]] = set()
+
+        with ThreadPoolExecutor(max_workers=concurrency,
+                                thread_name_prefix="ingest") as executor:
+            while True:
+                # An album occupies one slot while its photos download in parallel
+                for group in group_jobs(claim_jobs(concurrency - len(running))):
+                    for job in group:
+                        logger.debug("Dispatching ingest job #%d (attempt %d)",
+                                     job.pk, job.attempts)
+                    running.add(executor.submit(_run_group, group))
+
+                if not running:
+                    if once:
+                        break
+                    time.sleep(poll_interval)
+                    continue
+
+                done, running = wait(running, timeout=poll_interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    for ok in future.result():
+                        if ok:
+                            processed += 1
+                        else:
+                            failed += 1
+
+        logger.info("run_ingest_worker finished: %d processed, %d failed attempt(s)",
+                    processed, failed)
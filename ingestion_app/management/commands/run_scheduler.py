@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import logging
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+from ingestion_app.services.scheduler import RELOAD_SECONDS, Scheduler
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = ("Run HTTP source fetches and media cleanup exactly when they are due, "
+            "as a single long-running process.")
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--concurrency", type=int, default=settings.HTTP_FETCHER_CONCURRENCY,
+            help="Maximum number of fetch/cleanup tasks running at the same time.",
+        )
+        parser.add_argument(
+            "--reload-interval", type=float, default=RELOAD_SECONDS,
+            help="Seconds between re-reads of the source and cleanup configuration.",
+        )
+
+    def handle(self, *args: object, **options: object) -> None:
+        scheduler = Scheduler(
+            concurrency=max(1, int(options["concurrency"])),
+            reload_seconds=float(options["reload_interval"]),
+        )
+
+        def _shutdown(signum: int, frame: object) -> None:
+            logger.info("run_scheduler: received signal %d, shutting down", signum)
+            scheduler.stop()
+
+        signal.signal(signal.SIGTERM, _shutdown)
+        signal.signal(signal.SIGINT, _shutdown)
+
+        logger.info("run_scheduler started")
+        scheduler.run()
+        logger.info("run_scheduler finished")
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import logging
+import signal
+import threading
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from ingestion_app.models import TelegramSourceConfig
+from ingestion_app.services.telegram import delete_webhook, get_updates
+from ingestion_app.services.telegram_updates import process_updates
+
+logger = logging.getLogger(__name__)
+
+# Seconds between config checks while the Telegram source is missing or disabled
+IDLE_SECONDS = 30
+
+# Delay after a failed getUpdates call, doubled per consecutive failure
+RETRY_BASE_SECONDS = 2
+RETRY_MAX_SECONDS = 60
+
+
+class Command(BaseCommand):
+    help = ("Pull Telegram updates with getUpdates long polling and queue their photos, "
+            "for sites that cannot receive the webhook.")
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--timeout", type=int, default=settings.TELEGRAM_POLL_TIMEOUT_SECONDS,
+            help="Seconds each getUpdates call waits for new updates.",
+        )
+        parser.add_argument(
+            "--delete-webhook", action="store_true",
+            help="Remove a webhook registered with Telegram instead of stopping "
+                 "(getUpdates is refused while one is set).",
+        )
+        parser.add_argument(
+            "--once", action="store_true",
+            help="Exit after the first batch instead of running forever.",
+        )
+
+    def handle(self, *args: object, **options: object) -> None:
+        timeout = max(0, int(options["timeout"]))
+        stop = threading.Event()
+        polling = threading.Event()
+
+        def _shutdown(signum: int, frame: object) -> None:
+            logger.info("run_telegram_poller: received signal %d, shutting down", signum)
+            stop.set()
+            if polling.is_set():
+                # Unconfirmed updates are returned again, so a pending poll can be dropped
+                raise SystemExit(0)
+
+        signal.signal(signal.SIGTERM, _shutdown)
+        signal.signal(signal.SIGINT, _shutdown)
+
+        logger.info("run_telegram_poller started (timeout=%ds)", timeout)
+        offset: int | None = None
+        failures = 0
+        while not stop.is_set():
+            config = TelegramSourceConfig.load()
+            if config is None or not config.enabled:
+                logger.debug("Telegram source is not configured or disabled, waiting")
+                if options["once"]:
+                    break
+                stop.wait(IDLE_SECONDS)
+                continue
+            if offset is None:
+                # Read from the table: the cached config does not follow offset updates
+                offset = TelegramSourceConfig.objects.values_list(
+                    "update_offset", flat=True).get(pk=config.pk)
+
+            try:
+                polling.set()
+                try:
+                    updates = get_updates(config.bot_token, offset, timeout)
+                finally:
+                    polling.clear()
+            except requests.HTTPError as exc:
+                if exc.response is None or exc.response.status_code != 409:
+                    failures = self._failed(exc, failures, stop)
+                    continue
+                if not options["delete_webhook"]:
+                    raise CommandError("Telegram refuses getUpdates while a webhook is set; "
+                                       "rerun with --delete-webhook to remove it.") from exc
+                delete_webhook(config.bot_token)
+                continue
+            except (requests.RequestException, ValueError, KeyError) as exc:
+                failures = self._failed(exc, failures, stop)
+                continue
+
+            failures = 0
+            if updates:
+                offset = process_updates(updates, config, offset)
+                logger.info("Processed %d Telegram update(s), next offset %d",
+                            len(updates), offset)
+            if options["once"]:
+                break
+
+        logger.info("run_telegram_poller finished")
+
+    @staticmethod
+    def _failed(exc: Exception, failures: int, stop: threading.Event) -> int:
+        failures += 1
+        delay = min(RETRY_BASE_SECONDS * 2 ** (failures - 1), RETRY_MAX_SECONDS)
+        logger.warning("getUpdates failed (%d in a row), retrying in %ds: %s",
+                       failures, delay, exc)
+        stop.wait(delay)
+        return failures
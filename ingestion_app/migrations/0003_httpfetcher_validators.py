@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ingestion_app', '0002_ingestjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='httpfetchersourceconfig',
+            name='etag',
+            field=models.CharField(blank=True, help_text='ETag of the last fetched image, sent back as If-None-Match.', max_length=500),
+        ),
+        migrations.AddField(
+            model_name='httpfetchersourceconfig',
+            name='last_modified',
+            field=models.CharField(blank=True, help_text='Last-Modified of the last fetched image, sent back as If-Modified-Since.', max_length=100),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 08:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ingestion_app', '0003_httpfetcher_validators'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingestjob',
+            name='media_group_id',
+            field=models.CharField(blank=True, help_text='Telegram album the photo belongs to; an album is downloaded concurrently.', max_length=100),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-17 08:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ingestion_app', '0004_ingestjob_media_group'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='telegramsourceconfig',
+            name='update_offset',
+            field=models.BigIntegerField(default=0, help_text='Next getUpdates offset of run_telegram_poller (last update_id + 1).'),
+        ),
+        migrations.AlterField(
+            model_name='telegramsourceconfig',
+            name='webhook_url',
+            field=models.URLField(blank=True, help_text='Public HTTPS URL registered with Telegram as the webhook endpoint. Leave empty when run_telegram_poller pulls updates instead.', max_length=500),
+        ),
+    ]
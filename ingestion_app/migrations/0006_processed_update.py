@@ -0,0 +1,26 @@
+# Generated by Django 4.2.30 on 2026-10-17 08:04
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ingestion_app', '0005_telegram_polling'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProcessedUpdate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=120, unique=True)),
+                ('seen_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Processed Telegram Update',
+                'verbose_name_plural': 'Processed Telegram Updates',
+            },
+        ),
+    ]
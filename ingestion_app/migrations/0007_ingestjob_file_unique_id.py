@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 08:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ingestion_app', '0006_processed_update'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingestjob',
+            name='file_unique_id',
+            field=models.CharField(blank=True, help_text='Telegram file_unique_id; reposts are skipped unless this job failed.', max_length=100),
+        ),
+    ]
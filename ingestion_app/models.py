@@ -1,26 +1,9 @@
 from __future__ import annotations
 
 from django.db import models
+from django.utils import timezone
 
-
-class SingletonModel(models.Model):
-    """Abstract base that enforces a single database row.
-
-    Subclasses may only ever have one record. Attempting to save a second
-    record silently replaces the first. Deletion is blocked.
-    """
-
-    class Meta:
-        abstract = True
-
-    def save(self, *args: object, **kwargs: object) -> None:
-        # Delete every other row before saving so only one row exists.
-        self.__class__.objects.exclude(pk=self.pk).delete()
-        super().save(*args, **kwargs)
-
-    def delete(self, *args: object, **kwargs: object) -> tuple[int, dict[str, int]]:
-        # Prevent deletion of the singleton configuration row.
-        return 0, {}
+from screensaver_app.models import SingletonModel
 
 
 class TelegramSourceConfig(SingletonModel):
@@ -32,13 +15,18 @@ class TelegramSourceConfig(SingletonModel):
         help_text="Only updates from this chat/channel ID will be accepted.",
     )
     webhook_url = models.URLField(
-        max_length=500,
-        help_text="Public HTTPS URL registered with Telegram as the webhook endpoint.",
+        max_length=500, blank=True,
+        help_text="Public HTTPS URL registered with Telegram as the webhook endpoint. "
+                  "Leave empty when run_telegram_poller pulls updates instead.",
     )
     enabled = models.BooleanField(
         default=True,
         help_text="Disable to stop processing Telegram updates without deleting config.",
     )
+    update_offset = models.BigIntegerField(
+        default=0,
+        help_text="Next getUpdates offset of run_telegram_poller (last update_id + 1).",
+    )
 
     class Meta:
         verbose_name = "Telegram Source"
@@ -81,6 +69,16 @@ class HttpFetcherSourceConfig(models.Model):
         blank=True,
         help_text="Timestamp of the last successful fetch. Updated automatically.",
     )
+    etag = models.CharField(
+        max_length=500,
+        blank=True,
+        help_text="ETag of the last fetched image, sent back as If-None-Match.",
+    )
+    last_modified = models.CharField(
+        max_length=100,
+        blank=True,
+        help_text="Last-Modified of the last fetched image, sent back as If-Modified-Since.",
+    )
 
     class Meta:
         verbose_name = "HTTP Fetcher Source"
@@ -88,3 +86,67 @@ class HttpFetcherSourceConfig(models.Model):
 
     def __str__(self) -> str:
         return f"{self.name} ({self.url[:60]})"
+
+
+class ProcessedUpdate(models.Model):
+    """A Telegram update_id or photo file_unique_id that was already handled.
+
+    Written and pruned by services.update_dedup; the key is prefixed with
+    its kind (``update:`` or ``photo:``).
+    """
+
+    key = models.CharField(max_length=120, unique=True)
+    seen_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        verbose_name = "Processed Telegram Update"
+        verbose_name_plural = "Processed Telegram Updates"
+
+    def __str__(self) -> str:
+        return self.key
+
+
+class IngestJob(models.Model):
+    """A Telegram photo queued for download and processing.
+
+    Rows are written by the webhook and drained by the ``run_ingest_worker``
+    command. Successful jobs are deleted; failed jobs are retried with
+    exponential backoff and kept with status ``failed`` once retries run out.
+    """
+
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    file_id = models.CharField(max_length=300, help_text="Telegram file_id of the photo.")
+    media_group_id = models.CharField(
+        max_length=100, blank=True,
+        help_text="Telegram album the photo belongs to; an album is downloaded concurrently.",
+    )
+    file_unique_id = models.CharField(
+        max_length=100, blank=True,
+        help_text="Telegram file_unique_id; reposts are skipped unless this job failed.",
+    )
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now,
+        help_text="The job is not picked up by the worker before this time.",
+    )
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["created_at"]
+        indexes = [models.Index(fields=["status", "next_attempt_at"])]
+        verbose_name = "Ingest Job"
+        verbose_name_plural = "Ingest Jobs"
+
+    def __str__(self) -> str:
+        return f"IngestJob #{self.pk} ({self.status}, file_id={self.file_id[:24]})"
@@ -0,0 +1,166 @@
+"""Bounded streaming downloads for the Telegram and HTTP sources.
+
+Response bodies are read in chunks into a Download: kept in memory up to
+DOWNLOAD_SPOOL_MEMORY_BYTES, then rolled over to a temporary file, so peak
+memory per ingest is bounded whatever a source sends. A body is abandoned
+as soon as its Content-Length or the bytes read exceed DOWNLOAD_MAX_BYTES,
+or its first bytes are not a known image signature.
+"""
+from __future__ import annotations
+
+import hashlib
+import io
+import logging
+import os
+import tempfile
+from types import TracebackType
+
+import requests
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+# Leading bytes needed to recognise every signature below
+SNIFF_BYTES = 12
+
+# ISO-BMFF brands of the AVIF/HEIF images Pillow can open
+_FTYP_BRANDS = {b"avif", b"avis", b"heic", b"heix", b"mif1", b"msf1"}
+
+
+class DownloadTooLarge(ValueError):
+    """The body is larger than DOWNLOAD_MAX_BYTES."""
+
+
+def sniff_image(head: bytes) -> str | None:
+    """Return the image format *head* starts with, or None if it is not an image."""
+    if head.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    if head[4:8] == b"ftyp" and head[8:12] in _FTYP_BRANDS:
+        return "avif" if head[8:11] == b"avi" else "heif"
+    if head[:4] in (b"II*\x00", b"MM\x00*"):
+        return "tiff"
+    if head[:2] == b"BM":
+        return "bmp"
+    return None
+
+
+class Download:
+    """A downloaded body, spooled to disk past *memory_limit* bytes.
+
+    The SHA-256 of the body is computed while it is written, so duplicate
+    detection does not read it again. Use as a context manager, or call
+    close(), to remove the temporary file.
+    """
+
+    def __init__(self, memory_limit: int, max_bytes: int) -> None:
+        self.memory_limit = memory_limit
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.format: str | None = None
+        self._sha256 = hashlib.sha256()
+        self._buffer: io.BytesIO | None = io.BytesIO()
+        self._path: str | None = None
+        self._file: io.BufferedWriter | None = None
+
+    @property
+    def sha256(self) -> str:
+        return self._sha256.hexdigest()
+
+    def write(self, chunk: bytes) -> None:
+        if self.size + len(chunk) > self.max_bytes:
+            raise DownloadTooLarge(f"body exceeds the {self.max_bytes} byte limit")
+        if self.format is None and self._buffer is not None:
+            head = self._buffer.getvalue()[:SNIFF_BYTES] + chunk[:SNIFF_BYTES]
+            if len(head) >= SNIFF_BYTES:
+                self.format = sniff_image(head)
+                if self.format is None:
+                    raise ValueError(f"body is not a known image format (starts {head[:8]!r})")
+        self.size += len(chunk)
+        self._sha256.update(chunk)
+        if self._buffer is not None and self.size > self.memory_limit:
+            fd, self._path = tempfile.mkstemp(prefix="download-", suffix=".part")
+            self._file = os.fdopen(fd, "wb")
+            self._file.write(self._buffer.getvalue())
+            self._buffer = None
+        if self._file is not None:
+            self._file.write(chunk)
+        else:
+            assert self._buffer is not None
+            self._buffer.write(chunk)
+
+    def finish(self) -> None:
+        """Check a body too short to sniff and flush the spool file."""
+        if self.format is None:
+            head = self._buffer.getvalue() if self._buffer is not None else b""
+            self.format = sniff_image(head)
+            if self.format is None:
+                raise ValueError(f"body is not a known image format ({self.size} bytes)")
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def source(self) -> bytes | str:
+        """Return the body as bytes if it fit in memory, else the spool file's path.
+
+        Either form can be handed to an ImageProcessingPool job (see
+        image_worker.encode_image); a path is not copied between processes.
+        """
+        if self._buffer is not None:
+            return self._buffer.getvalue()
+        assert self._path is not None
+        return self._path
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._path is not None:
+            try:
+                os.unlink(self._path)
+            except OSError:
+                pass
+            self._path = None
+        self._buffer = None
+
+    def __enter__(self) -> Download:
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, exc: BaseException | None,
+                 tb: TracebackType | None) -> None:
+        self.close()
+
+
+def read_body(resp: requests.Response, description: str) -> Download:
+    """Stream the body of *resp* (requested with ``stream=True``) into a Download.
+
+    Raises DownloadTooLarge when Content-Length or the bytes received
+    exceed DOWNLOAD_MAX_BYTES, and ValueError when the body does not start
+    with an image signature; either way the rest of the body is not read.
+    """
+    max_bytes = settings.DOWNLOAD_MAX_BYTES
+    length = resp.headers.get("Content-Length", "")
+    if length.isdigit() and int(length) > max_bytes:
+        raise DownloadTooLarge(
+            f"{description}: Content-Length {length} exceeds the {max_bytes} byte limit")
+
+    download = Download(settings.DOWNLOAD_SPOOL_MEMORY_BYTES, max_bytes)
+    try:
+        for chunk in resp.iter_content(CHUNK_SIZE):
+            download.write(chunk)
+        download.finish()
+    except ValueError as exc:
+        download.close()
+        logger.warning("Download aborted after %d bytes: %s: %s", download.size, description, exc)
+        raise type(exc)(f"{description}: {exc}") from exc
+    except BaseException:
+        download.close()
+        raise
+    return download
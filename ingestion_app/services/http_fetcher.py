@@ -1,12 +1,16 @@
 from __future__ import annotations
 
 import logging
-from datetime import timedelta
+from dataclasses import dataclass
+from datetime import datetime, timedelta
 
 import requests
 from django.utils import timezone
+from requests.adapters import HTTPAdapter
 
 from ingestion_app.models import HttpFetcherSourceConfig
+from ingestion_app.services.download import Download, read_body
+from ingestion_app.services.pipeline import ingest_image
 
 logger = logging.getLogger(__name__)
 
@@ -18,38 +22,127 @@ INTERVAL_SECONDS: dict[str, int] = {
     "monthly": 2_592_000,
 }
 
+FETCH_TIMEOUT_SECONDS = 30
 
-def fetch_image(url: str) -> bytes:
-    """Fetch raw image bytes from *url*.
+
+@dataclass
+class FetchResult:
+    """Outcome of a (possibly conditional) image fetch."""
+
+    data: Download | None
+    etag: str = ""
+    last_modified: str = ""
+
+    @property
+    def not_modified(self) -> bool:
+        return self.data is None
+
+
+def build_session(pool_size: int = 10) -> requests.Session:
+    """Return a Session whose connection pool can serve *pool_size* threads."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def fetch_conditional(url: str, *, session: requests.Session | None = None,
+                      etag: str = "", last_modified: str = "") -> FetchResult:
+    """Fetch *url*, sending If-None-Match / If-Modified-Since when validators are given.
+
+    Returns a FetchResult whose ``data`` is None when the server answered
+    304 Not Modified; otherwise the caller must close ``data``. Validates
+    that a 200 response Content-Type is an image, then streams the body
+    with the size and signature checks of read_body(). Raises ValueError
+    or requests.HTTPError on failure.
+    """
+    headers: dict[str, str] = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+
+    logger.debug("fetch_image: GET %s (conditional=%s)", url, bool(headers))
+    with (session or requests).get(url, headers=headers, timeout=FETCH_TIMEOUT_SECONDS,
+                                   stream=True) as resp:
+        logger.debug("fetch_image: response status=%d Content-Type=%s",
+                     resp.status_code, resp.headers.get("Content-Type", ""))
+
+        if resp.status_code == 304:
+            logger.info("Image at %s not modified since last fetch", url)
+            return FetchResult(data=None, etag=etag, last_modified=last_modified)
+
+        resp.raise_for_status()
+
+        content_type = resp.headers.get("Content-Type", "")
+        if not content_type.startswith("image/"):
+            raise ValueError(
+                f"URL did not return an image (Content-Type: {content_type!r})"
+            )
+
+        data = read_body(resp, url)
+        logger.info("Fetched image from %s (%.1f KB, Content-Type: %s)",
+                    url, data.size / 1024, content_type)
+        return FetchResult(
+            data=data,
+            etag=resp.headers.get("ETag", ""),
+            last_modified=resp.headers.get("Last-Modified", ""),
+        )
+
+
+def fetch_image(url: str) -> Download:
+    """Fetch the image at *url* unconditionally; the caller must close it.
 
     Validates that the response Content-Type is an image.
     Raises ValueError or requests.HTTPError on failure.
     """
-    logger.debug("fetch_image: GET %s", url)
-    resp = requests.get(url, timeout=30)
-    logger.debug("fetch_image: response status=%d Content-Type=%s",
-                 resp.status_code, resp.headers.get("Content-Type", ""))
-    resp.raise_for_status()
-
-    content_type = resp.headers.get("Content-Type", "")
-    if not content_type.startswith("image/"):
-        raise ValueError(
-            f"URL did not return an image (Content-Type: {content_type!r})"
-        )
+    result = fetch_conditional(url)
+    if result.data is None:
+        raise ValueError(f"URL answered 304 Not Modified to an unconditional request: {url}")
+    return result.data
+
+
+def fetch_source(source: HttpFetcherSourceConfig,
+                 session: requests.Session | None = None) -> FetchResult:
+    """Conditionally fetch *source*, save any new image and record the fetch.
+
+    The stored ETag/Last-Modified validators are sent with the request, so an
+    unchanged image costs a 304 instead of a download, decode and re-encode.
+    Either way ``last_fetched_at`` is advanced. Raises on failure.
+    """
+    result = fetch_conditional(source.url, session=session,
+                               etag=source.etag, last_modified=source.last_modified)
+    if result.data is not None:
+        with result.data:
+            image_path = ingest_image(result.data, source=f"http:{source.name}")
+        logger.info("[%s] fetch complete: saved %s (%.1f KB)",
+                    source.name, image_path.name, result.data.size / 1024)
+    else:
+        logger.info("[%s] fetch complete: image unchanged (304)", source.name)
+
+    source.last_fetched_at = timezone.now()
+    source.etag = result.etag
+    source.last_modified = result.last_modified
+    source.save(update_fields=["last_fetched_at", "etag", "last_modified"])
+    return result
 
-    logger.info("Fetched image from %s (%.1f KB, Content-Type: %s)",
-                url, len(resp.content) / 1024, content_type)
-    return resp.content
+
+def next_due(source: HttpFetcherSourceConfig) -> datetime | None:
+    """Return when *source* should next be fetched, or None if it never has been."""
+    if source.last_fetched_at is None:
+        return None
+    interval = INTERVAL_SECONDS.get(source.fetch_interval, INTERVAL_SECONDS["daily"])
+    return source.last_fetched_at + timedelta(seconds=interval)
 
 
 def is_due(source: HttpFetcherSourceConfig) -> bool:
     """Return True if *source* has never been fetched or its interval has elapsed."""
-    if source.last_fetched_at is None:
+    next_fetch = next_due(source)
+    if next_fetch is None:
         logger.debug("is_due: source=%s has never been fetched → due", source.name)
         return True
 
-    interval = INTERVAL_SECONDS.get(source.fetch_interval, INTERVAL_SECONDS["daily"])
-    next_fetch = source.last_fetched_at + timedelta(seconds=interval)
     due = timezone.now() >= next_fetch
     logger.debug("is_due: source=%s interval=%s last_fetched=%s next_fetch=%s due=%s",
                  source.name, source.fetch_interval, source.last_fetched_at, next_fetch, due)
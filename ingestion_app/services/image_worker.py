@@ -0,0 +1,180 @@
+"""Pure-Pillow image jobs run inside ImageProcessingPool worker processes.
+
+Nothing in this module may import Django: pool workers are started with the
+``spawn`` method and never run ``django.setup()``. Jobs take and return only
+plain picklable values; database bookkeeping stays in the parent process.
+"""
+from __future__ import annotations
+
+import io
+from pathlib import Path
+from typing import Any, BinaryIO
+
+from PIL import Image
+
+PREVIEW_MAX_WIDTH = 400
+
+JPEG_QUALITY = 90
+PREVIEW_QUALITY = 85
+
+# Pillow save() arguments for the optional alternate encodings. AVIF speed 8
+# trades a little size for several times faster encoding than the default.
+ALTERNATE_SAVE_OPTIONS: dict[str, tuple[str, dict[str, Any]]] = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "avif": ("AVIF", {"quality": 60, "speed": 8}),
+}
+
+# Maps a JPEG destination to the ``(format, dest)`` alternates written beside it
+Alternates = dict[str, list[tuple[str, str]]]
+
+
+def perceptual_hash(img: Image.Image) -> str:
+    """Return the 64-bit difference hash of *img* as 16 hex digits.
+
+    Robust against recompression and resizing, so re-encoded copies of the
+    same picture end up only a few bits apart.
+    """
+    small = img.convert("L").resize((9, 8), Image.BILINEAR)
+    pixels = list(small.getdata())
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            left = pixels[row * 9 + col]
+            right = pixels[row * 9 + col + 1]
+            value = (value << 1) | (left > right)
+    return f"{value:016x}"
+
+
+def init_worker(max_pixels: int) -> None:
+    """Pool initializer: match Pillow's own decompression-bomb limit to *max_pixels*.
+
+    Only ever run in pool worker processes. Inline jobs leave the global
+    untouched and rely on the explicit check in _open_checked().
+    """
+    Image.MAX_IMAGE_PIXELS = max_pixels
+
+
+def preview_size(width: int, height: int) -> tuple[int, int]:
+    ratio = PREVIEW_MAX_WIDTH / width
+    return PREVIEW_MAX_WIDTH, max(1, int(height * ratio))
+
+
+def _open_checked(fp: str | BinaryIO, max_pixels: int) -> Image.Image:
+    """Open *fp* and refuse images above *max_pixels* before anything is decoded."""
+    img = Image.open(fp)
+    if img.width * img.height > max_pixels:
+        img.close()
+        raise ValueError(
+            f"Image is {img.width}x{img.height} ({img.width * img.height} pixels), "
+            f"above the {max_pixels} pixel limit"
+        )
+    return img
+
+
+def _save(img: Image.Image, dest: str, quality: int, alternates: Alternates) -> None:
+    """Write *img* as JPEG to *dest*, then any alternates listed for *dest*."""
+    img.save(dest, "JPEG", quality=quality, optimize=True)
+    for fmt, alt_dest in alternates.get(dest, ()):
+        pil_format, options = ALTERNATE_SAVE_OPTIONS[fmt]
+        img.save(alt_dest, pil_format, **options)
+
+
+def _write_preview(img: Image.Image, dest: str, alternates: Alternates) -> tuple[int, int]:
+    # reducing_gap lets Pillow shrink by an integer factor with the cheap
+    # reduce() box filter first and only run LANCZOS on the last step.
+    new_size = preview_size(img.width, img.height)
+    thumb = img.resize(new_size, Image.LANCZOS, reducing_gap=2.0)
+    _save(thumb, dest, PREVIEW_QUALITY, alternates)
+    return new_size
+
+
+def _write_renditions(img: Image.Image, renditions: list[tuple[int, str]],
+                      alternates: Alternates) -> tuple[Image.Image, list[int]]:
+    """Write each ``(width, dest)`` rendition narrower than *img*, widest first.
+
+    Every step resizes the previous (already smaller) rendition, so the
+    ladder costs little more than its widest rung. Returns the smallest image
+    produced (for deriving the preview) and the widths written.
+    """
+    current = img
+    written: list[int] = []
+    for width, dest in sorted(renditions, reverse=True):
+        if width >= current.width:
+            continue
+        height = max(1, round(current.height * width / current.width))
+        current = current.resize((width, height), Image.LANCZOS, reducing_gap=2.0)
+        _save(current, dest, JPEG_QUALITY, alternates)
+        written.append(width)
+    return current, sorted(written)
+
+
+def encode_image(data: bytes | str, dest: str, preview_dest: str | None, max_pixels: int,
+                 near_candidates: list[tuple[str, str]], max_distance: int,
+                 renditions: list[tuple[int, str]] | None = None,
+                 alternates: Alternates | None = None) -> dict[str, Any]:
+    """Decode *data* once, write the full JPEG to *dest* and optionally a preview.
+
+    *data* is the encoded image, or the path of a file holding it (a
+    download spooled to disk), which Pillow then reads directly.
+
+    *renditions* lists ``(width, dest)`` pairs of downscaled copies to write;
+    widths not smaller than the image are skipped. The widths actually
+    written are returned as ``renditions``. *alternates* adds WebP/AVIF
+    encodings beside any of the JPEG outputs (see _save).
+
+    If the perceptual hash is within *max_distance* bits of one of
+    *near_candidates* (``(filename, phash)`` pairs), nothing is written and
+    that filename is returned as ``near_duplicate``.
+    """
+    fp = io.BytesIO(data) if isinstance(data, bytes) else data
+    with _open_checked(fp, max_pixels) as img:
+        result: dict[str, Any] = {
+            "format": img.format or "unknown",
+            "width": img.width,
+            "height": img.height,
+            "near_duplicate": None,
+            "preview_width": 0,
+            "preview_height": 0,
+            "renditions": [],
+        }
+        rgb = img.convert("RGB")
+
+    result["phash"] = perceptual_hash(rgb)
+    target = int(result["phash"], 16)
+    for filename, other in near_candidates:
+        if (int(other, 16) ^ target).bit_count() <= max_distance:
+            result["near_duplicate"] = filename
+            return result
+
+    alternates = alternates or {}
+    _save(rgb, dest, JPEG_QUALITY, alternates)
+    smallest, result["renditions"] = _write_renditions(rgb, renditions or [], alternates)
+    if preview_dest is not None:
+        result["preview_width"], result["preview_height"] = _write_preview(
+            smallest, preview_dest, alternates)
+    return result
+
+
+def encode_preview(source: str, dest: str, max_pixels: int,
+                   alternates: Alternates | None = None) -> dict[str, Any]:
+    """Write a preview of the image file *source* to *dest*.
+
+    For JPEG sources ``draft()`` makes the decoder scale down by 1/2, 1/4 or
+    1/8 in the DCT domain, so the full-resolution pixels are never
+    materialised.
+    """
+    with _open_checked(Path(source), max_pixels) as img:
+        original = (img.width, img.height)
+        img.draft("RGB", preview_size(*original))
+        rgb = img.convert("RGB")
+        decoded = (rgb.width, rgb.height)
+
+    width, height = _write_preview(rgb, dest, alternates or {})
+    return {
+        "width": original[0],
+        "height": original[1],
+        "decoded_width": decoded[0],
+        "decoded_height": decoded[1],
+        "preview_width": width,
+        "preview_height": height,
+    }
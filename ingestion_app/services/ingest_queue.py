@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta
+
+from django.db.models import F, Q
+from django.utils import timezone
+
+from ingestion_app.models import IngestJob, TelegramSourceConfig
+from ingestion_app.services.pipeline import ingest_image
+from ingestion_app.services.telegram import download_image
+from ingestion_app.services.update_dedup import get_update_dedup, photo_key
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 6
+BACKOFF_BASE_SECONDS = 10
+BACKOFF_MAX_SECONDS = 3_600
+
+# A job left in "running" longer than this is assumed to belong to a dead worker
+STALE_JOB_SECONDS = 600
+
+# Telegram delivers each photo of an album as its own update. Album jobs wait
+# this long before they are ready, so the worker finds the whole album at once.
+ALBUM_SETTLE_SECONDS = 2
+
+
+def enqueue_telegram_file(file_id: str, media_group_id: str = "",
+                          file_unique_id: str = "") -> IngestJob:
+    """Queue *file_id* for download by the ingest worker and return the job."""
+    job = IngestJob.objects.create(
+        file_id=file_id,
+        media_group_id=media_group_id,
+        file_unique_id=file_unique_id,
+        next_attempt_at=timezone.now() + timedelta(
+            seconds=ALBUM_SETTLE_SECONDS if media_group_id else 0),
+    )
+    logger.debug("Queued ingest job #%d for file_id=%s media_group_id=%s",
+                 job.pk, file_id, media_group_id or "-")
+    return job
+
+
+def backoff_seconds(attempts: int) -> int:
+    """Return the delay before retry number *attempts* (1-based), capped."""
+    return min(BACKOFF_BASE_SECONDS * 2 ** max(attempts - 1, 0), BACKOFF_MAX_SECONDS)
+
+
+def _claim(pk: int, now: datetime) -> bool:
+    return bool(IngestJob.objects.filter(pk=pk, status=IngestJob.STATUS_PENDING).update(
+        status=IngestJob.STATUS_RUNNING,
+        attempts=F("attempts") + 1,
+        updated_at=now,
+    ))
+
+
+def claim_jobs(limit: int) -> list[IngestJob]:
+    """Atomically move up to *limit* ready jobs from pending to running.
+
+    Each row is claimed with a conditional UPDATE, so two workers racing for
+    the same job can never both win it. Claiming a job of an album also
+    claims its siblings that have not failed before, beyond *limit*, so the
+    album can be downloaded as one unit (see group_jobs).
+    """
+    if limit <= 0:
+        return []
+
+    now = timezone.now()
+    candidates = list(
+        IngestJob.objects
+        .filter(status=IngestJob.STATUS_PENDING, next_attempt_at__lte=now)
+        .order_by("next_attempt_at")
+        .values_list("pk", flat=True)[:limit]
+    )
+
+    claimed = [pk for pk in candidates if _claim(pk, now)]
+    groups = set(
+        IngestJob.objects.filter(pk__in=claimed).exclude(media_group_id="")
+        .values_list("media_group_id", flat=True)
+    )
+    if groups:
+        siblings = (
+            IngestJob.objects
+            .filter(Q(next_attempt_at__lte=now) | Q(attempts=0),
+                    status=IngestJob.STATUS_PENDING, media_group_id__in=groups)
+            .values_list("pk", flat=True)
+        )
+        claimed.extend(pk for pk in siblings if _claim(pk, now))
+
+    return list(IngestJob.objects.filter(pk__in=claimed))
+
+
+def group_jobs(jobs: list[IngestJob]) -> list[list[IngestJob]]:
+    """Split claimed *jobs* into albums (by media_group_id) and single photos."""
+    albums: dict[str, list[IngestJob]] = {}
+    groups: list[list[IngestJob]] = []
+    for job in jobs:
+        if not job.media_group_id:
+            groups.append([job])
+        elif job.media_group_id in albums:
+            albums[job.media_group_id].append(job)
+        else:
+            albums[job.media_group_id] = [job]
+            groups.append(albums[job.media_group_id])
+    return groups
+
+
+def recover_stale_jobs() -> int:
+    """Return jobs stuck in "running" (crashed worker) to the pending state."""
+    cutoff = timezone.now() - timedelta(seconds=STALE_JOB_SECONDS)
+    count = IngestJob.objects.filter(
+        status=IngestJob.STATUS_RUNNING, updated_at__lt=cutoff,
+    ).update(status=IngestJob.STATUS_PENDING, next_attempt_at=timezone.now())
+    if count:
+        logger.warning("Recovered %d stale ingest job(s) from a previous worker", count)
+    return count
+
+
+def mark_failed(job: IngestJob, error: str) -> None:
+    """Record a failed attempt and schedule a retry, or give up after MAX_ATTEMPTS.
+
+    Giving up releases the photo's file_unique_id, so posting it again is
+    not skipped as a duplicate.
+    """
+    job.last_error = error
+    if job.attempts >= MAX_ATTEMPTS:
+        job.status = IngestJob.STATUS_FAILED
+        logger.error("Ingest job #%d gave up after %d attempt(s): %s",
+                     job.pk, job.attempts, error)
+        if job.file_unique_id:
+            get_update_dedup().release(photo_key(job.file_unique_id))
+    else:
+        delay = backoff_seconds(job.attempts)
+        job.status = IngestJob.STATUS_PENDING
+        job.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+        logger.warning("Ingest job #%d attempt %d/%d failed, retrying in %ds: %s",
+                       job.pk, job.attempts, MAX_ATTEMPTS, delay, error)
+    job.save(update_fields=["status", "next_attempt_at", "last_error", "updated_at"])
+
+
+def process_job(job: IngestJob) -> bool:
+    """Download and process the photo referenced by *job*.
+
+    Deletes the job on success. On failure the job is rescheduled via
+    mark_failed(). Returns True when the image was saved.
+    """
+    try:
+        config = TelegramSourceConfig.load()
+        if config is None:
+            raise TelegramSourceConfig.DoesNotExist("TelegramSourceConfig is not configured")
+        with download_image(job.file_id, config.bot_token) as data:
+            image_path = ingest_image(data, source="telegram")
+    except Exception as exc:
+        logger.debug("Ingest job #%d failed", job.pk, exc_info=True)
+        mark_failed(job, str(exc))
+        return False
+
+    logger.info("Telegram image saved successfully: %s (%d bytes, job #%d)",
+                image_path.name, data.size, job.pk)
+    job.delete()
+    return True
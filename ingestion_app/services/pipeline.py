@@ -1,49 +1,220 @@
 from __future__ import annotations
 
+import hashlib
 import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 from pathlib import Path
+from typing import Any, Callable
 
 from django.conf import settings
-from PIL import Image
 
-logger = logging.getLogger(__name__)
+from ingestion_app.services.download import Download
+from ingestion_app.services.image_worker import (
+    Alternates, encode_image, encode_preview, init_worker,
+)
+from screensaver_app.image_index import (
+    alternate_formats,
+    alternate_path,
+    find_duplicate,
+    recent_phashes,
+    register_image,
+    register_preview,
+    rendition_path,
+)
+from screensaver_app.services import cleanup_if_over_limit
 
-PREVIEW_MAX_WIDTH = 400
+logger = logging.getLogger(__name__)
 
 
-def save_image(data: bytes) -> Path:
-    """Decode *data*, convert to JPEG, and write to media/images/.
+class ImageProcessingPool:
+    """Runs Pillow decode/resize/encode jobs in a pool of worker processes.
 
-    Always saves as a real JPEG regardless of the source format (WEBP, PNG,
-    GIF, etc.) so the .jpg extension is accurate and browsers can display it.
-    Returns the Path of the saved file.
+    Keeps CPU-heavy work and its memory spikes out of the calling process
+    (gunicorn workers, the ingest worker, the scheduler). Each worker process
+    is replaced after *max_tasks* jobs so fragmented Pillow buffers are handed
+    back to the OS. With *workers* set to 0 jobs run inline.
     """
-    import io
 
+    def __init__(self, workers: int, max_tasks: int, max_pixels: int) -> None:
+        self.workers = workers
+        self.max_tasks = max_tasks
+        self.max_pixels = max_pixels
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def run(self, fn: Callable[..., dict[str, Any]], *args: Any) -> dict[str, Any]:
+        """Run ``fn(*args)`` in a worker process and return its result."""
+        if self.workers <= 0:
+            return fn(*args)
+
+        with self._lock:
+            if self._executor is None:
+                logger.debug("ImageProcessingPool: starting %d worker(s), %d job(s) each",
+                             self.workers, self.max_tasks)
+                # max_tasks_per_child needs a non-fork start method; spawned
+                # workers import only the Django-free image_worker module.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    max_tasks_per_child=self.max_tasks,
+                    initializer=init_worker,
+                    initargs=(self.max_pixels,),
+                )
+            executor = self._executor
+
+        try:
+            return executor.submit(fn, *args).result()
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); start a fresh pool next time.
+            logger.error("ImageProcessingPool: worker process died, restarting pool")
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            executor.shutdown(wait=False)
+            raise
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+
+_pool: ImageProcessingPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ImageProcessingPool:
+    """Return the process-wide ImageProcessingPool, configured from settings."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ImageProcessingPool(
+                workers=settings.IMAGE_WORKER_PROCESSES,
+                max_tasks=settings.IMAGE_WORKER_MAX_TASKS,
+                max_pixels=settings.IMAGE_MAX_PIXELS,
+            )
+        return _pool
+
+
+def _alternates_for(*dests: Path | None) -> Alternates:
+    """Map each JPEG destination to the WebP/AVIF files to write beside it.
+
+    Only previews and renditions get alternates: displays never fetch the
+    full-size original, and encoding it (AVIF above all) is the slowest step.
+    """
+    media_root = Path(settings.MEDIA_ROOT)
+    alternates: Alternates = {}
+    for dest in dests:
+        if dest is None:
+            continue
+        for fmt in alternate_formats():
+            alt = alternate_path(fmt, dest.relative_to(media_root))
+            alt.parent.mkdir(parents=True, exist_ok=True)
+            alternates.setdefault(str(dest), []).append((fmt, str(alt)))
+    return alternates
+
+
+def _ingest(data: bytes | Download, source: str, with_preview: bool) -> Path:
     images_dir = Path(settings.MEDIA_ROOT) / "images"
     images_dir.mkdir(parents=True, exist_ok=True)
+    previews_dir = Path(settings.MEDIA_ROOT) / "previews"
+    if with_preview:
+        previews_dir.mkdir(parents=True, exist_ok=True)
+
+    if isinstance(data, Download):
+        # Hashed while streaming; a spooled body goes to the worker as a path
+        digest, size, payload = data.sha256, data.size, data.source()
+    else:
+        digest, size, payload = hashlib.sha256(data).hexdigest(), len(data), data
+    duplicate = find_duplicate(digest)
+    if duplicate is not None and (images_dir / duplicate.filename).exists():
+        logger.info("Duplicate image skipped: identical to %s (sha256=%s)",
+                    duplicate.filename, digest[:12])
+        return images_dir / duplicate.filename
 
     filename = datetime.utcnow().strftime("%Y%m%d_%H%M%S_%f") + ".jpg"
     dest = images_dir / filename
+    preview_dest = previews_dir / filename if with_preview else None
+    near_candidates = recent_phashes() if settings.INGEST_PERCEPTUAL_DEDUP else []
+    rendition_dests = [rendition_path(width, filename) for width in settings.IMAGE_RENDITION_WIDTHS]
+    for rendition in rendition_dests:
+        rendition.parent.mkdir(parents=True, exist_ok=True)
+    renditions = [(w, str(r)) for w, r in zip(settings.IMAGE_RENDITION_WIDTHS, rendition_dests)]
+    alternates = _alternates_for(preview_dest, *rendition_dests)
+
+    logger.debug("save_image: decoding %d bytes (source format detection)", size)
+    result = get_pool().run(
+        encode_image, payload, str(dest), str(preview_dest) if preview_dest else None,
+        settings.IMAGE_MAX_PIXELS, near_candidates, settings.INGEST_PERCEPTUAL_MAX_DISTANCE,
+        renditions, alternates,
+    )
+
+    if result["near_duplicate"]:
+        logger.info("Near-duplicate image skipped: looks like %s (phash=%s)",
+                    result["near_duplicate"], result["phash"])
+        return images_dir / result["near_duplicate"]
+
+    register_image(dest, source=source, width=result["width"], height=result["height"],
+                   content_hash=digest, phash=result["phash"], renditions=result["renditions"])
+    logger.info("Image saved: %s | source=%s %dx%d | jpeg=%.1f KB | renditions=%s",
+                filename, result["format"], result["width"], result["height"],
+                dest.stat().st_size / 1024, result["renditions"] or "none")
+
+    if preview_dest is not None:
+        register_preview(preview_dest, width=result["preview_width"],
+                         height=result["preview_height"])
+        logger.info("Preview generated: %s (%dx%d → %dx%d)",
+                    filename, result["width"], result["height"],
+                    result["preview_width"], result["preview_height"])
+
+    cleanup_if_over_limit()
+    return dest
 
-    logger.debug("save_image: decoding %d bytes (source format detection)", len(data))
-    with Image.open(io.BytesIO(data)) as img:
-        source_format = img.format or "unknown"
-        source_size = img.size
-        jpeg_img = img.convert("RGB")
-        jpeg_img.save(dest, "JPEG", quality=90, optimize=True)
 
-    saved_bytes = dest.stat().st_size
-    logger.info("Image saved: %s | source=%s %dx%d | jpeg=%.1f KB",
-                filename, source_format, *source_size, saved_bytes / 1024)
+def save_image(data: bytes | Download, source: str = "") -> Path:
+    """Decode *data*, convert to JPEG, and write to media/images/.
+
+    *data* is raw bytes or a Download from download.read_body(); a body
+    spooled to disk is decoded straight from its temporary file.
+
+    Always saves as a real JPEG regardless of the source format (WEBP, PNG,
+    GIF, etc.) so the .jpg extension is accurate and browsers can display it.
+    The image is recorded in the image index under *source*.
+
+    Bytes identical to an already indexed image are detected by hash before
+    decoding and the existing file is returned instead. With
+    INGEST_PERCEPTUAL_DEDUP enabled, recompressed copies are detected after
+    decoding and skipped the same way. Decoding and encoding run in the
+    ImageProcessingPool. Returns the Path of the saved file.
+    """
+    return _ingest(data, source, with_preview=False)
+
+
+def ingest_image(data: bytes | Download, source: str = "") -> Path:
+    """Save *data* like save_image() and derive its preview from the same decode.
+
+    The preview is resized from the in-memory RGB image instead of reopening
+    and decoding the JPEG that was just written. A duplicate that is missing
+    its preview gets one via generate_preview(). Returns the Path of the
+    full-size image.
+    """
+    dest = _ingest(data, source, with_preview=True)
+    # dest is gone if the size limit is smaller than this image alone
+    if dest.exists() and not (Path(settings.MEDIA_ROOT) / "previews" / dest.name).exists():
+        generate_preview(dest)
     return dest
 
 
 def generate_preview(source: Path) -> Path:
     """Create a resized preview of *source* in media/previews/.
 
-    Skips generation if the preview already exists on disk.
+    Skips generation if the preview already exists on disk. The work runs in
+    the ImageProcessingPool and uses JPEG draft mode (see encode_preview).
     Returns the Path of the preview file.
     """
     previews_dir = Path(settings.MEDIA_ROOT) / "previews"
@@ -55,16 +226,12 @@ def generate_preview(source: Path) -> Path:
         return dest
 
     logger.debug("generate_preview: opening %s", source.name)
-    with Image.open(source) as img:
-        img = img.convert("RGB")
-        original_size = (img.width, img.height)
-        ratio = PREVIEW_MAX_WIDTH / img.width
-        new_size = (PREVIEW_MAX_WIDTH, max(1, int(img.height * ratio)))
-        logger.debug("generate_preview: resizing %s from %dx%d → %dx%d",
-                     source.name, *original_size, *new_size)
-        thumb = img.resize(new_size, Image.LANCZOS)
-        thumb.save(dest, "JPEG", quality=85, optimize=True)
-
-    logger.info("Preview generated: %s (%dx%d → %dx%d)",
-                source.name, *original_size, *new_size)
+    result = get_pool().run(encode_preview, str(source), str(dest), settings.IMAGE_MAX_PIXELS,
+                            _alternates_for(dest))
+    register_preview(dest, width=result["preview_width"], height=result["preview_height"])
+
+    logger.info("Preview generated: %s (%dx%d → %dx%d, decoded at %dx%d)",
+                source.name, result["width"], result["height"],
+                result["preview_width"], result["preview_height"],
+                result["decoded_width"], result["decoded_height"])
     return dest
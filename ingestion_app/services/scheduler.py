@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import heapq
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.db import close_old_connections, connection
+
+from ingestion_app.models import HttpFetcherSourceConfig
+from ingestion_app.services.http_fetcher import build_session, fetch_source, next_due
+from ingestion_app.services.update_dedup import prune_processed_updates
+from screensaver_app.models import CleanupConfig
+from screensaver_app.mosaic import is_stale as mosaic_is_stale, update_mosaic
+from screensaver_app.services import prune_logs, run_cleanup
+
+logger = logging.getLogger(__name__)
+
+# How often the database is re-read so admin changes apply without a restart
+RELOAD_SECONDS = 30
+
+# Delay before a failed fetch is retried (last_fetched_at is not advanced on failure)
+FETCH_RETRY_SECONDS = 300
+
+_CLEANUP_KEY = ("cleanup", 0)
+_MOSAIC_KEY = ("mosaic", 0)
+
+
+class Scheduler:
+    """Resident scheduler for HTTP fetches, media cleanup and mosaic sheets.
+
+    Keeps a min-heap of ``(due_timestamp, key)`` entries, one per enabled
+    HttpFetcherSourceConfig plus one for cleanup, and sleeps until the
+    earliest is due. Due times come from ``last_fetched_at`` + the fetch
+    interval and from ``CleanupConfig.cleanup_interval_seconds``. Entries
+    are never removed from the heap; an entry whose time no longer matches
+    ``self._due`` is stale and skipped when popped. The mosaic sheets are
+    re-rendered after every fetch and cleanup and whenever a reload finds
+    them behind the image index, so no web request has to render them.
+    """
+
+    def __init__(self, concurrency: int, reload_seconds: float = RELOAD_SECONDS) -> None:
+        self.concurrency = concurrency
+        self.reload_seconds = reload_seconds
+        self._heap: list[tuple[float, tuple[str, int]]] = []
+        self._due: dict[tuple[str, int], float] = {}
+        self._running: set[tuple[str, int]] = set()
+        self._retry_at: dict[tuple[str, int], float] = {}
+        self._completed: queue.SimpleQueue[tuple[tuple[str, int], bool]] = queue.SimpleQueue()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._last_cleanup = 0.0
+        self._cleanup_interval = 3600
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+    def _schedule(self, key: tuple[str, int], due: float) -> None:
+        if self._due.get(key) == due:
+            return
+        self._due[key] = due
+        heapq.heappush(self._heap, (due, key))
+
+    def _reload(self) -> None:
+        """Re-read sources and cleanup config, rescheduling anything that changed."""
+        close_old_connections()
+        now = time.time()
+
+        sources = HttpFetcherSourceConfig.objects.filter(enabled=True)
+        live = {("fetch", source.pk) for source in sources}
+        for source in sources:
+            key = ("fetch", source.pk)
+            if key in self._running:
+                continue
+            due_at = next_due(source)
+            due = now if due_at is None else due_at.timestamp()
+            self._schedule(key, max(due, self._retry_at.get(key, 0.0)))
+
+        for key in [k for k in self._due if k[0] == "fetch" and k not in live]:
+            logger.info("Scheduler: source #%d disabled or removed, unscheduling", key[1])
+            del self._due[key]
+            self._retry_at.pop(key, None)
+
+        self._cleanup_interval = CleanupConfig.get().cleanup_interval_seconds
+        if _CLEANUP_KEY not in self._running:
+            self._schedule(_CLEANUP_KEY, self._last_cleanup + self._cleanup_interval)
+
+        # Picks up images from the ingest worker, the poller and the admin
+        if _MOSAIC_KEY not in self._running and mosaic_is_stale():
+            self._schedule(_MOSAIC_KEY, now)
+
+    def _run_task(self, key: tuple[str, int], session: requests.Session) -> None:
+        ok = False
+        try:
+            if key == _CLEANUP_KEY:
+                run_cleanup()
+                prune_logs()
+                prune_processed_updates()
+            elif key == _MOSAIC_KEY:
+                update_mosaic()
+            else:
+                source = HttpFetcherSourceConfig.objects.filter(pk=key[1], enabled=True).first()
+                if source is not None:
+                    logger.info("[%s] due — fetching %s", source.name, source.url)
+                    fetch_source(source, session)
+            ok = True
+        except Exception as exc:
+            logger.error("Scheduler task %s failed: %s", key, exc, exc_info=True)
+        finally:
+            # Worker threads each open their own DB connection; release it.
+            connection.close()
+            self._completed.put((key, ok))
+            self._wake.set()
+
+    def _collect_completed(self) -> None:
+        now = time.time()
+        while True:
+            try:
+                key, ok = self._completed.get_nowait()
+            except queue.Empty:
+                return
+            self._running.discard(key)
+            self._due.pop(key, None)
+            if key == _MOSAIC_KEY:
+                continue  # the next reload reschedules it if still stale
+            if ok and _MOSAIC_KEY not in self._running:
+                # Fetches and cleanups change the previews; re-render right away
+                self._schedule(_MOSAIC_KEY, now)
+            if key == _CLEANUP_KEY:
+                self._last_cleanup = now
+                self._schedule(key, now + self._cleanup_interval)
+                continue
+            if ok:
+                self._retry_at.pop(key, None)
+                source = HttpFetcherSourceConfig.objects.filter(pk=key[1], enabled=True).first()
+                due_at = next_due(source) if source is not None else None
+                if due_at is not None:
+                    self._schedule(key, due_at.timestamp())
+            else:
+                self._retry_at[key] = now + FETCH_RETRY_SECONDS
+                self._schedule(key, self._retry_at[key])
+
+    def _pop_due(self, now: float) -> list[tuple[str, int]]:
+        """Pop every task due by *now*, earliest first, and mark it running."""
+        keys = []
+        while self._heap and self._heap[0][0] <= now:
+            due, key = heapq.heappop(self._heap)
+            if self._due.get(key) != due or key in self._running:
+                continue  # stale entry
+            self._running.add(key)
+            keys.append(key)
+        return keys
+
+    def run(self) -> None:
+        """Run until stop() is called."""
+        next_reload = 0.0
+        with build_session(pool_size=self.concurrency) as session, \
+                ThreadPoolExecutor(max_workers=self.concurrency,
+                                   thread_name_prefix="scheduler") as executor:
+            while not self._stop.is_set():
+                self._wake.clear()
+                self._collect_completed()
+                now = time.time()
+                if now >= next_reload:
+                    self._reload()
+                    next_reload = now + self.reload_seconds
+
+                for key in self._pop_due(now):
+                    executor.submit(self._run_task, key, session)
+
+                wake_at = min(self._heap[0][0] if self._heap else next_reload, next_reload)
+                self._wake.wait(timeout=max(0.0, wake_at - time.time()))
+
+            logger.info("Scheduler stopping, waiting for %d running task(s)", len(self._running))
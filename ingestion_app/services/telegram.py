@@ -1,32 +1,162 @@
 from __future__ import annotations
 
+import json
 import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
 
 import requests
+from django.conf import settings
+
+from ingestion_app.services.download import Download, DownloadTooLarge, read_body
+from ingestion_app.services.http_fetcher import build_session
 
 logger = logging.getLogger(__name__)
 
-_TELEGRAM_API = "https://api.telegram.org"
+# Entries kept by FilePathCache; one per recently downloaded photo
+FILE_PATH_CACHE_SIZE = 1024
+
+
+class FilePathCache:
+    """Bounded TTL cache of ``file_id → (file_path, file_size)`` from getFile.
+
+    Telegram keeps a file_path downloadable for at least an hour, so retried
+    jobs and photos posted again skip the getFile round trip. The oldest
+    entries are evicted past *max_entries*.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = FILE_PATH_CACHE_SIZE) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, str, int]] = OrderedDict()
+
+    def get(self, file_id: str) -> tuple[str, int] | None:
+        with self._lock:
+            entry = self._entries.get(file_id)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[file_id]
+                return None
+            return entry[1], entry[2]
 
+    def put(self, file_id: str, file_path: str, file_size: int) -> None:
+        with self._lock:
+            self._entries.pop(file_id, None)
+            self._entries[file_id] = (time.monotonic() + self.ttl, file_path, file_size)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
 
-def download_image(file_id: str, bot_token: str) -> bytes:
-    """Download a photo from Telegram by file_id and return its raw bytes.
+    def discard(self, file_id: str) -> None:
+        with self._lock:
+            self._entries.pop(file_id, None)
 
-    Raises requests.HTTPError on any non-2xx response.
+
+_session: requests.Session | None = None
+_file_paths: FilePathCache | None = None
+_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide keep-alive Session for the Telegram API.
+
+    Its pool holds a connection per ingest worker thread, plus one per
+    concurrent album download.
     """
-    # Step 1: resolve file_id → file_path
-    get_file_url = f"{_TELEGRAM_API}/bot{bot_token}/getFile"
-    logger.debug("Resolving file_id=%s via %s", file_id, get_file_url)
-    resp = requests.get(get_file_url, params={"file_id": file_id}, timeout=10)
+    global _session
+    with _lock:
+        if _session is None:
+            _session = build_session(settings.INGEST_WORKER_CONCURRENCY
+                                     * settings.TELEGRAM_ALBUM_CONCURRENCY)
+        return _session
+
+
+def get_file_path_cache() -> FilePathCache:
+    """Return the process-wide FilePathCache, configured from settings."""
+    global _file_paths
+    with _lock:
+        if _file_paths is None:
+            _file_paths = FilePathCache(settings.TELEGRAM_FILE_PATH_TTL_SECONDS)
+        return _file_paths
+
+
+def resolve_file(file_id: str, bot_token: str) -> tuple[str, int]:
+    """Return ``(file_path, file_size)`` for *file_id*, from the cache or getFile."""
+    cache = get_file_path_cache()
+    cached = cache.get(file_id)
+    if cached is not None:
+        logger.debug("Resolved file_id=%s → file_path=%s (cached)", file_id, cached[0])
+        return cached
+
+    get_file_url = f"{settings.TELEGRAM_API_URL}/bot{bot_token}/getFile"
+    logger.debug("Resolving file_id=%s via getFile", file_id)
+    resp = get_session().get(get_file_url, params={"file_id": file_id}, timeout=10)
     resp.raise_for_status()
-    file_path: str = resp.json()["result"]["file_path"]
+    result = resp.json()["result"]
+    file_path: str = result["file_path"]
+    file_size: int = result.get("file_size", 0)
+    cache.put(file_id, file_path, file_size)
     logger.debug("Resolved file_id=%s → file_path=%s", file_id, file_path)
+    return file_path, file_size
+
+
+def download_image(file_id: str, bot_token: str) -> Download:
+    """Download a photo from Telegram by file_id into a Download.
 
-    # Step 2: download the file bytes
-    download_url = f"{_TELEGRAM_API}/file/bot{bot_token}/{file_path}"
+    Both requests reuse the connections of get_session(), and the getFile
+    step is skipped while the file_path is cached. The body is streamed with
+    the limits of read_body(); a file_size above DOWNLOAD_MAX_BYTES reported
+    by getFile is refused before downloading. Raises requests.HTTPError on
+    any non-2xx response.
+    """
+    file_path, file_size = resolve_file(file_id, bot_token)
+    if file_size > settings.DOWNLOAD_MAX_BYTES:
+        raise DownloadTooLarge(f"Telegram file {file_path} is {file_size} bytes, "
+                               f"above the {settings.DOWNLOAD_MAX_BYTES} byte limit")
+
+    download_url = f"{settings.TELEGRAM_API_URL}/file/bot{bot_token}/{file_path}"
     logger.debug("Downloading %s", file_path)
-    resp = requests.get(download_url, timeout=30)
+    try:
+        with get_session().get(download_url, timeout=30, stream=True) as resp:
+            resp.raise_for_status()
+            download = read_body(resp, f"Telegram file {file_path}")
+    except requests.HTTPError:
+        # The path may have expired; the next attempt asks getFile again
+        get_file_path_cache().discard(file_id)
+        raise
+
+    logger.info("Downloaded Telegram image: %s (%.1f KB, %s)",
+                file_path, download.size / 1024, download.format)
+    return download
+
+
+def get_updates(bot_token: str, offset: int, timeout: int) -> list[dict[str, Any]]:
+    """Long-poll getUpdates for messages and channel posts from *offset* on.
+
+    Blocks up to *timeout* seconds while there is nothing new. Passing an
+    offset confirms every earlier update, so Telegram stops returning it.
+    Raises requests.HTTPError on any non-2xx response (409 Conflict while a
+    webhook is set).
+    """
+    resp = get_session().get(
+        f"{settings.TELEGRAM_API_URL}/bot{bot_token}/getUpdates",
+        params={
+            "offset": offset,
+            "timeout": timeout,
+            "allowed_updates": json.dumps(["message", "channel_post"]),
+        },
+        timeout=timeout + 10,
+    )
     resp.raise_for_status()
+    return resp.json()["result"]
+
 
-    logger.info("Downloaded Telegram image: %s (%.1f KB)", file_path, len(resp.content) / 1024)
-    return resp.content
+def delete_webhook(bot_token: str) -> None:
+    """Remove the registered webhook, which Telegram requires before getUpdates."""
+    resp = get_session().post(f"{settings.TELEGRAM_API_URL}/bot{bot_token}/deleteWebhook",
+                              timeout=10)
+    resp.raise_for_status()
+    logger.info("Telegram webhook deleted")
@@ -0,0 +1,97 @@
+"""Validation of Telegram updates, shared by the webhook and the getUpdates poller."""
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from django.db import transaction
+
+from ingestion_app.models import IngestJob, TelegramSourceConfig
+from ingestion_app.services.ingest_queue import enqueue_telegram_file
+from ingestion_app.services.update_dedup import get_update_dedup, photo_key, update_key
+
+logger = logging.getLogger(__name__)
+
+
+def handle_update(update: dict[str, Any], config: TelegramSourceConfig) -> IngestJob | None:
+    """Queue the photo of *update* for ingestion if it passes validation.
+
+    Accepts private messages and channel posts from ``config.chat_id`` only
+    and queues the largest resolution of the photo. Redelivered updates and
+    photos already queued are skipped (see services.update_dedup); the keys
+    are recorded together with the job, so a failed attempt is not
+    remembered. Returns the queued job, or None when the update was ignored.
+    """
+    update_id = update.get("update_id")
+    # Replays reaching the process that handled the update cost no query
+    if update_id is not None and get_update_dedup().recently_seen(update_key(update_id)):
+        logger.debug("Telegram update %s was already handled, acknowledging replay", update_id)
+        return None
+    with transaction.atomic():
+        return _handle_update(update, config)
+
+
+def _handle_update(update: dict[str, Any], config: TelegramSourceConfig) -> IngestJob | None:
+    dedup = get_update_dedup()
+    update_id = update.get("update_id")
+    if update_id is not None and not dedup.claim(update_key(update_id)):
+        logger.debug("Telegram update %s was already handled, acknowledging replay", update_id)
+        return None
+
+    # Support both private messages and channel posts
+    message: dict[str, Any] = update.get("message") or update.get("channel_post") or {}
+    if not message:
+        logger.debug("Telegram update contains no message/channel_post, ignoring")
+        return None
+
+    # Validate originating chat
+    chat_id = str(message.get("chat", {}).get("id", ""))
+    if chat_id != config.chat_id:
+        logger.warning("Rejected Telegram update from unexpected chat_id=%s (expected %s)",
+                       chat_id, config.chat_id)
+        return None
+
+    photos: list[dict[str, Any]] = message.get("photo", [])
+    if not photos:
+        logger.debug("Telegram message from chat_id=%s has no photos, ignoring", chat_id)
+        return None
+
+    # Telegram provides multiple resolutions; pick the largest
+    best = max(photos, key=lambda p: p.get("file_size", 0))
+    file_id: str = best["file_id"]
+    logger.debug("Processing photo: file_id=%s file_size=%s",
+                 file_id, best.get("file_size", "?"))
+
+    # The same photo posted or forwarded again keeps its file_unique_id
+    file_unique_id = best.get("file_unique_id", "")
+    if file_unique_id and not dedup.claim(photo_key(file_unique_id), remember=False):
+        logger.info("Telegram photo file_unique_id=%s was already queued, skipping",
+                    file_unique_id)
+        return None
+
+    job = enqueue_telegram_file(file_id, media_group_id=message.get("media_group_id", ""),
+                                file_unique_id=file_unique_id)
+    logger.info("Telegram photo queued for ingestion: file_id=%s (job #%d)", file_id, job.pk)
+    return job
+
+
+def process_updates(updates: list[dict[str, Any]], config: TelegramSourceConfig,
+                    offset: int) -> int:
+    """Handle a getUpdates batch fetched from *offset*; store and return the next offset.
+
+    The jobs and the offset are committed together, so a crash either keeps
+    the whole batch or leaves it to be fetched again. One malformed update
+    is logged and skipped instead of blocking the batch.
+    """
+    with transaction.atomic():
+        for update in updates:
+            try:
+                with transaction.atomic():
+                    handle_update(update, config)
+            except Exception as exc:
+                logger.error("Telegram update %s could not be handled: %s",
+                             update.get("update_id"), exc, exc_info=True)
+            offset = max(offset, update.get("update_id", offset - 1) + 1)
+        # update() rather than save(): the offset is not config, so caches stay valid
+        TelegramSourceConfig.objects.filter(pk=config.pk).update(update_offset=offset)
+    return offset
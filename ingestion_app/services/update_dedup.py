@@ -0,0 +1,121 @@
+"""Recently handled Telegram update_ids and photo file_unique_ids.
+
+Telegram redelivers an update whenever the webhook is slow or fails, and
+the same photo is often posted or forwarded again. Each key is recorded in
+ProcessedUpdate, shared by the web workers and the poller, and remembered
+in a bounded per-process table, so a replay that reaches the same process
+is acknowledged with a dict lookup and never reaches the queue or the
+pipeline. Photo keys are released when their ingest job fails for good
+(see ingest_queue.mark_failed), so they are only kept in the table. Keys
+expire after TELEGRAM_DEDUP_TTL_SECONDS; the scheduler's cleanup run
+prunes expired rows and caps the table at TELEGRAM_DEDUP_MAX_ENTRIES.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from ingestion_app.models import ProcessedUpdate
+
+logger = logging.getLogger(__name__)
+
+# Keys remembered per process; older ones are still found in ProcessedUpdate
+LOCAL_ENTRIES = 4096
+
+
+def update_key(update_id: int) -> str:
+    return f"update:{update_id}"
+
+
+def photo_key(file_unique_id: str) -> str:
+    return f"photo:{file_unique_id}"
+
+
+class UpdateDedup:
+    """Records keys once; claim() tells a first delivery from a replay."""
+
+    def __init__(self, ttl: float, local_entries: int = LOCAL_ENTRIES) -> None:
+        self.ttl = ttl
+        self.local_entries = local_entries
+        self._lock = threading.Lock()
+        self._local: OrderedDict[str, float] = OrderedDict()
+
+    def _remember(self, key: str, expires: float) -> None:
+        with self._lock:
+            self._local.pop(key, None)
+            self._local[key] = expires
+            while len(self._local) > self.local_entries:
+                self._local.popitem(last=False)
+
+    def recently_seen(self, key: str) -> bool:
+        """Return True if this process recorded *key* and it has not expired (no query)."""
+        with self._lock:
+            expires = self._local.get(key)
+        return expires is not None and expires > time.monotonic()
+
+    def claim(self, key: str, remember: bool = True) -> bool:
+        """Record *key*; return False if it was already recorded and has not expired.
+
+        Call inside the transaction that acts on the key: if it rolls back,
+        the key is not recorded and a redelivery is handled again. Keys that
+        may be released pass ``remember=False``: other processes could not
+        forget them.
+        """
+        if self.recently_seen(key):
+            return False
+        now = time.monotonic()
+
+        try:
+            with transaction.atomic():
+                ProcessedUpdate.objects.create(key=key)
+        except IntegrityError:
+            cutoff = timezone.now() - timedelta(seconds=self.ttl)
+            # An expired row counts as new: take it over
+            if not ProcessedUpdate.objects.filter(key=key, seen_at__lt=cutoff).update(
+                    seen_at=timezone.now()):
+                if remember:
+                    self._remember(key, now + self.ttl)
+                return False
+        if remember:
+            transaction.on_commit(lambda: self._remember(key, now + self.ttl))
+        return True
+
+    def release(self, key: str) -> None:
+        """Forget *key*, so its next delivery is handled again."""
+        ProcessedUpdate.objects.filter(key=key).delete()
+        with self._lock:
+            self._local.pop(key, None)
+
+
+_dedup: UpdateDedup | None = None
+_dedup_lock = threading.Lock()
+
+
+def get_update_dedup() -> UpdateDedup:
+    """Return the process-wide UpdateDedup, configured from settings."""
+    global _dedup
+    with _dedup_lock:
+        if _dedup is None:
+            _dedup = UpdateDedup(settings.TELEGRAM_DEDUP_TTL_SECONDS)
+        return _dedup
+
+
+def prune_processed_updates() -> int:
+    """Delete expired ProcessedUpdate rows and all but the newest TELEGRAM_DEDUP_MAX_ENTRIES."""
+    cutoff = timezone.now() - timedelta(seconds=settings.TELEGRAM_DEDUP_TTL_SECONDS)
+    deleted, _ = ProcessedUpdate.objects.filter(seen_at__lt=cutoff).delete()
+    boundary = (ProcessedUpdate.objects.order_by("-seen_at")
+                .values_list("seen_at", flat=True)[settings.TELEGRAM_DEDUP_MAX_ENTRIES:]
+                .first())
+    if boundary is not None:
+        deleted += ProcessedUpdate.objects.filter(seen_at__lte=boundary).delete()[0]
+    if deleted:
+        logger.info("prune_processed_updates: removed %d key(s)", deleted)
+    return deleted
@@ -0,0 +1,83 @@
+import hashlib
+import os
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from ingestion_app.services.download import DownloadTooLarge, read_body, sniff_image
+
+JPEG = b"\xff\xd8\xff\xe0" + bytes(60)
+
+
+def _response(chunks, length=None):
+    consumed = []
+
+    def iter_content(size):
+        for chunk in chunks:
+            consumed.append(chunk)
+            yield chunk
+
+    headers = {} if length is None else {"Content-Length": str(length)}
+    return mock.Mock(headers=headers, iter_content=iter_content), consumed
+
+
+@override_settings(DOWNLOAD_MAX_BYTES=100, DOWNLOAD_SPOOL_MEMORY_BYTES=32)
+class ReadBodyTests(SimpleTestCase):
+    def test_content_length_over_limit_reads_nothing(self):
+        resp, consumed = _response([JPEG], length=101)
+        with self.assertRaises(DownloadTooLarge):
+            read_body(resp, "test")
+        self.assertEqual(consumed, [])
+
+    def test_stream_over_limit_stops_reading(self):
+        resp, consumed = _response([JPEG, bytes(40), bytes(40), bytes(40)])
+        with self.assertRaises(DownloadTooLarge):
+            read_body(resp, "test")
+        self.assertEqual(len(consumed), 2)
+
+    def test_non_image_rejected_at_first_chunk(self):
+        resp, consumed = _response([b"<!DOCTYPE html><html>", b"more"])
+        with self.assertRaisesMessage(ValueError, "not a known image format"):
+            read_body(resp, "test")
+        self.assertEqual(len(consumed), 1)
+
+    def test_signature_split_across_chunks(self):
+        resp, _ = _response([b"\x89PNG", b"\r\n\x1a\n" + bytes(20)])
+        with read_body(resp, "test") as download:
+            self.assertEqual(download.format, "png")
+
+    def test_body_too_short_to_sniff_is_checked_at_the_end(self):
+        resp, _ = _response([b"GIF89a"])
+        with read_body(resp, "test") as download:
+            self.assertEqual((download.format, download.source()), ("gif", b"GIF89a"))
+        resp, _ = _response([b"nope"])
+        with self.assertRaises(ValueError):
+            read_body(resp, "test")
+
+    def test_large_body_spools_to_disk(self):
+        body = JPEG + bytes(30)
+        resp, _ = _response([body[:40], body[40:]])
+        with read_body(resp, "test") as download:
+            path = download.source()
+            self.assertIsInstance(path, str)
+            with open(path, "rb") as fh:
+                self.assertEqual(fh.read(), body)
+            self.assertEqual(download.sha256, hashlib.sha256(body).hexdigest())
+        self.assertFalse(os.path.exists(path))
+
+
+class SniffImageTests(SimpleTestCase):
+    def test_signatures(self):
+        cases = {
+            b"\xff\xd8\xff\xdb" + bytes(8): "jpeg",
+            b"RIFF\x00\x00\x00\x00WEBP": "webp",
+            b"\x00\x00\x00\x1cftypavif": "avif",
+            b"\x00\x00\x00\x1cftypheic": "heif",
+            b"II*\x00" + bytes(8): "tiff",
+            b"BM" + bytes(10): "bmp",
+            b"\x00\x00\x00\x1cftypisom": None,
+            b"%PDF-1.7" + bytes(4): None,
+        }
+        for head, expected in cases.items():
+            with self.subTest(head=head):
+                self.assertEqual(sniff_image(head), expected)
@@ -0,0 +1,25 @@
+import io
+
+from django.test import SimpleTestCase
+from PIL import Image
+
+from ingestion_app.services.image_worker import _open_checked
+
+
+def _png(size: tuple[int, int]) -> io.BytesIO:
+    buf = io.BytesIO()
+    Image.new("RGB", size).save(buf, "PNG")
+    buf.seek(0)
+    return buf
+
+
+class OpenCheckedTests(SimpleTestCase):
+    def test_rejects_images_above_limit(self):
+        with self.assertRaisesMessage(ValueError, "above the 100 pixel limit"):
+            _open_checked(_png((20, 10)), max_pixels=100)
+
+    def test_leaves_pillow_limit_alone(self):
+        before = Image.MAX_IMAGE_PIXELS
+        with _open_checked(_png((10, 10)), max_pixels=100) as img:
+            self.assertEqual(img.size, (10, 10))
+        self.assertEqual(Image.MAX_IMAGE_PIXELS, before)
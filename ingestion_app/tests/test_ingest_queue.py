@@ -0,0 +1,104 @@
+import json
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from ingestion_app.models import IngestJob, TelegramSourceConfig
+from ingestion_app.services import ingest_queue, update_dedup
+from screensaver_app import config_cache
+
+
+class IngestQueueTestCase(TestCase):
+    def setUp(self):
+        # Fresh per-process caches for every test
+        for module, name in ((update_dedup, "_dedup"), (config_cache, "_cache")):
+            patcher = mock.patch.object(module, name, None)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        with self.captureOnCommitCallbacks(execute=True):
+            TelegramSourceConfig.objects.create(bot_token="token", chat_id="42")
+
+
+class WebhookTests(IngestQueueTestCase):
+    def _post(self, body):
+        return self.client.post("/telegram/webhook", body, content_type="application/json")
+
+    @mock.patch.object(ingest_queue, "download_image")
+    def test_photo_is_queued_without_downloading(self, download_image):
+        update = {"update_id": 1, "message": {
+            "chat": {"id": 42},
+            "photo": [{"file_id": "small", "file_unique_id": "u1", "file_size": 10},
+                      {"file_id": "large", "file_unique_id": "u1", "file_size": 99}],
+        }}
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self._post(json.dumps(update))
+
+        self.assertEqual(response.json(), {"ok": True})
+        job = IngestJob.objects.get()
+        self.assertEqual((job.file_id, job.status), ("large", IngestJob.STATUS_PENDING))
+        download_image.assert_not_called()
+
+    def test_invalid_json_is_rejected(self):
+        self.assertEqual(self._post("{").status_code, 400)
+        self.assertFalse(IngestJob.objects.exists())
+
+
+class ProcessJobTests(IngestQueueTestCase):
+    def _claim_one(self) -> IngestJob:
+        jobs = ingest_queue.claim_jobs(10)
+        self.assertEqual(len(jobs), 1)
+        return jobs[0]
+
+    @mock.patch.object(ingest_queue, "download_image", side_effect=OSError("timeout"))
+    def test_failure_is_retried_with_backoff(self, download_image):
+        ingest_queue.enqueue_telegram_file("file")
+
+        self.assertFalse(ingest_queue.process_job(self._claim_one()))
+
+        job = IngestJob.objects.get()
+        self.assertEqual((job.status, job.attempts), (IngestJob.STATUS_PENDING, 1))
+        self.assertEqual(job.last_error, "timeout")
+        self.assertGreater(job.next_attempt_at, timezone.now())
+        # Not ready again until the backoff has passed
+        self.assertEqual(ingest_queue.claim_jobs(10), [])
+        IngestJob.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(self._claim_one().attempts, 2)
+
+    @mock.patch.object(ingest_queue, "download_image", side_effect=OSError("timeout"))
+    def test_gives_up_after_max_attempts(self, download_image):
+        ingest_queue.enqueue_telegram_file("file")
+        IngestJob.objects.update(attempts=ingest_queue.MAX_ATTEMPTS - 1)
+
+        ingest_queue.process_job(self._claim_one())
+
+        self.assertEqual(IngestJob.objects.get().status, IngestJob.STATUS_FAILED)
+        self.assertEqual(ingest_queue.claim_jobs(10), [])
+
+    @mock.patch.object(ingest_queue, "ingest_image", return_value=Path("x.jpg"))
+    @mock.patch.object(ingest_queue, "download_image")
+    def test_success_deletes_job(self, download_image, ingest_image):
+        download_image.return_value.__enter__.return_value.size = 3
+        ingest_queue.enqueue_telegram_file("file")
+
+        self.assertTrue(ingest_queue.process_job(self._claim_one()))
+
+        self.assertFalse(IngestJob.objects.exists())
+        download_image.assert_called_once_with("file", "token")
+
+    def test_stale_running_job_is_recovered(self):
+        job = ingest_queue.enqueue_telegram_file("file")
+        stale = timezone.now() - timedelta(seconds=ingest_queue.STALE_JOB_SECONDS + 1)
+        IngestJob.objects.filter(pk=job.pk).update(status=IngestJob.STATUS_RUNNING,
+                                                   updated_at=stale)
+
+        self.assertEqual(ingest_queue.recover_stale_jobs(), 1)
+        self.assertEqual(IngestJob.objects.get().status, IngestJob.STATUS_PENDING)
+
+    def test_backoff_is_capped(self):
+        self.assertEqual(ingest_queue.backoff_seconds(1), ingest_queue.BACKOFF_BASE_SECONDS)
+        self.assertEqual(ingest_queue.backoff_seconds(2), 2 * ingest_queue.BACKOFF_BASE_SECONDS)
+        self.assertEqual(ingest_queue.backoff_seconds(50), ingest_queue.BACKOFF_MAX_SECONDS)
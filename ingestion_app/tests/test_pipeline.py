@@ -0,0 +1,62 @@
+import io
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from PIL import Image as PILImage
+
+from ingestion_app.services import pipeline
+from screensaver_app import config_cache, image_index
+from screensaver_app.models import Image
+from screensaver_app.tests.helpers import TempMediaMixin
+
+
+def _jpeg(size: tuple[int, int]) -> bytes:
+    buf = io.BytesIO()
+    PILImage.new("RGB", size, "blue").save(buf, "JPEG")
+    return buf.getvalue()
+
+
+@override_settings(IMAGE_RENDITION_WIDTHS=[64], INGEST_PERCEPTUAL_DEDUP=False)
+class IngestImageTests(TempMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        for target, name, value in (
+                (config_cache, "_cache", None),
+                (pipeline, "_pool", pipeline.ImageProcessingPool(0, 1, 10_000_000))):
+            patcher = mock.patch.object(target, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _formats(self, formats):
+        patcher = mock.patch.object(image_index, "_alternate_formats", formats)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_writes_image_preview_and_renditions(self):
+        self._formats([])
+        dest = pipeline.ingest_image(_jpeg((800, 600)), source="test")
+
+        row = Image.objects.get(filename=dest.name)
+        self.assertEqual((row.width, row.height, row.renditions), (800, 600, [64]))
+        self.assertTrue((self.media_root / "previews" / dest.name).is_file())
+        self.assertEqual(row.alternates_size_bytes, 0)
+
+    def test_alternates_skip_the_original(self):
+        self._formats(["webp"])
+        dest = pipeline.ingest_image(_jpeg((800, 600)), source="test")
+
+        webp = self.media_root / "webp"
+        stem = dest.with_suffix(".webp").name
+        self.assertTrue((webp / "previews" / stem).is_file())
+        self.assertTrue((webp / "renditions" / "64" / stem).is_file())
+        self.assertFalse((webp / "images" / stem).exists())
+        self.assertEqual(Image.objects.get(filename=dest.name).alternates_size_bytes,
+                         sum(p.stat().st_size for p in webp.rglob("*.webp")))
+
+    def test_identical_bytes_are_not_saved_twice(self):
+        self._formats([])
+        data = _jpeg((300, 200))
+        first = pipeline.ingest_image(data, source="test")
+
+        self.assertEqual(pipeline.ingest_image(data, source="test"), first)
+        self.assertEqual(Image.objects.count(), 1)
@@ -0,0 +1,94 @@
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from ingestion_app.models import HttpFetcherSourceConfig
+from ingestion_app.services import scheduler
+from screensaver_app import config_cache
+
+
+class SchedulerTests(TestCase):
+    def setUp(self):
+        for target, name, value in ((config_cache, "_cache", None),
+                                    (scheduler, "mosaic_is_stale", lambda: False)):
+            patcher = mock.patch.object(target, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.scheduler = scheduler.Scheduler(concurrency=2)
+
+    def _source(self, name: str, fetched_ago: timedelta | None) -> HttpFetcherSourceConfig:
+        return HttpFetcherSourceConfig.objects.create(
+            name=name, url=f"https://example.com/{name}", fetch_interval="hourly",
+            last_fetched_at=None if fetched_ago is None else timezone.now() - fetched_ago,
+        )
+
+    def test_due_tasks_pop_in_due_order(self):
+        late = self._source("late", timedelta(minutes=50))
+        early = self._source("early", timedelta(minutes=59))
+        never = self._source("never", None)
+        self.scheduler._reload()
+
+        # Cleanup has never run, so it is long overdue; a never-fetched source is due now
+        self.assertEqual(self.scheduler._pop_due(time.time()),
+                         [scheduler._CLEANUP_KEY, ("fetch", never.pk)])
+        self.assertEqual(self.scheduler._pop_due(time.time() + 11 * 60),
+                         [("fetch", early.pk), ("fetch", late.pk)])
+
+    def test_rescheduled_entry_replaces_old_one(self):
+        source = self._source("a", None)
+        key = ("fetch", source.pk)
+        self.scheduler._reload()
+        later = time.time() + 600
+        self.scheduler._schedule(key, later)
+
+        self.assertNotIn(key, self.scheduler._pop_due(time.time()))
+        self.assertEqual(self.scheduler._pop_due(later), [key])
+
+    def test_running_task_is_not_started_twice(self):
+        source = self._source("a", None)
+        self.scheduler._reload()
+        (key,) = [k for k in self.scheduler._pop_due(time.time()) if k[0] == "fetch"]
+        self.scheduler._schedule(key, time.time())
+
+        self.assertNotIn(key, self.scheduler._pop_due(time.time()))
+        self.assertEqual(key, ("fetch", source.pk))
+
+    def test_failed_fetch_is_retried_later(self):
+        source = self._source("a", None)
+        key = ("fetch", source.pk)
+        self.scheduler._reload()
+        self.scheduler._pop_due(time.time())
+        self.scheduler._completed.put((key, False))
+
+        self.scheduler._collect_completed()
+
+        due = self.scheduler._due[key]
+        self.assertAlmostEqual(due, time.time() + scheduler.FETCH_RETRY_SECONDS, delta=5)
+        # A reload must not pull the retry forward for a never-fetched source
+        self.scheduler._reload()
+        self.assertEqual(self.scheduler._due[key], due)
+
+    def test_successful_fetch_follows_interval_and_refreshes_mosaic(self):
+        source = self._source("a", None)
+        key = ("fetch", source.pk)
+        self.scheduler._reload()
+        self.scheduler._pop_due(time.time())
+        HttpFetcherSourceConfig.objects.filter(pk=source.pk).update(last_fetched_at=timezone.now())
+        self.scheduler._completed.put((key, True))
+
+        self.scheduler._collect_completed()
+
+        self.assertAlmostEqual(self.scheduler._due[key], time.time() + 3600, delta=5)
+        self.assertLessEqual(self.scheduler._due[scheduler._MOSAIC_KEY], time.time())
+
+    def test_disabled_source_is_unscheduled(self):
+        source = self._source("a", None)
+        self.scheduler._reload()
+        HttpFetcherSourceConfig.objects.filter(pk=source.pk).update(enabled=False)
+
+        self.scheduler._reload()
+
+        self.assertNotIn(("fetch", source.pk), self.scheduler._due)
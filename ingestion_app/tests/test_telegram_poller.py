@@ -0,0 +1,99 @@
+import signal
+from io import StringIO
+from unittest import mock
+
+import requests
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from ingestion_app.management.commands import run_telegram_poller
+from ingestion_app.models import IngestJob, TelegramSourceConfig
+from ingestion_app.services import update_dedup
+from ingestion_app.services.telegram_updates import process_updates
+from screensaver_app import config_cache
+
+
+def _photo_update(update_id: int) -> dict:
+    return {"update_id": update_id, "message": {
+        "chat": {"id": 42},
+        "photo": [{"file_id": f"file-{update_id}", "file_unique_id": f"u{update_id}",
+                   "file_size": 10}],
+    }}
+
+
+class PollerTestCase(TestCase):
+    def setUp(self):
+        for module, name in ((update_dedup, "_dedup"), (config_cache, "_cache")):
+            patcher = mock.patch.object(module, name, None)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.config = TelegramSourceConfig.objects.create(
+                bot_token="token", chat_id="42", update_offset=10)
+
+    def _stored_offset(self) -> int:
+        return TelegramSourceConfig.objects.values_list("update_offset", flat=True).get()
+
+
+class ProcessUpdatesTests(PollerTestCase):
+    def test_offset_follows_the_highest_update(self):
+        offset = process_updates([_photo_update(12), _photo_update(11)], self.config, 10)
+
+        self.assertEqual(offset, 13)
+        self.assertEqual(self._stored_offset(), 13)
+        self.assertEqual(IngestJob.objects.count(), 2)
+
+    def test_failing_update_is_skipped_but_confirmed(self):
+        with mock.patch("ingestion_app.services.telegram_updates.enqueue_telegram_file",
+                        side_effect=[RuntimeError("boom"), mock.DEFAULT],
+                        wraps=lambda *args, **kwargs: IngestJob.objects.create(file_id="x")):
+            offset = process_updates([_photo_update(10), _photo_update(11)], self.config, 10)
+
+        self.assertEqual(offset, 12)
+        self.assertEqual(IngestJob.objects.count(), 1)
+        # Its dedup claim rolled back with it, so a redelivery is handled
+        with self.captureOnCommitCallbacks(execute=True):
+            process_updates([_photo_update(10)], self.config, 12)
+        self.assertEqual(IngestJob.objects.count(), 2)
+
+    def test_empty_batch_keeps_offset(self):
+        self.assertEqual(process_updates([], self.config, 10), 10)
+        self.assertEqual(self._stored_offset(), 10)
+
+
+class PollerCommandTests(PollerTestCase):
+    def setUp(self):
+        super().setUp()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            self.addCleanup(signal.signal, signum, signal.getsignal(signum))
+
+    def _run(self, *args):
+        call_command("run_telegram_poller", "--once", "--timeout", "0", *args, stdout=StringIO())
+
+    @mock.patch.object(run_telegram_poller, "get_updates")
+    def test_polls_from_stored_offset_and_stores_the_next(self, get_updates):
+        get_updates.return_value = [_photo_update(10), _photo_update(11)]
+
+        self._run()
+
+        get_updates.assert_called_once_with("token", 10, 0)
+        self.assertEqual(self._stored_offset(), 12)
+
+        get_updates.reset_mock()
+        get_updates.return_value = []
+        self._run()
+        get_updates.assert_called_once_with("token", 12, 0)
+
+    @mock.patch.object(run_telegram_poller, "delete_webhook")
+    @mock.patch.object(run_telegram_poller, "get_updates")
+    def test_webhook_conflict(self, get_updates, delete_webhook):
+        conflict = requests.HTTPError(response=mock.Mock(status_code=409))
+        get_updates.side_effect = [conflict]
+        with self.assertRaises(CommandError):
+            self._run()
+        delete_webhook.assert_not_called()
+
+        get_updates.side_effect = [conflict, []]
+        self._run("--delete-webhook")
+        delete_webhook.assert_called_once_with("token")
+        self.assertEqual(self._stored_offset(), 10)
@@ -0,0 +1,64 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from ingestion_app.models import IngestJob, TelegramSourceConfig
+from ingestion_app.services import ingest_queue, update_dedup
+from ingestion_app.services.telegram_updates import handle_update
+
+
+def _update(update_id: int, file_unique_id: str = "unique-1") -> dict:
+    return {
+        "update_id": update_id,
+        "message": {
+            "chat": {"id": 42},
+            "photo": [{"file_id": f"file-{update_id}", "file_unique_id": file_unique_id,
+                       "file_size": 100}],
+        },
+    }
+
+
+class HandleUpdateTests(TestCase):
+    def setUp(self):
+        # A fresh per-process table for every test
+        patcher = mock.patch.object(update_dedup, "_dedup", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.config = TelegramSourceConfig(bot_token="token", chat_id="42")
+
+    def _handle(self, update: dict) -> IngestJob | None:
+        with self.captureOnCommitCallbacks(execute=True):
+            return handle_update(update, self.config)
+
+    def test_redelivered_update_is_queued_once(self):
+        self.assertIsNotNone(self._handle(_update(1)))
+        with self.assertNumQueries(0):
+            self.assertIsNone(self._handle(_update(1)))
+        self.assertEqual(IngestJob.objects.count(), 1)
+
+    def test_reposted_photo_is_skipped(self):
+        self.assertIsNotNone(self._handle(_update(1)))
+        self.assertIsNone(self._handle(_update(2)))
+        self.assertEqual(IngestJob.objects.count(), 1)
+
+    def test_other_chat_is_rejected(self):
+        update = _update(1)
+        update["message"]["chat"]["id"] = 7
+        self.assertIsNone(self._handle(update))
+        self.assertFalse(IngestJob.objects.exists())
+
+    def test_failed_job_releases_photo(self):
+        job = self._handle(_update(1))
+        job.attempts = ingest_queue.MAX_ATTEMPTS
+        ingest_queue.mark_failed(job, "boom")
+
+        self.assertEqual(job.status, IngestJob.STATUS_FAILED)
+        self.assertIsNotNone(self._handle(_update(2)))
+
+    def test_retried_job_keeps_photo_claimed(self):
+        job = self._handle(_update(1))
+        job.attempts = 1
+        ingest_queue.mark_failed(job, "boom")
+
+        self.assertEqual(job.status, IngestJob.STATUS_PENDING)
+        self.assertIsNone(self._handle(_update(2)))
@@ -4,7 +4,15 @@ from django.contrib import admin
 from django.http import HttpRequest
 from django.utils.html import format_html
 
-from .models import AppLog, CleanupConfig, ScreensaverConfig
+from .models import (
+    AppLog,
+    CleanupConfig,
+    Display,
+    Image,
+    LogRetentionConfig,
+    MediaUsage,
+    ScreensaverConfig,
+)
 
 _LEVEL_COLORS: dict[str, str] = {
     "DEBUG": "#888888",
@@ -18,9 +26,9 @@ _LEVEL_COLORS: dict[str, str] = {
 @admin.register(ScreensaverConfig)
 class ScreensaverConfigAdmin(admin.ModelAdmin):
     list_display = ("transition", "transition_mode", "slideshow_interval_seconds",
-                    "grid_fetch_interval_seconds")
+                    "playlist_strategy", "grid_fetch_interval_seconds")
     fieldsets = (
-        ("Slideshow", {"fields": ("slideshow_interval_seconds",)}),
+        ("Slideshow", {"fields": ("slideshow_interval_seconds", "playlist_strategy")}),
         ("Transition", {"fields": ("transition", "transition_mode")}),
         ("Grid refresh", {"fields": ("grid_fetch_interval_seconds",)}),
     )
@@ -28,7 +36,18 @@ class ScreensaverConfigAdmin(admin.ModelAdmin):
 
 @admin.register(CleanupConfig)
 class CleanupConfigAdmin(admin.ModelAdmin):
-    list_display = ("max_folder_size_mb", "cleanup_interval_seconds")
+    list_display = ("max_folder_size_mb", "cleanup_interval_seconds", "eviction_policy")
+
+
+@admin.register(LogRetentionConfig)
+class LogRetentionConfigAdmin(admin.ModelAdmin):
+    list_display = ("debug_days", "info_days", "warning_days", "error_days", "critical_days",
+                    "archive_enabled")
+    fieldsets = (
+        ("Retention (days)", {"fields": ("debug_days", "info_days", "warning_days",
+                                         "error_days", "critical_days")}),
+        ("Archive", {"fields": ("archive_enabled",)}),
+    )
 
 
 @admin.register(AppLog)
@@ -59,3 +78,56 @@ class AppLogAdmin(admin.ModelAdmin):
 
     def has_change_permission(self, request: HttpRequest, obj: object = None) -> bool:
         return False
+
+
+@admin.register(Image)
+class ImageAdmin(admin.ModelAdmin):
+    list_display = ("filename", "source", "width", "height", "size_bytes", "display_count",
+                    "last_displayed_at", "created_at")
+    list_filter = ("source",)
+    search_fields = ("filename",)
+    date_hierarchy = "created_at"
+    ordering = ("-created_at",)
+    readonly_fields = ("filename", "source", "width", "height", "size_bytes", "preview_width",
+                       "preview_height", "preview_size_bytes", "renditions",
+                       "renditions_size_bytes", "alternates_size_bytes", "content_hash", "phash",
+                       "display_count", "last_displayed_at", "created_at")
+
+    def has_add_permission(self, request: HttpRequest) -> bool:
+        return False
+
+    def has_change_permission(self, request: HttpRequest, obj: object = None) -> bool:
+        return False
+
+
+@admin.register(MediaUsage)
+class MediaUsageAdmin(admin.ModelAdmin):
+    list_display = ("directory", "size_mb", "reconciled_at")
+    readonly_fields = ("directory", "size_bytes", "reconciled_at")
+
+    @admin.display(description="Size (MB)")
+    def size_mb(self, obj: MediaUsage) -> str:
+        return f"{obj.size_bytes / 1024 / 1024:.1f}"
+
+    def has_add_permission(self, request: HttpRequest) -> bool:
+        return False
+
+    def has_change_permission(self, request: HttpRequest, obj: object = None) -> bool:
+        return False
+
+    def has_delete_permission(self, request: HttpRequest, obj: object = None) -> bool:
+        return False
+
+
+@admin.register(Display)
+class DisplayAdmin(admin.ModelAdmin):
+    list_display = ("display_id", "impressions", "first_seen_at", "last_seen_at")
+    search_fields = ("display_id",)
+    readonly_fields = ("display_id", "impressions", "first_seen_at", "last_seen_at",
+                       "playlist_state")
+
+    def has_add_permission(self, request: HttpRequest) -> bool:
+        return False
+
+    def has_change_permission(self, request: HttpRequest, obj: object = None) -> bool:
+        return False
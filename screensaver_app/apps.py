@@ -7,3 +7,10 @@ class ScreensaverAppConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "screensaver_app"
     verbose_name = "Screensaver"
+
+    def ready(self) -> None:
+        from django.db.backends.signals import connection_created
+
+        from .db import configure_connection
+
+        connection_created.connect(configure_connection, dispatch_uid="screensaver_sqlite_setup")
@@ -0,0 +1,115 @@
+"""Process-local cache for the singleton config models.
+
+Config rows change rarely but are read on every page load, size check and
+webhook hit. Each process keeps the last instance it loaded per model.
+SingletonModel.save() bumps that model's counter in ConfigVersion, and a
+process reloads a config once it sees a newer counter. Counters are read
+at most every CONFIG_CACHE_CHECK_SECONDS, one query for all models, so hot
+paths only touch the database for that check and for configs that actually
+changed. The process that saves sees its own change immediately.
+"""
+from __future__ import annotations
+
+import copy
+import math
+import threading
+import time
+from typing import Callable, TypeVar
+
+from django.apps import apps
+from django.conf import settings
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
+
+M = TypeVar("M", bound=models.Model)
+
+
+def _label(model: type[models.Model]) -> str:
+    return model._meta.label_lower
+
+
+class ConfigCache:
+    """Cached config instances, invalidated through ConfigVersion counters."""
+
+    def __init__(self, check_interval: float) -> None:
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._versions: dict[str, int] = {}
+        self._checked_at = -math.inf
+        self._entries: dict[str, tuple[int, models.Model | None]] = {}
+        # Bumps seen by this process, so reads that raced one are not cached
+        self._bumps = 0
+
+    @staticmethod
+    def _counters() -> models.QuerySet[models.Model]:
+        # Looked up lazily: models.py imports this module
+        return apps.get_model("screensaver_app", "ConfigVersion").objects.all()
+
+    def _current_versions(self) -> dict[str, int]:
+        now = time.monotonic()
+        with self._lock:
+            if now - self._checked_at < self.check_interval:
+                return self._versions
+            bumps = self._bumps
+        versions = dict(self._counters().values_list("model", "version"))
+        with self._lock:
+            if self._bumps == bumps:
+                self._versions, self._checked_at = versions, now
+        return versions
+
+    def get(self, model: type[M], load: Callable[[], M | None]) -> M | None:
+        """Return *model*'s config, calling *load* only when it changed.
+
+        Each caller gets its own copy, so changing and saving it cannot leak
+        into the cached instance.
+        """
+        label = _label(model)
+        with self._lock:
+            bumps = self._bumps
+        version = self._current_versions().get(label, 0)
+        with self._lock:
+            entry = self._entries.get(label)
+        if entry is None or entry[0] != version:
+            # Loaded outside the lock so other models are not held up by the query
+            entry = (version, load())
+            with self._lock:
+                if self._bumps == bumps:
+                    self._entries[label] = entry
+        return copy.copy(entry[1])  # type: ignore[return-value]
+
+    def bump(self, model: type[models.Model]) -> None:
+        """Record a change to *model* so every process reloads it."""
+        label = _label(model)
+        if not self._counters().filter(model=label).update(version=F("version") + 1):
+            try:
+                with transaction.atomic():
+                    self._counters().create(model=label, version=1)
+            except IntegrityError:
+                # Another process created the counter first
+                self._counters().filter(model=label).update(version=F("version") + 1)
+        with self._lock:
+            self._entries.pop(label, None)
+            self._bumps += 1
+            self._checked_at = -math.inf
+
+
+_cache: ConfigCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_config_cache() -> ConfigCache:
+    """Return the process-wide ConfigCache, configured from settings."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ConfigCache(settings.CONFIG_CACHE_CHECK_SECONDS)
+        return _cache
+
+
+def config_changed(model: type[models.Model]) -> None:
+    """Bump *model*'s counter once the current transaction commits.
+
+    Bumping earlier would let another process reload the old row under
+    the new counter and keep it until the next change.
+    """
+    transaction.on_commit(lambda: get_config_cache().bump(model))
@@ -0,0 +1,210 @@
+"""Server-sent events for the slideshow page (/api/events).
+
+Displays keep one EventSource open instead of polling /api/previews. Each
+ASGI worker process runs a single EventHub task that checks the feed
+cursor and ScreensaverConfig every EVENTS_POLL_SECONDS and fans the result
+out to all open streams, so the database sees the same two queries per
+second whether one display is connected or hundreds.
+
+The stream is a plain ASGI app mounted in screensaverbot/asgi.py rather
+than a Django view: Django 4.2 does not notice a client that disconnects
+from a streaming response, which would leave every closed stream running.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from typing import Any, Awaitable, Callable
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+from .image_index import feed_cursor
+from .models import ScreensaverConfig
+from .views import FEED_PAGE_SIZE, feed_delta
+
+logger = logging.getLogger(__name__)
+
+# ScreensaverConfig fields the page applies live
+CONFIG_FIELDS = (
+    "slideshow_interval_seconds",
+    "grid_fetch_interval_seconds",
+    "transition",
+    "transition_mode",
+    "playlist_strategy",
+)
+
+# Events buffered per stream; a stream that falls this far behind is closed
+# and the browser reconnects and resynchronises from the "hello" event.
+QUEUE_SIZE = 64
+
+# Reconnect delay (ms) suggested to EventSource
+RETRY_MS = 5000
+
+Event = tuple[str, dict[str, Any]]
+Scope = dict[str, Any]
+Receive = Callable[[], Awaitable[dict[str, Any]]]
+Send = Callable[[dict[str, Any]], Awaitable[None]]
+
+
+def config_payload() -> dict[str, Any]:
+    config = ScreensaverConfig.get()
+    return {field: getattr(config, field) for field in CONFIG_FIELDS}
+
+
+class EventHub:
+    """Polls for changes while streams are open and broadcasts them."""
+
+    def __init__(self, poll_interval: float) -> None:
+        self.poll_interval = poll_interval
+        self._queues: set[asyncio.Queue[Event | None]] = set()
+        self._task: asyncio.Task[None] | None = None
+        self._cursor: int | None = None
+        self._config: dict[str, Any] | None = None
+
+    def subscribe(self) -> asyncio.Queue[Event | None]:
+        queue: asyncio.Queue[Event | None] = asyncio.Queue(QUEUE_SIZE)
+        self._queues.add(queue)
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue[Event | None]) -> None:
+        self._queues.discard(queue)
+
+    async def hello(self) -> dict[str, Any]:
+        """Current cursor and config, sent first on every new stream."""
+        cursor, config = await sync_to_async(
+            lambda: (feed_cursor(), config_payload()), thread_sensitive=False)()
+        return {"cursor": cursor, "config": config}
+
+    async def _run(self) -> None:
+        logger.debug("EventHub: started")
+        while self._queues:
+            try:
+                # Not thread-sensitive: Django runs every sync view of this
+                # worker on one shared thread, and the poll must not queue behind them
+                events = await sync_to_async(self._poll, thread_sensitive=False)()
+            except Exception as exc:
+                logger.error("EventHub: poll failed: %s", exc, exc_info=True)
+                events = []
+            for event in events:
+                self._broadcast(event)
+            await asyncio.sleep(self.poll_interval)
+        # Start from the then-current state when the next stream opens
+        self._cursor = self._config = None
+        logger.debug("EventHub: stopped, no open streams")
+
+    def _broadcast(self, event: Event) -> None:
+        for queue in list(self._queues):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                logger.warning("EventHub: dropping a stream that fell %d events behind",
+                               QUEUE_SIZE)
+                self._queues.discard(queue)
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+
+    def _poll(self) -> list[Event]:
+        # Runs on executor threads outside Django's request cycle
+        close_old_connections()
+        events: list[Event] = []
+        head = feed_cursor()
+        if self._cursor is not None and head < self._cursor:
+            # The change log went backwards (database rebuilt): clients reload the feed
+            events.append(("feed", {"since": self._cursor, "cursor": head, "reset": True,
+                                    "added": [], "removed": []}))
+        elif self._cursor is not None:
+            while self._cursor < head:
+                delta = feed_delta(self._cursor, FEED_PAGE_SIZE)
+                delta.pop("complete")
+                if delta["cursor"] == self._cursor:
+                    break
+                events.append(("feed", {"since": self._cursor, **delta}))
+                self._cursor = delta["cursor"]
+        self._cursor = head
+
+        config = config_payload()
+        if self._config is not None and config != self._config:
+            events.append(("config", config))
+        self._config = config
+        return events
+
+
+def _format(name: str, data: dict[str, Any]) -> bytes:
+    return f"event: {name}\ndata: {json.dumps(data)}\n\n".encode()
+
+
+async def _body(send: Send, data: bytes, more: bool = True) -> None:
+    await send({"type": "http.response.body", "body": data, "more_body": more})
+
+
+async def events_app(scope: Scope, receive: Receive, send: Send) -> None:
+    """ASGI app streaming ``hello``, ``feed`` and ``config`` events.
+
+    ``hello`` carries the feed cursor and config when the stream opens;
+    ``feed`` events have the same shape as a /api/previews delta page plus
+    the ``since`` cursor they apply to; ``config`` events carry the
+    CONFIG_FIELDS of ScreensaverConfig. Comment lines keep idle streams
+    open through proxies.
+    """
+    if scope["method"] not in ("GET", "HEAD"):
+        await send({"type": "http.response.start", "status": 405,
+                    "headers": [(b"allow", b"GET, HEAD")]})
+        await _body(send, b"", more=False)
+        return
+
+    await send({"type": "http.response.start", "status": 200, "headers": [
+        (b"content-type", b"text/event-stream"),
+        (b"cache-control", b"no-cache"),
+        # Stop nginx from buffering the stream
+        (b"x-accel-buffering", b"no"),
+    ]})
+    if scope["method"] == "HEAD":
+        await _body(send, b"", more=False)
+        return
+
+    hub = get_hub()
+    queue = hub.subscribe()
+
+    async def wait_for_disconnect() -> None:
+        while (await receive())["type"] != "http.disconnect":
+            pass
+
+    disconnected = asyncio.ensure_future(wait_for_disconnect())
+    try:
+        await _body(send, f"retry: {RETRY_MS}\n\n".encode() + _format("hello", await hub.hello()))
+        while not disconnected.done():
+            get = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait({get, disconnected},
+                                         timeout=settings.EVENTS_KEEPALIVE_SECONDS,
+                                         return_when=asyncio.FIRST_COMPLETED)
+            if get not in done:
+                get.cancel()
+                if not disconnected.done():
+                    await _body(send, b": keepalive\n\n")
+                continue
+            event = get.result()
+            if event is None:
+                break
+            await _body(send, _format(*event))
+        if not disconnected.done():
+            await _body(send, b"", more=False)
+    finally:
+        hub.unsubscribe(queue)
+        disconnected.cancel()
+
+
+_hub: EventHub | None = None
+
+
+def get_hub() -> EventHub:
+    """Return the process-wide EventHub, configured from settings."""
+    global _hub
+    if _hub is None:
+        _hub = EventHub(settings.EVENTS_POLL_SECONDS)
+    return _hub
@@ -0,0 +1,172 @@
+"""Eviction policies: which images run_cleanup deletes first.
+
+A policy turns the bytes that must be freed into a stream of victims.
+Policies page through the index with keyset queries on indexed columns, so
+choosing victims costs O(victims), and they count the bytes they have
+yielded themselves, so a dry run that deletes nothing still terminates.
+"""
+from __future__ import annotations
+
+import heapq
+import logging
+from typing import Any, Iterator, NamedTuple
+
+from django.db.models import F, Q, QuerySet, Sum
+from django.db.models.functions import Coalesce
+
+from .models import CleanupConfig, Image
+
+logger = logging.getLogger(__name__)
+
+# Index rows fetched per query while choosing victims
+BATCH_SIZE = 100
+
+_TOTAL_SIZE = (
+    F("size_bytes") + F("preview_size_bytes")
+    + F("renditions_size_bytes") + F("alternates_size_bytes")
+)
+
+
+class Victim(NamedTuple):
+    filename: str
+    source: str
+    renditions: list[int]
+    size_bytes: int
+    reason: str
+
+
+def _pages(queryset: QuerySet[Image], key: str, size: int,
+           descending: bool = False) -> Iterator[list[tuple[Any, int, str, str, list[int], int]]]:
+    """Yield ``(key, id, filename, source, renditions, total bytes)`` rows in pages.
+
+    Rows come in ``(key, id)`` order, or ``(key descending, id)`` with
+    *descending*; each page starts after the last row of the previous one,
+    so rows deleted meanwhile do not shift the pages.
+    """
+    rows = queryset.annotate(total=_TOTAL_SIZE).order_by(f"-{key}" if descending else key, "id")
+    past = "lt" if descending else "gt"
+    last: tuple[Any, int] | None = None
+    while True:
+        page = rows
+        if last is not None:
+            page = rows.filter(Q(**{f"{key}__{past}": last[0]})
+                               | Q(**{key: last[0], "id__gt": last[1]}))
+        batch = list(page.values_list(key, "id", "filename", "source", "renditions",
+                                      "total")[:size])
+        if not batch:
+            return
+        yield batch
+        last = (batch[-1][0], batch[-1][1])
+
+
+def _victims(queryset: QuerySet[Image], key: str, reason: str,
+             descending: bool = False) -> Iterator[Victim]:
+    for batch in _pages(queryset, key, BATCH_SIZE, descending):
+        for _, _, filename, source, renditions, total in batch:
+            yield Victim(filename, source, renditions, total, reason)
+
+
+def _until_freed(victims: Iterator[Victim], excess: int) -> Iterator[Victim]:
+    freed = 0
+    for victim in victims:
+        if freed >= excess:
+            return
+        freed += victim.size_bytes
+        yield victim
+
+
+def oldest_first(config: CleanupConfig, excess: int) -> Iterator[Victim]:
+    """Delete in ingest order, oldest first."""
+    return _until_freed(_victims(Image.objects.all(), "created_at", "oldest"), excess)
+
+
+def least_recently_displayed(config: CleanupConfig, excess: int) -> Iterator[Victim]:
+    """Delete the images that have gone longest without being shown.
+
+    Images never displayed count from their ingest time, so fresh arrivals
+    are not evicted before they had a chance to appear.
+    """
+    queryset = Image.objects.annotate(shown_at=Coalesce("last_displayed_at", "created_at"))
+    return _until_freed(_victims(queryset, "shown_at", "least recently displayed"), excess)
+
+
+def size_weighted(config: CleanupConfig, excess: int) -> Iterator[Victim]:
+    """Delete the largest images first, the oldest first among equal sizes.
+
+    Ranks every image by its total bytes (image plus derived files) via the
+    image_total_size_idx index, so the few files that free the most space go
+    first however many images are stored; ids break ties in ingest order.
+    """
+    return _until_freed(_victims(Image.objects.all(), "total", "size-weighted", descending=True),
+                        excess)
+
+
+def source_quotas(config: CleanupConfig, excess: int) -> Iterator[Victim]:
+    """Enforce per-source quotas, then take from whichever source holds the most.
+
+    First every source above its ``CleanupConfig.source_quotas`` entry (MB)
+    loses its oldest images until it fits, even if the folder as a whole is
+    within the limit. Any remaining excess is taken one image at a time from
+    the source currently using the most bytes, so a chatty feed cannot push
+    out everything else.
+    """
+    usage: dict[str, int] = {
+        source: total or 0
+        for source, total in Image.objects.values_list("source").annotate(total=Sum(_TOTAL_SIZE))
+    }
+    streams: dict[str, Iterator[Victim]] = {}
+
+    def oldest_of(source: str, reason: str) -> Victim | None:
+        if source not in streams:
+            streams[source] = _victims(Image.objects.filter(source=source), "created_at", "")
+        victim = next(streams[source], None)
+        return victim._replace(reason=reason) if victim else None
+
+    freed = 0
+    for source, quota_mb in sorted(config.source_quotas.items()):
+        quota = int(float(quota_mb) * 1024 * 1024)
+        while usage.get(source, 0) > quota:
+            victim = oldest_of(source, f"over the {source!r} quota")
+            if victim is None:
+                break
+            usage[source] -= victim.size_bytes
+            freed += victim.size_bytes
+            yield victim
+
+    # Max-heap of (bytes used, source); each pop takes the biggest source's oldest image
+    heap = [(-used, source) for source, used in usage.items() if used > 0]
+    heapq.heapify(heap)
+    while freed < excess and heap:
+        _, source = heapq.heappop(heap)
+        victim = oldest_of(source, f"{source!r} is the largest source")
+        if victim is None:
+            continue
+        usage[source] -= victim.size_bytes
+        freed += victim.size_bytes
+        yield victim
+        if usage[source] > 0:
+            heapq.heappush(heap, (-usage[source], source))
+
+
+POLICIES = {
+    CleanupConfig.POLICY_OLDEST: oldest_first,
+    CleanupConfig.POLICY_SOURCE_QUOTA: source_quotas,
+    CleanupConfig.POLICY_LEAST_DISPLAYED: least_recently_displayed,
+    CleanupConfig.POLICY_SIZE_WEIGHTED: size_weighted,
+}
+
+
+def select_victims(config: CleanupConfig, excess: int,
+                   policy: str | None = None) -> Iterator[Victim]:
+    """Yield images to delete under *policy* (default: the configured one).
+
+    Stops once *excess* bytes are covered; the quota policy may also yield
+    victims while *excess* is zero or negative.
+    """
+    name = policy or config.eviction_policy
+    try:
+        fn = POLICIES[name]
+    except KeyError:
+        logger.warning("Unknown eviction policy %r, using oldest-first", name)
+        fn = oldest_first
+    return fn(config, excess)
@@ -0,0 +1,369 @@
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+from PIL import Image as PILImage, features
+
+from .models import Image, ImageChange, MediaUsage
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif"}
+
+# ImageChange rows older than this are pruned; clients with an older cursor
+# receive a full snapshot instead of a delta.
+CHANGE_RETENTION_DAYS = 7
+
+# Filenames written by the pipeline encode their UTC creation time
+_FILENAME_TIME_FORMAT = "%Y%m%d_%H%M%S_%f"
+
+
+# Only the most recent images are compared in perceptual-dedup mode
+PERCEPTUAL_WINDOW = 5000
+
+
+# Alternate encodings written next to every JPEG, in order of preference
+ALTERNATE_FORMATS: dict[str, str] = {"avif": "image/avif", "webp": "image/webp"}
+
+_alternate_formats: list[str] | None = None
+
+
+def rendition_path(width: int, filename: str) -> Path:
+    """Return where the *width*-pixel rendition of *filename* is stored."""
+    return Path(settings.MEDIA_ROOT) / "renditions" / str(width) / filename
+
+
+def rendition_widths_on_disk() -> list[int]:
+    """Return the widths that have a media/renditions/<width>/ directory."""
+    root = Path(settings.MEDIA_ROOT) / "renditions"
+    if not root.exists():
+        return []
+    return sorted(int(d.name) for d in root.iterdir() if d.is_dir() and d.name.isdigit())
+
+
+def alternate_formats() -> list[str]:
+    """Return the IMAGE_ALTERNATE_FORMATS this Pillow build can encode."""
+    global _alternate_formats
+    if _alternate_formats is None:
+        enabled = []
+        for fmt in settings.IMAGE_ALTERNATE_FORMATS:
+            if fmt not in ALTERNATE_FORMATS:
+                logger.warning("Unknown alternate image format %r ignored", fmt)
+            elif not features.check(fmt):
+                logger.warning("Pillow was built without %s support; not encoding it", fmt)
+            else:
+                enabled.append(fmt)
+        _alternate_formats = enabled
+    return _alternate_formats
+
+
+def alternate_path(fmt: str, relpath: str | Path) -> Path:
+    """Return where the *fmt* encoding of the media file *relpath* is stored.
+
+    ``images/x.jpg`` maps to ``<MEDIA_ROOT>/webp/images/x.webp``. Keeping the
+    alternates in a parallel tree leaves the images/ and previews/ listings
+    (which cleanup and rebuild_index scan) untouched.
+    """
+    return Path(settings.MEDIA_ROOT) / fmt / Path(relpath).with_suffix(f".{fmt}")
+
+
+def image_files(filename: str, renditions: list[int] | None = None) -> list[Path]:
+    """Return every file on disk belonging to *filename*, original first.
+
+    *renditions* limits the rendition widths looked at (e.g. to those
+    recorded in the index); by default every width on disk is checked.
+    """
+    if renditions is None:
+        renditions = rendition_widths_on_disk()
+    media_root = Path(settings.MEDIA_ROOT)
+    relpaths = [Path("images") / filename, Path("previews") / filename]
+    relpaths += [rendition_path(w, filename).relative_to(media_root) for w in renditions]
+    paths = [media_root / rel for rel in relpaths]
+    paths += [alternate_path(fmt, rel) for fmt in ALTERNATE_FORMATS for rel in relpaths]
+    return [path for path in paths if path.is_file()]
+
+
+def _alternates_size(*relpaths: str | Path) -> int:
+    total = 0
+    for fmt in ALTERNATE_FORMATS:
+        for rel in relpaths:
+            alt = alternate_path(fmt, rel)
+            if alt.is_file():
+                total += alt.stat().st_size
+    return total
+
+
+# MediaUsage directory → Image column holding that directory's bytes for a row
+_USAGE_FIELDS = {
+    MediaUsage.DIRECTORY_IMAGES: "size_bytes",
+    MediaUsage.DIRECTORY_PREVIEWS: "preview_size_bytes",
+    MediaUsage.DIRECTORY_RENDITIONS: "renditions_size_bytes",
+    MediaUsage.DIRECTORY_ALTERNATES: "alternates_size_bytes",
+}
+
+
+def _adjust_usage(deltas: dict[str, int]) -> None:
+    for directory, delta in deltas.items():
+        if delta:
+            MediaUsage.objects.filter(directory=directory).update(
+                size_bytes=F("size_bytes") + delta,
+            )
+
+
+def adjust_media_usage(directory: str, delta: int) -> None:
+    """Add *delta* bytes to the total of *directory*, for files without an Image row."""
+    _adjust_usage({directory: delta})
+
+
+def _row_sizes(filename: str) -> dict[str, int]:
+    row = Image.objects.filter(filename=filename).values(*_USAGE_FIELDS.values()).first()
+    return {d: row[f] for d, f in _USAGE_FIELDS.items()} if row else dict.fromkeys(_USAGE_FIELDS, 0)
+
+
+def media_usage() -> dict[str, int]:
+    """Return the running byte total of each media subdirectory."""
+    return dict(MediaUsage.objects.values_list("directory", "size_bytes"))
+
+
+def usage_reconciled_at() -> datetime | None:
+    """Return when the totals were last recounted from disk (None if never)."""
+    return (
+        MediaUsage.objects
+        .order_by(F("reconciled_at").asc(nulls_first=True))
+        .values_list("reconciled_at", flat=True)
+        .first()
+    )
+
+
+def _tree_size(root: Path) -> int:
+    if not root.exists():
+        return 0
+    return sum(f.stat().st_size for f in root.rglob("*") if f.is_file())
+
+
+def reconcile_usage() -> dict[str, int]:
+    """Recount every media subdirectory from disk and reset the running totals.
+
+    Corrects drift from files changed outside the pipeline or updates lost
+    to a crash. Writes made while the scan runs may be miscounted until the
+    next reconciliation. Returns the new totals.
+    """
+    media_root = Path(settings.MEDIA_ROOT)
+    totals = {
+        MediaUsage.DIRECTORY_IMAGES: _tree_size(media_root / "images"),
+        MediaUsage.DIRECTORY_PREVIEWS: _tree_size(media_root / "previews"),
+        MediaUsage.DIRECTORY_RENDITIONS: _tree_size(media_root / "renditions"),
+        MediaUsage.DIRECTORY_MOSAIC: _tree_size(media_root / "mosaic"),
+        MediaUsage.DIRECTORY_ALTERNATES: sum(
+            _tree_size(media_root / fmt) for fmt in ALTERNATE_FORMATS
+        ),
+    }
+    previous = media_usage()
+    now = timezone.now()
+    for directory, size in totals.items():
+        drift = size - previous.get(directory, 0)
+        if drift:
+            logger.info("reconcile_usage: %s was off by %+.1f KB", directory, drift / 1024)
+        fields = {"size_bytes": size, "reconciled_at": now}
+        if not MediaUsage.objects.filter(directory=directory).update(**fields):
+            MediaUsage.objects.create(directory=directory, **fields)
+    return totals
+
+
+def register_image(path: Path, *, source: str, width: int, height: int,
+                   content_hash: str = "", phash: str = "",
+                   renditions: list[int] | None = None) -> Image:
+    """Insert or refresh the index row for a freshly saved full-size image."""
+    renditions = sorted(renditions or [])
+    fields = {
+        "source": source,
+        "width": width,
+        "height": height,
+        "size_bytes": path.stat().st_size,
+        "renditions": renditions,
+        "renditions_size_bytes": sum(
+            rendition_path(w, path.name).stat().st_size for w in renditions
+        ),
+        "alternates_size_bytes": _alternates_size(
+            *(Path("renditions") / str(w) / path.name for w in renditions),
+        ),
+        "content_hash": content_hash,
+        "phash": phash,
+    }
+    old = _row_sizes(path.name)
+    # Plain UPDATE-then-INSERT rather than update_or_create(): a SELECT inside
+    # a transaction followed by a write can fail immediately with "database is
+    # locked" when several ingest threads share the SQLite file.
+    if Image.objects.filter(filename=path.name).update(**fields):
+        record = Image.objects.get(filename=path.name)
+    else:
+        record = Image.objects.create(filename=path.name, **fields)
+    _adjust_usage({d: fields.get(f, old[d]) - old[d] for d, f in _USAGE_FIELDS.items()})
+    logger.debug("register_image: indexed %s (source=%s)", path.name, source or "?")
+    return record
+
+
+def register_preview(path: Path, *, width: int, height: int) -> None:
+    """Record the dimensions and size of a generated preview."""
+    old = _row_sizes(path.name)
+    size = path.stat().st_size
+    alternates = _alternates_size(Path("previews") / path.name)
+    updated = Image.objects.filter(filename=path.name).update(
+        preview_width=width,
+        preview_height=height,
+        preview_size_bytes=size,
+        alternates_size_bytes=F("alternates_size_bytes") + alternates,
+    )
+    if not updated:
+        logger.debug("register_preview: %s is not indexed yet, skipping", path.name)
+        return
+    _adjust_usage({
+        MediaUsage.DIRECTORY_PREVIEWS: size - old[MediaUsage.DIRECTORY_PREVIEWS],
+        MediaUsage.DIRECTORY_ALTERNATES: alternates,
+    })
+    ImageChange.objects.create(filename=path.name, action=ImageChange.ACTION_ADDED)
+
+
+def find_duplicate(content_hash: str) -> Image | None:
+    """Return the indexed image whose source bytes hashed to *content_hash*, if any."""
+    return Image.objects.filter(content_hash=content_hash).first()
+
+
+def recent_phashes(limit: int = PERCEPTUAL_WINDOW) -> list[tuple[str, str]]:
+    """Return ``(filename, phash)`` for the *limit* most recent hashed images."""
+    return list(
+        Image.objects
+        .exclude(phash="")
+        .order_by("-created_at")
+        .values_list("filename", "phash")[:limit]
+    )
+
+
+def unregister_image(filename: str) -> int:
+    """Drop the index row for *filename* after its files were deleted.
+
+    Returns the number of bytes the row accounted for (0 if not indexed).
+    """
+    sizes = _row_sizes(filename)
+    deleted, _ = Image.objects.filter(filename=filename).delete()
+    if not deleted:
+        return 0
+    ImageChange.objects.create(filename=filename, action=ImageChange.ACTION_REMOVED)
+    _adjust_usage({d: -size for d, size in sizes.items()})
+    return sum(sizes.values())
+
+
+def feed_cursor() -> int:
+    """Return the id of the newest ImageChange, or 0 when the log is empty."""
+    latest = ImageChange.objects.order_by("-id").values_list("id", flat=True).first()
+    return latest or 0
+
+
+def oldest_cursor() -> int:
+    """Return the id of the oldest retained ImageChange, or 0 when the log is empty."""
+    oldest = ImageChange.objects.order_by("id").values_list("id", flat=True).first()
+    return oldest or 0
+
+
+def prune_changes(retention_days: int = CHANGE_RETENTION_DAYS) -> int:
+    """Delete ImageChange rows older than *retention_days*, always keeping the newest."""
+    head = feed_cursor()
+    cutoff = timezone.now() - timedelta(days=retention_days)
+    deleted, _ = ImageChange.objects.filter(created_at__lt=cutoff, id__lt=head).delete()
+    if deleted:
+        logger.info("prune_changes: removed %d change(s) older than %d day(s)",
+                    deleted, retention_days)
+    return deleted
+
+
+def _created_at_for(path: Path) -> datetime:
+    try:
+        return datetime.strptime(path.stem, _FILENAME_TIME_FORMAT).replace(tzinfo=dt_timezone.utc)
+    except ValueError:
+        return datetime.fromtimestamp(path.stat().st_mtime, tz=dt_timezone.utc)
+
+
+def _dimensions(path: Path) -> tuple[int, int]:
+    # Image.open only parses the header, so this is cheap even for large files.
+    try:
+        with PILImage.open(path) as img:
+            return img.size
+    except Exception:
+        logger.warning("rebuild_index: could not read dimensions of %s", path)
+        return 0, 0
+
+
+def rebuild_index() -> tuple[int, int, int]:
+    """Synchronise the Image table with the files in media/.
+
+    Returns a ``(added, updated, removed)`` tuple of row counts.
+    """
+    images_dir = Path(settings.MEDIA_ROOT) / "images"
+    previews_dir = Path(settings.MEDIA_ROOT) / "previews"
+
+    on_disk: dict[str, Path] = {}
+    if images_dir.exists():
+        on_disk = {
+            f.name: f for f in images_dir.iterdir()
+            if f.is_file() and f.suffix.lower() in IMAGE_EXTENSIONS
+        }
+
+    ladder = rendition_widths_on_disk()
+    existing: dict[str, Image] = {img.filename: img for img in Image.objects.all()}
+    to_create: list[Image] = []
+    to_update: list[Image] = []
+    changes: list[ImageChange] = []
+
+    for name, path in sorted(on_disk.items()):
+        record = existing.get(name) or Image(filename=name, created_at=_created_at_for(path))
+        had_preview = record.preview_size_bytes > 0
+        record.width, record.height = _dimensions(path)
+        record.size_bytes = path.stat().st_size
+        renditions = [(w, rendition_path(w, name)) for w in ladder]
+        renditions = [(w, p) for w, p in renditions if p.is_file()]
+        record.renditions = [w for w, _ in renditions]
+        record.renditions_size_bytes = sum(p.stat().st_size for _, p in renditions)
+        record.alternates_size_bytes = _alternates_size(
+            Path("images") / name,
+            Path("previews") / name,
+            *(p.relative_to(settings.MEDIA_ROOT) for _, p in renditions),
+        )
+
+        preview = previews_dir / name
+        if preview.is_file():
+            record.preview_width, record.preview_height = _dimensions(preview)
+            record.preview_size_bytes = preview.stat().st_size
+        else:
+            record.preview_width = record.preview_height = record.preview_size_bytes = 0
+
+        has_preview = record.preview_size_bytes > 0
+        if has_preview != had_preview:
+            action = ImageChange.ACTION_ADDED if has_preview else ImageChange.ACTION_REMOVED
+            changes.append(ImageChange(filename=name, action=action))
+
+        (to_update if record.pk else to_create).append(record)
+
+    Image.objects.bulk_create(to_create, batch_size=500)
+    Image.objects.bulk_update(
+        to_update,
+        ["width", "height", "size_bytes", "renditions", "renditions_size_bytes",
+         "alternates_size_bytes", "preview_width", "preview_height", "preview_size_bytes"],
+        batch_size=500,
+    )
+    ImageChange.objects.bulk_create(changes, batch_size=500)
+
+    stale = [name for name in existing if name not in on_disk]
+    for name in stale:
+        unregister_image(name)
+
+    # The rows were rewritten wholesale; recount the totals to match
+    reconcile_usage()
+
+    logger.info("rebuild_index: %d added, %d updated, %d removed",
+                len(to_create), len(to_update), len(stale))
+    return len(to_create), len(to_update), len(stale)
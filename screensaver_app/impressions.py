@@ -0,0 +1,175 @@
+"""In-memory aggregation of slideshow impression beacons.
+
+Displays report every slide they show. Writing each report would mean one
+SQLite write per slide per display, so beacons are folded into per-image and
+per-display counters here and written by a background thread every
+IMPRESSION_FLUSH_SECONDS, one UPDATE per table per flush.
+"""
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Greatest
+
+from .models import Display, Image
+
+logger = logging.getLogger(__name__)
+
+# Rows per UPDATE ... CASE statement; keeps SQLite's parameter count bounded
+FLUSH_CHUNK_SIZE = 200
+
+
+@dataclass
+class Tally:
+    count: int
+    last_seen: datetime
+
+
+def _merge(tallies: dict[str, Tally], key: str, seen_at: datetime) -> None:
+    tally = tallies.get(key)
+    if tally is None:
+        tallies[key] = Tally(1, seen_at)
+    else:
+        tally.count += 1
+        tally.last_seen = max(tally.last_seen, seen_at)
+
+
+def _counter_update(tallies: dict[str, Tally], key_field: str, count_field: str,
+                    seen_field: str) -> dict[str, object]:
+    """Build ``.update()`` kwargs adding each tally's count and raising its timestamp."""
+    counts = Case(*(When(**{key_field: key}, then=Value(t.count)) for key, t in tallies.items()),
+                  default=Value(0))
+    seen = Case(*(When(**{key_field: key}, then=Value(t.last_seen)) for key, t in tallies.items()))
+    return {
+        count_field: F(count_field) + counts,
+        # Greatest() is NULL when either side is NULL, so handle first sightings apart
+        seen_field: Case(
+            When(**{f"{seen_field}__isnull": True}, then=seen),
+            default=Greatest(F(seen_field), seen),
+        ),
+    }
+
+
+class ImpressionAggregator:
+    """Collects impressions in memory and flushes them to the DB in bulk.
+
+    record() only takes a lock and bumps two dict entries. A daemon thread
+    (started lazily, restarted after a fork) calls flush() every
+    *flush_interval* seconds; flush() is also run at interpreter exit.
+    """
+
+    def __init__(self, flush_interval: float) -> None:
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._images: dict[str, Tally] = {}
+        self._displays: dict[str, Tally] = {}
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._pid = 0
+
+    def record(self, display_id: str, impressions: list[tuple[str, datetime]]) -> None:
+        """Count *impressions* (``(filename, shown_at)`` pairs) from *display_id*."""
+        with self._lock:
+            for filename, shown_at in impressions:
+                _merge(self._images, filename, shown_at)
+                _merge(self._displays, display_id, shown_at)
+        self._ensure_writer()
+
+    def _ensure_writer(self) -> None:
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="impression-writer",
+                                            daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as exc:
+                logger.error("Impression flush failed: %s", exc, exc_info=True)
+            finally:
+                connection.close()
+
+    def flush(self) -> tuple[int, int]:
+        """Write the pending counters now. Returns ``(images, displays)`` updated.
+
+        Pending counts are swapped out before writing; if the write fails
+        they are merged back so the next flush retries them.
+        """
+        with self._lock:
+            images, self._images = self._images, {}
+            displays, self._displays = self._displays, {}
+        if not images and not displays:
+            return 0, 0
+
+        try:
+            with transaction.atomic():
+                for chunk in _chunks(images):
+                    Image.objects.filter(filename__in=list(chunk)).update(
+                        **_counter_update(chunk, "filename", "display_count",
+                                          "last_displayed_at"))
+                known: set[str] = set()
+                for chunk in _chunks(displays):
+                    Display.objects.filter(display_id__in=list(chunk)).update(
+                        **_counter_update(chunk, "display_id", "impressions", "last_seen_at"))
+                    known.update(Display.objects.filter(display_id__in=list(chunk))
+                                 .values_list("display_id", flat=True))
+                Display.objects.bulk_create([
+                    Display(display_id=key, impressions=t.count, first_seen_at=t.last_seen,
+                            last_seen_at=t.last_seen)
+                    for key, t in displays.items() if key not in known
+                ], ignore_conflicts=True)
+        except Exception:
+            with self._lock:
+                for pending, failed in ((self._images, images), (self._displays, displays)):
+                    for key, tally in failed.items():
+                        current = pending.setdefault(key, Tally(0, tally.last_seen))
+                        current.count += tally.count
+                        current.last_seen = max(current.last_seen, tally.last_seen)
+            raise
+
+        logger.debug("Impressions flushed: %d image(s), %d display(s)",
+                     len(images), len(displays))
+        return len(images), len(displays)
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread is not None and self._pid == os.getpid():
+            self._thread.join(timeout=self.flush_interval + 1)
+        try:
+            self.flush()
+        except Exception as exc:
+            logger.error("Impression flush at exit failed: %s", exc)
+
+
+def _chunks(tallies: dict[str, Tally]) -> list[dict[str, Tally]]:
+    items = list(tallies.items())
+    return [dict(items[i:i + FLUSH_CHUNK_SIZE]) for i in range(0, len(items), FLUSH_CHUNK_SIZE)]
+
+
+_aggregator: ImpressionAggregator | None = None
+_aggregator_lock = threading.Lock()
+
+
+def get_aggregator() -> ImpressionAggregator:
+    """Return the process-wide ImpressionAggregator, configured from settings."""
+    global _aggregator
+    with _aggregator_lock:
+        if _aggregator is None:
+            _aggregator = ImpressionAggregator(settings.IMPRESSION_FLUSH_SECONDS)
+            atexit.register(_aggregator.close)
+        return _aggregator
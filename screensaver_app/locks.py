@@ -0,0 +1,32 @@
+"""Advisory file locks shared by every process that mounts the same media folder.
+
+The web server, ingest worker, poller and scheduler run as separate
+processes (and containers), so a threading.Lock cannot keep them from
+running the same job at once. Uses fcntl.flock, so this module is POSIX-only.
+"""
+from __future__ import annotations
+
+import fcntl
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+
+@contextmanager
+def file_lock(path: Path, blocking: bool = True) -> Iterator[bool]:
+    """Hold an exclusive lock on *path* for the duration of the block.
+
+    Yields True once the lock is held. With *blocking* False it yields False
+    straight away when another process or thread holds it.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a") as fh:
+        try:
+            fcntl.flock(fh, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
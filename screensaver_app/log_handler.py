@@ -1,7 +1,10 @@
 from __future__ import annotations
 
 import logging
+import os
+import queue
 import threading
+from datetime import datetime, timezone
 
 _local = threading.local()
 
@@ -23,6 +26,7 @@ class DatabaseLogHandler(logging.Handler):
 
             AppLog = apps.get_model("screensaver_app", "AppLog")
             AppLog.objects.create(
+                timestamp=datetime.fromtimestamp(record.created, tz=timezone.utc),
                 level=record.levelname,
                 logger_name=record.name,
                 message=self.format(record),
@@ -31,3 +35,136 @@ class DatabaseLogHandler(logging.Handler):
             pass  # never let logging failures crash the app
         finally:
             _local.emitting = False
+
+
+class BufferedDatabaseLogHandler(logging.Handler):
+    """Queue-backed AppLog handler that writes in batches from a background thread.
+
+    emit() only formats the record and appends it to a bounded in-memory
+    queue, so logging never waits on the SQLite write lock. A daemon writer
+    thread flushes the queue with ``bulk_create`` whenever *batch_size*
+    records are waiting or *flush_interval* seconds have passed. When the
+    queue is full new records are dropped and counted; the count is written
+    as a WARNING row with the next batch. close() (called by logging at
+    interpreter shutdown) flushes whatever is still buffered.
+    """
+
+    def __init__(self, level: int = logging.NOTSET, batch_size: int = 200,
+                 flush_interval: float = 2.0, max_buffer: int = 10_000) -> None:
+        super().__init__(level)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._queue: queue.Queue[tuple[float, str, str, str]] = queue.Queue(maxsize=max_buffer)
+        self._write_lock = threading.Lock()
+        # Never held during database I/O, so emit() cannot block on a slow write
+        self._dropped_lock = threading.Lock()
+        self._batch_ready = threading.Event()
+        # Records the writer has taken off the queue but not yet written
+        self._held = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._pid = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if getattr(_local, "emitting", False):
+            return
+        try:
+            entry = (record.created, record.levelname, record.name, self.format(record))
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+        except Exception:
+            return  # never let logging failures crash the app
+        if self._queue.qsize() + self._held >= self.batch_size:
+            self._batch_ready.set()
+        self._ensure_writer()
+
+    def _ensure_writer(self) -> None:
+        # Started lazily, and restarted after a fork (e.g. gunicorn workers),
+        # because threads do not survive into child processes.
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self.lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="db-log-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        _local.emitting = True
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            # Write once a full batch is waiting or flush_interval after the first record
+            self._held = 1
+            self._batch_ready.clear()
+            if self._queue.qsize() + 1 < self.batch_size:
+                self._batch_ready.wait(self.flush_interval)
+            self._write([first])
+            self._held = 0
+
+    def _drain(self, batch: list[tuple[float, str, str, str]]) -> None:
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+
+    def _write(self, batch: list[tuple[float, str, str, str]]) -> None:
+        with self._write_lock:
+            self._drain(batch)
+            with self._dropped_lock:
+                dropped, self.dropped = self.dropped, 0
+            if not batch and not dropped:
+                return
+
+            was_emitting = getattr(_local, "emitting", False)
+            _local.emitting = True
+            try:
+                from django.apps import apps  # lazy import — avoids AppRegistryNotReady
+                from django.db import connection
+
+                AppLog = apps.get_model("screensaver_app", "AppLog")
+                rows = [
+                    AppLog(
+                        timestamp=datetime.fromtimestamp(created, tz=timezone.utc),
+                        level=level,
+                        logger_name=name,
+                        message=message,
+                    )
+                    for created, level, name, message in batch
+                ]
+                if dropped:
+                    rows.append(AppLog(
+                        level="WARNING",
+                        logger_name=__name__,
+                        message=f"Log buffer full: dropped {dropped} record(s)",
+                    ))
+                try:
+                    AppLog.objects.bulk_create(rows)
+                except Exception:
+                    # Drop the broken connection so the next batch reconnects
+                    connection.close()
+            except Exception:
+                pass  # never let logging failures crash the app
+            finally:
+                _local.emitting = was_emitting
+
+    def flush(self) -> None:
+        """Write every buffered record now, on the calling thread."""
+        while not self._queue.empty() or self.dropped:
+            self._write([])
+
+    def close(self) -> None:
+        self._stop.set()
+        self._batch_ready.set()
+        if self._thread is not None and self._pid == os.getpid():
+            self._thread.join(timeout=self.flush_interval + 1)
+        self.flush()
+        super().close()
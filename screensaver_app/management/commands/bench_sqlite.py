@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import multiprocessing
+import shutil
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+from screensaver_app.db import sqlite_pragmas
+
+# SQLite defaults before screensaver_app.db; 5 s is Python's default timeout
+_BASELINE = [
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA journal_mode=delete",
+    "PRAGMA synchronous=full",
+]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bench_log (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp REAL NOT NULL,
+    level TEXT NOT NULL,
+    logger_name TEXT NOT NULL,
+    message TEXT NOT NULL
+)
+"""
+
+
+def _connect(path: str, pragmas: list[str]) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, timeout=0, isolation_level=None)
+    for pragma in pragmas:
+        conn.execute(pragma)
+    return conn
+
+
+def _writer(path: str, pragmas: list[str], start: float, stop: float) -> tuple[int, int]:
+    """Insert one log row per transaction, like AppLog writes. Returns (ok, locked)."""
+    conn = _connect(path, pragmas)
+    ok = locked = 0
+    time.sleep(max(start - time.time(), 0))
+    while time.time() < stop:
+        try:
+            conn.execute(
+                "INSERT INTO bench_log (timestamp, level, logger_name, message) "
+                "VALUES (?, 'INFO', 'bench', ?)",
+                (time.time(), "x" * 120),
+            )
+            ok += 1
+        except sqlite3.OperationalError:
+            locked += 1
+    conn.close()
+    return ok, locked
+
+
+def _reader(path: str, pragmas: list[str], start: float, stop: float) -> tuple[int, int]:
+    """Read the newest rows, like the admin log list. Returns (ok, locked)."""
+    conn = _connect(path, pragmas)
+    ok = locked = 0
+    time.sleep(max(start - time.time(), 0))
+    while time.time() < stop:
+        try:
+            conn.execute("SELECT id, level, message FROM bench_log "
+                         "ORDER BY id DESC LIMIT 50").fetchall()
+            ok += 1
+        except sqlite3.OperationalError:
+            locked += 1
+    conn.close()
+    return ok, locked
+
+
+class Command(BaseCommand):
+    help = ("Measure concurrent SQLite writer/reader throughput with the previous "
+            "defaults and with the configured journal/synchronous/busy_timeout settings.")
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--writers", type=int, default=3,
+                            help="Writer processes (default 3: web, ingest_worker, scheduler).")
+        parser.add_argument("--readers", type=int, default=4, help="Reader processes.")
+        parser.add_argument("--seconds", type=float, default=5.0, help="Duration of each run.")
+        parser.add_argument(
+            "--dir",
+            help="Directory for the scratch database (default: next to the real database, "
+                 "so the same filesystem is measured).",
+        )
+
+    def handle(self, *args: object, **options: object) -> None:
+        base = Path(str(options["dir"] or Path(settings.DATABASES["default"]["NAME"]).parent))
+        writers, readers = int(options["writers"]), int(options["readers"])
+        seconds = float(options["seconds"])
+
+        runs = [("before", _BASELINE), ("after", sqlite_pragmas())]
+        self.stdout.write(f"{writers} writer(s), {readers} reader(s), {seconds:g} s per run\n")
+        self.stdout.write(f"{'run':<8}{'journal':<10}{'sync':<8}{'writes/s':>10}"
+                          f"{'reads/s':>10}{'locked':>8}")
+        for name, pragmas in runs:
+            scratch = Path(tempfile.mkdtemp(prefix="bench_sqlite_", dir=base))
+            try:
+                writes, reads, locked = self._run(str(scratch / "bench.sqlite3"), pragmas,
+                                                  writers, readers, seconds)
+            finally:
+                shutil.rmtree(scratch, ignore_errors=True)
+            values = dict(p.removeprefix("PRAGMA ").split("=") for p in pragmas)
+            journal, sync = values["journal_mode"], values["synchronous"]
+            self.stdout.write(f"{name:<8}{journal:<10}{sync:<8}{writes / seconds:>10.0f}"
+                              f"{reads / seconds:>10.0f}{locked:>8}")
+
+    @staticmethod
+    def _run(path: str, pragmas: list[str], writers: int, readers: int,
+             seconds: float) -> tuple[int, int, int]:
+        conn = _connect(path, pragmas)
+        conn.execute(_SCHEMA)
+        conn.close()
+
+        # Separate processes, like the containers sharing the real database
+        ctx = multiprocessing.get_context("spawn")
+        with ctx.Pool(writers + readers) as pool:
+            start = time.time() + 2.0  # leave time for the workers to start
+            stop = start + seconds
+            pending = (
+                [pool.apply_async(_writer, (path, pragmas, start, stop)) for _ in range(writers)],
+                [pool.apply_async(_reader, (path, pragmas, start, stop)) for _ in range(readers)],
+            )
+            results = [[p.get() for p in group] for group in pending]
+        locked = sum(n for group in results for _, n in group)
+        return sum(ok for ok, _ in results[0]), sum(ok for ok, _ in results[1]), locked
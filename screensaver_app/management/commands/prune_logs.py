@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import logging
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from screensaver_app.services import prune_logs
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Delete AppLog entries older than the per-level retention in LogRetentionConfig."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--chunk-size", type=int, default=1000,
+            help="Rows deleted per transaction (keeps each SQLite write lock short).",
+        )
+        parser.add_argument(
+            "--pause", type=float, default=0.05,
+            help="Seconds to sleep between chunks so other writers can get the lock.",
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true",
+            help="Only report how many entries would be deleted.",
+        )
+
+    def handle(self, *args: object, **options: object) -> None:
+        result = prune_logs(
+            chunk_size=max(1, int(options["chunk_size"])),
+            pause=float(options["pause"]),
+            dry_run=bool(options["dry_run"]),
+        )
+        verb = "would delete" if options["dry_run"] else "deleted"
+        summary = ", ".join(f"{level}={count}" for level, count in result.items()) or "nothing"
+        self.stdout.write(f"prune_logs {verb}: {summary}")
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import logging
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from screensaver_app.image_index import rebuild_index
+from screensaver_app.models import Image
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Rebuild the Image index table from the files in media/images/ and media/previews/."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--if-empty", action="store_true",
+            help="Only rebuild when the Image table has no rows, e.g. right after upgrading.",
+        )
+
+    def handle(self, *args: object, **options: object) -> None:
+        if options["if_empty"] and Image.objects.exists():
+            self.stdout.write("Image index already populated, skipping rebuild")
+            return
+        logger.info("rebuild_image_index command started")
+        added, updated, removed = rebuild_index()
+        self.stdout.write(
+            f"Image index rebuilt: {added} added, {updated} updated, {removed} removed"
+        )
@@ -2,18 +2,32 @@ from __future__ import annotations
 
 import logging
 
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandParser
 from django.utils import timezone
 
+from screensaver_app.eviction import POLICIES
 from screensaver_app.services import run_cleanup
 
 logger = logging.getLogger(__name__)
 
 
 class Command(BaseCommand):
-    help = "Delete oldest images when media/images/ exceeds the configured size limit."
+    help = "Delete images when the media folder exceeds the configured size limit."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--policy", choices=sorted(POLICIES),
+            help="Eviction policy to use instead of the one in CleanupConfig.",
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true",
+            help="Only report which images would be deleted and how much would be freed.",
+        )
 
     def handle(self, *args: object, **options: object) -> None:
         logger.info("run_cleanup command started at %s", timezone.now().isoformat())
-        run_cleanup()
+        result = run_cleanup(dry_run=bool(options["dry_run"]), policy=options["policy"])
+        verb = "would delete" if options["dry_run"] else "deleted"
+        self.stdout.write(f"run_cleanup {verb}: {result['images']} image(s), "
+                          f"{result['bytes'] / 1024 / 1024:.1f} MB")
         logger.info("run_cleanup command finished")
@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import mimetypes
+import re
+from pathlib import Path
+from typing import AsyncIterator, BinaryIO, Iterator
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, Http404, HttpRequest, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+from .image_index import ALTERNATE_FORMATS, alternate_path
+
+logger = logging.getLogger(__name__)
+
+# Older Pythons do not know these types
+mimetypes.add_type("image/webp", ".webp")
+mimetypes.add_type("image/avif", ".avif")
+
+_NEGOTIATED_SUFFIXES = {".jpg", ".jpeg"}
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+_CHUNK_SIZE = 64 * 1024
+
+
+def _accepted_types(accept: str) -> set[str]:
+    """Return the media types in an Accept header that are not refused with q=0."""
+    accepted = set()
+    for part in accept.split(","):
+        media_type, *params = (p.strip() for p in part.split(";"))
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if media_type and quality > 0:
+            accepted.add(media_type.lower())
+    return accepted
+
+
+def negotiate(path: str, accept: str) -> str:
+    """Return the relative media path to serve for *path* given an Accept header.
+
+    JPEGs with a WebP/AVIF alternate on disk are swapped for the most
+    preferred format the client explicitly accepts (``*/*`` alone does not
+    count, since older browsers send it but cannot decode AVIF). Anything
+    else is served as requested, including paths that could leave MEDIA_ROOT
+    (absolute or containing ``..``), which _serve_file() then refuses.
+    """
+    requested = Path(path)
+    if (requested.suffix.lower() not in _NEGOTIATED_SUFFIXES
+            or requested.is_absolute() or ".." in requested.parts):
+        return path
+    accepted = _accepted_types(accept)
+    for fmt, media_type in ALTERNATE_FORMATS.items():
+        if media_type in accepted:
+            alt = alternate_path(fmt, path)
+            if alt.is_file():
+                return alt.relative_to(settings.MEDIA_ROOT).as_posix()
+    return path
+
+
+def parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """Return the inclusive ``(start, end)`` of a single-range Range header.
+
+    Returns None when the header should be ignored (absent, malformed or
+    multi-range; the full file is sent instead). Raises ValueError when the
+    range cannot be satisfied.
+    """
+    match = _RANGE_RE.match(header.strip())
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the final N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError("empty suffix range")
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(f"range {header!r} not satisfiable for {size} bytes")
+    return start, end
+
+
+def _if_range_matches(request: HttpRequest, etag: str, mtime: int) -> bool:
+    if_range = request.headers.get("If-Range", "").strip()
+    if not if_range:
+        return True
+    if if_range.startswith(('"', "W/")):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == mtime
+
+
+def _read_range(fh: BinaryIO, start: int, length: int) -> Iterator[bytes]:
+    with fh:
+        fh.seek(start)
+        while length > 0:
+            chunk = fh.read(min(_CHUNK_SIZE, length))
+            if not chunk:
+                return
+            length -= len(chunk)
+            yield chunk
+
+
+async def _aread_range(path: Path, start: int, length: int) -> AsyncIterator[bytes]:
+    # Under ASGI Django would read a synchronous iterator into memory whole
+    # before sending it, so reads are handed to a thread one chunk at a time.
+    fh = await asyncio.to_thread(path.open, "rb")
+    try:
+        await asyncio.to_thread(fh.seek, start)
+        while length > 0:
+            chunk = await asyncio.to_thread(fh.read, min(_CHUNK_SIZE, length))
+            if not chunk:
+                return
+            length -= len(chunk)
+            yield chunk
+    finally:
+        fh.close()
+
+
+def _stream(request: HttpRequest, path: Path, start: int,
+            length: int) -> Iterator[bytes] | AsyncIterator[bytes]:
+    if isinstance(request, ASGIRequest):
+        return _aread_range(path, start, length)
+    return _read_range(path.open("rb"), start, length)
+
+
+def _sendfile_headers(relpath: str, fullpath: Path) -> dict[str, str] | None:
+    mode = settings.MEDIA_SENDFILE_MODE
+    if mode == "x-accel-redirect":
+        return {"X-Accel-Redirect": settings.MEDIA_ACCEL_PREFIX.rstrip("/") + "/" + quote(relpath)}
+    if mode == "x-sendfile":
+        return {"X-Sendfile": str(fullpath)}
+    return None
+
+
+def _serve_file(request: HttpRequest, relpath: str) -> HttpResponse:
+    try:
+        fullpath = Path(safe_join(settings.MEDIA_ROOT, relpath))
+    except SuspiciousFileOperation:
+        raise Http404("Not found")
+    try:
+        stat = fullpath.stat()
+    except OSError:
+        raise Http404("Not found")
+    if not fullpath.is_file():
+        raise Http404("Not found")
+
+    mtime = int(stat.st_mtime)
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    content_type = mimetypes.guess_type(fullpath.name)[0] or "application/octet-stream"
+    headers = {
+        "Cache-Control": f"public, max-age={settings.MEDIA_CACHE_MAX_AGE}, immutable",
+        "ETag": etag,
+        "Last-Modified": http_date(mtime),
+        "Accept-Ranges": "bytes",
+    }
+
+    base = HttpResponse(headers=headers)
+    conditional = get_conditional_response(request, etag=etag, last_modified=mtime,
+                                           response=base)
+    if conditional is not base:
+        return conditional
+
+    sendfile = _sendfile_headers(relpath, fullpath)
+    if sendfile is not None:
+        # The proxy reads the file and handles Range itself
+        return HttpResponse(content_type=content_type, headers={**headers, **sendfile})
+
+    try:
+        byte_range = parse_range(request.headers.get("Range", ""), stat.st_size)
+    except ValueError:
+        return HttpResponse(status=416, headers={**headers,
+                                                 "Content-Range": f"bytes */{stat.st_size}"})
+
+    if byte_range is not None and _if_range_matches(request, etag, mtime):
+        start, end = byte_range
+        length = end - start + 1
+        return StreamingHttpResponse(
+            _stream(request, fullpath, start, length),
+            status=206,
+            content_type=content_type,
+            headers={**headers,
+                     "Content-Range": f"bytes {start}-{end}/{stat.st_size}",
+                     "Content-Length": str(length)},
+        )
+
+    if isinstance(request, ASGIRequest):
+        return StreamingHttpResponse(_stream(request, fullpath, 0, stat.st_size),
+                                     content_type=content_type,
+                                     headers={**headers, "Content-Length": str(stat.st_size)})
+
+    # FileResponse lets the WSGI server use os.sendfile() via wsgi.file_wrapper
+    response = FileResponse(fullpath.open("rb"), content_type=content_type)
+    for name, value in headers.items():
+        response[name] = value
+    response["Content-Length"] = str(stat.st_size)
+    return response
+
+
+@require_safe
+def serve_media(request: HttpRequest, path: str) -> HttpResponse:
+    """Serve a file from MEDIA_ROOT for long-term browser caching.
+
+    Picks a WebP/AVIF encoding the client accepts (see negotiate()), marks
+    responses immutable, answers conditional requests with 304 and single
+    byte ranges with 206. With MEDIA_SENDFILE_MODE set the body is left to
+    the front proxy via X-Accel-Redirect or X-Sendfile.
+    """
+    chosen = negotiate(path, request.headers.get("Accept", ""))
+    if chosen != path:
+        logger.debug("serve_media: %s → %s", path, chosen)
+    response = _serve_file(request, chosen)
+    if Path(path).suffix.lower() in _NEGOTIATED_SUFFIXES:
+        # Caches must key on Accept, or a WebP could be replayed to a JPEG-only client
+        patch_vary_headers(response, ("Accept",))
+    return response
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:23
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('screensaver_app', '0002_applog'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Image',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('filename', models.CharField(max_length=100, unique=True)),
+                ('source', models.CharField(blank=True, help_text="Where the image came from, e.g. 'telegram' or 'http:<source name>'.", max_length=200)),
+                ('width', models.PositiveIntegerField(default=0)),
+                ('height', models.PositiveIntegerField(default=0)),
+                ('size_bytes', models.PositiveBigIntegerField(default=0)),
+                ('preview_width', models.PositiveIntegerField(default=0)),
+                ('preview_height', models.PositiveIntegerField(default=0)),
+                ('preview_size_bytes', models.PositiveBigIntegerField(default=0, help_text='Zero while no preview has been generated.')),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Image',
+                'verbose_name_plural': 'Images',
+                'ordering': ['created_at'],
+            },
+        ),
+        migrations.AlterField(
+            model_name='screensaverconfig',
+            name='transition',
+            field=models.CharField(choices=[('burn', 'Burn'), ('fade', 'Fade'), ('slide', 'Slide'), ('zoom', 'Zoom'), ('blur', 'Blur'), ('flip', 'Flip'), ('wipe-up', 'Wipe Up'), ('wipe-down', 'Wipe Down'), ('iris', 'Iris'), ('newspaper', 'Newspaper'), ('glitch', 'Glitch'), ('squeeze', 'Squeeze')], default='burn', help_text="Transition effect used when transition_mode is 'fixed'.", max_length=20),
+        ),
+    ]
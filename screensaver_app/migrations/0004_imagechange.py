@@ -0,0 +1,27 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('screensaver_app', '0003_image'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('filename', models.CharField(max_length=100)),
+                ('action', models.CharField(choices=[('added', 'Added'), ('removed', 'Removed')], max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Image Change',
+                'verbose_name_plural': 'Image Changes',
+                'ordering': ['id'],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:25
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('screensaver_app', '0004_imagechange'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='applog',
+            name='timestamp',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('screensaver_app', '0005_applog_timestamp_default'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LogRetentionConfig',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('debug_days', models.PositiveIntegerField(default=3, help_text='Days to keep DEBUG entries; 0 keeps them forever.')),
+                ('info_days', models.PositiveIntegerField(default=14, help_text='Days to keep INFO entries; 0 keeps them forever.')),
+                ('warning_days', models.PositiveIntegerField(default=30, help_text='Days to keep WARNING entries; 0 keeps them forever.')),
+                ('error_days', models.PositiveIntegerField(default=90, help_text='Days to keep ERROR entries; 0 keeps them forever.')),
+                ('critical_days', models.PositiveIntegerField(default=90, help_text='Days to keep CRITICAL entries; 0 keeps them forever.')),
+                ('archive_enabled', models.BooleanField(default=False, help_text='Write pruned entries to gzip-compressed JSON-lines files in logs/archive/.')),
+            ],
+            options={
+                'verbose_name': 'Log Retention Configuration',
+                'verbose_name_plural': 'Log Retention Configuration',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='applog',
+            index=models.Index(fields=['level', 'timestamp'], name='screensaver_level_676f9a_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('screensaver_app', '0006_logretention'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='cleanupconfig',
+            name='cleanup_interval_seconds',
+            field=models.PositiveIntegerField(default=3600, help_text='How often (seconds) run_scheduler enforces the size limit.'),
+        ),
+    ]
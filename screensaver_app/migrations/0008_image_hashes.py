@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('screensaver_app', '0007_cleanup_interval_help'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='image',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, help_text='SHA-256 of the bytes as received, before decoding; used to skip duplicates.', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='image',
+            name='phash',
+            field=models.CharField(blank=True, help_text='64-bit difference hash (hex) for near-duplicate detection.', max_length=16),
+        ),
+    ]
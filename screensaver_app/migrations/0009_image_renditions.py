@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('screensaver_app', '0008_image_hashes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='image',
+            name='renditions',
+            field=models.JSONField(blank=True, default=list, help_text='Widths of the downscaled copies stored in media/renditions/<width>/.'),
+        ),
+        migrations.AddField(
+            model_name='image',
+            name='renditions_size_bytes',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
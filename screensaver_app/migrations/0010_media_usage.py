@@ -0,0 +1,45 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:40
+
+from django.db import migrations, models
+
+
+def create_usage_rows(apps, schema_editor):
+    # reconciled_at stays empty so the first run_cleanup recounts from disk
+    MediaUsage = apps.get_model("screensaver_app", "MediaUsage")
+    for directory in ("images", "previews", "renditions", "alternates"):
+        MediaUsage.objects.get_or_create(directory=directory)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('screensaver_app', '0009_image_renditions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('directory', models.CharField(choices=[('images', 'media/images/'), ('previews', 'media/previews/'), ('renditions', 'media/renditions/'), ('alternates', 'WebP/AVIF copies')], max_length=20, unique=True)),
+                ('size_bytes', models.BigIntegerField(default=0)),
+                ('reconciled_at', models.DateTimeField(blank=True, help_text='When the total was last recounted from disk.', null=True)),
+            ],
+            options={
+                'verbose_name': 'Media Usage',
+                'verbose_name_plural': 'Media Usage',
+                'ordering': ['directory'],
+            },
+        ),
+        migrations.AddField(
+            model_name='image',
+            name='alternates_size_bytes',
+            field=models.PositiveBigIntegerField(default=0, help_text='Total size of the WebP/AVIF copies of the image, renditions and preview.'),
+        ),
+        migrations.AlterField(
+            model_name='cleanupconfig',
+            name='max_folder_size_mb',
+            field=models.PositiveIntegerField(default=500, help_text='Maximum total size in megabytes of the images with their previews, renditions and WebP/AVIF copies.'),
+        ),
+        migrations.RunPython(create_usage_rows, migrations.RunPython.noop),
+    ]
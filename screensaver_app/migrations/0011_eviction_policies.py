@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:43
+
+from django.db import migrations, models
+import django.db.models.functions.comparison
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('screensaver_app', '0010_media_usage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cleanupconfig',
+            name='eviction_policy',
+            field=models.CharField(choices=[('oldest', 'Oldest first'), ('source_quota', 'Per-source quotas, then largest source first'), ('least_displayed', 'Least recently displayed'), ('size_weighted', 'Size-weighted (large and old first)')], default='oldest', help_text='Which images are deleted first when the size limit is exceeded.', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='cleanupconfig',
+            name='source_quotas',
+            field=models.JSONField(blank=True, default=dict, help_text='Per-source limits in MB for the per-source quota policy, e.g. {"telegram": 300, "http:garden-cam": 50}. Sources over their quota are trimmed even while the folder is under the overall limit.'),
+        ),
+        migrations.AddField(
+            model_name='image',
+            name='last_displayed_at',
+            field=models.DateTimeField(blank=True, help_text='When a display last showed the image; used by least-recently-displayed eviction.', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='image',
+            index=models.Index(fields=['source', 'created_at'], name='image_source_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='image',
+            index=models.Index(django.db.models.functions.comparison.Coalesce('last_displayed_at', 'created_at'), models.F('id'), name='image_display_recency_idx'),
+        ),
+    ]
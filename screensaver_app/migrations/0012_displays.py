@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:44
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('screensaver_app', '0011_eviction_policies'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Display',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('display_id', models.CharField(help_text='Identifier chosen by the display (?display=<id>, else a random id kept in the browser).', max_length=64, unique=True)),
+                ('impressions', models.PositiveBigIntegerField(default=0)),
+                ('first_seen_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_seen_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Display',
+                'verbose_name_plural': 'Displays',
+                'ordering': ['-last_seen_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='image',
+            name='display_count',
+            field=models.PositiveBigIntegerField(default=0, help_text='How many times displays reported showing the image.'),
+        ),
+    ]
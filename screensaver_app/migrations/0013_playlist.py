@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('screensaver_app', '0012_displays'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='display',
+            name='playlist_state',
+            field=models.JSONField(blank=True, default=dict, help_text='Per-strategy position in the playlist (see screensaver_app.playlist).'),
+        ),
+        migrations.AddField(
+            model_name='screensaverconfig',
+            name='playlist_strategy',
+            field=models.CharField(choices=[('sequential', 'Sequential — oldest to newest, then start over'), ('recency', 'Recency-weighted — favour new images, still show old ones'), ('shuffle', 'Shuffle — random order, no repeats until all were shown'), ('round_robin', 'Round-robin — alternate between sources')], default='sequential', help_text='Slide order; displays fetch it from /api/playlist unless sequential.', max_length=20),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 08:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('screensaver_app', '0014_config_version'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='mediausage',
+            name='directory',
+            field=models.CharField(choices=[('images', 'media/images/'), ('previews', 'media/previews/'), ('renditions', 'media/renditions/'), ('alternates', 'WebP/AVIF copies'), ('mosaic', 'media/mosaic/')], max_length=20, unique=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-17 08:18
+
+from django.db import migrations, models
+import django.db.models.expressions
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('screensaver_app', '0015_mediausage_mosaic'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='cleanupconfig',
+            name='eviction_policy',
+            field=models.CharField(choices=[('oldest', 'Oldest first'), ('source_quota', 'Per-source quotas, then largest source first'), ('least_displayed', 'Least recently displayed'), ('size_weighted', 'Size-weighted (largest first, oldest among equals)')], default='oldest', help_text='Which images are deleted first when the size limit is exceeded.', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='image',
+            index=models.Index(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('size_bytes'), '+', models.F('preview_size_bytes')), '+', models.F('renditions_size_bytes')), '+', models.F('alternates_size_bytes')), models.F('id'), name='image_total_size_idx'),
+        ),
+    ]
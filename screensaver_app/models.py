@@ -1,12 +1,23 @@
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, TypeVar, cast
 
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .config_cache import config_changed, get_config_cache
+
+S = TypeVar("S", bound="SingletonModel")
 
 
 class SingletonModel(models.Model):
-    """Abstract base that enforces a single database row."""
+    """Abstract base that enforces a single database row.
+
+    Shared with ingestion_app. Saving bumps the config cache (see
+    config_cache) and deletion is blocked.
+    """
 
     class Meta:
         abstract = True
@@ -14,15 +25,27 @@ class SingletonModel(models.Model):
     def save(self, *args: Any, **kwargs: Any) -> None:
         self.__class__.objects.exclude(pk=self.pk).delete()
         super().save(*args, **kwargs)
+        config_changed(self.__class__)
 
     def delete(self, *args: Any, **kwargs: Any) -> tuple[int, dict[str, int]]:
         return 0, {}
 
     @classmethod
-    def get(cls) -> Any:
-        """Return the singleton instance, creating it with defaults if missing."""
-        obj, _ = cls.objects.get_or_create(pk=1)
-        return obj
+    def get(cls: type[S]) -> S:
+        """Return the singleton instance, creating it with defaults if missing.
+
+        Served from the process-local config cache (see config_cache).
+        """
+        return cast(S, get_config_cache().get(cls, lambda: cls.objects.get_or_create(pk=1)[0]))
+
+    @classmethod
+    def load(cls: type[S]) -> S | None:
+        """Return the singleton row, or None if it was never saved.
+
+        For configs without usable defaults (e.g. credentials). Served from
+        the process-local config cache like get().
+        """
+        return get_config_cache().get(cls, cls.objects.first)
 
 
 class ScreensaverConfig(SingletonModel):
@@ -46,6 +69,16 @@ class ScreensaverConfig(SingletonModel):
         ("fixed", "Fixed — always use the selected transition"),
         ("random", "Random — pick a different transition each slide"),
     ]
+    PLAYLIST_SEQUENTIAL = "sequential"
+    PLAYLIST_RECENCY = "recency"
+    PLAYLIST_SHUFFLE = "shuffle"
+    PLAYLIST_ROUND_ROBIN = "round_robin"
+    PLAYLIST_CHOICES = [
+        (PLAYLIST_SEQUENTIAL, "Sequential — oldest to newest, then start over"),
+        (PLAYLIST_RECENCY, "Recency-weighted — favour new images, still show old ones"),
+        (PLAYLIST_SHUFFLE, "Shuffle — random order, no repeats until all were shown"),
+        (PLAYLIST_ROUND_ROBIN, "Round-robin — alternate between sources"),
+    ]
 
     grid_fetch_interval_seconds = models.PositiveIntegerField(
         default=60,
@@ -66,6 +99,12 @@ class ScreensaverConfig(SingletonModel):
         choices=TRANSITION_MODE_CHOICES,
         default="random",
     )
+    playlist_strategy = models.CharField(
+        max_length=20,
+        choices=PLAYLIST_CHOICES,
+        default=PLAYLIST_SEQUENTIAL,
+        help_text="Slide order; displays fetch it from /api/playlist unless sequential.",
+    )
 
     class Meta:
         verbose_name = "Screensaver Configuration"
@@ -80,13 +119,49 @@ class CleanupConfig(SingletonModel):
 
     max_folder_size_mb = models.PositiveIntegerField(
         default=500,
-        help_text="Maximum total size of media/images/ in megabytes.",
+        help_text="Maximum total size in megabytes of the images with their previews, "
+                  "renditions and WebP/AVIF copies.",
     )
     cleanup_interval_seconds = models.PositiveIntegerField(
         default=3600,
-        help_text="Informational only — actual schedule is set in cron/docker-compose.",
+        help_text="How often (seconds) run_scheduler enforces the size limit.",
     )
 
+    POLICY_OLDEST = "oldest"
+    POLICY_SOURCE_QUOTA = "source_quota"
+    POLICY_LEAST_DISPLAYED = "least_displayed"
+    POLICY_SIZE_WEIGHTED = "size_weighted"
+    POLICY_CHOICES = [
+        (POLICY_OLDEST, "Oldest first"),
+        (POLICY_SOURCE_QUOTA, "Per-source quotas, then largest source first"),
+        (POLICY_LEAST_DISPLAYED, "Least recently displayed"),
+        (POLICY_SIZE_WEIGHTED, "Size-weighted (largest first, oldest among equals)"),
+    ]
+    eviction_policy = models.CharField(
+        max_length=20,
+        choices=POLICY_CHOICES,
+        default=POLICY_OLDEST,
+        help_text="Which images are deleted first when the size limit is exceeded.",
+    )
+    source_quotas = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text='Per-source limits in MB for the per-source quota policy, e.g. '
+                  '{"telegram": 300, "http:garden-cam": 50}. Sources over their quota are '
+                  'trimmed even while the folder is under the overall limit.',
+    )
+
+    def clean(self) -> None:
+        quotas = self.source_quotas
+        if not isinstance(quotas, dict) or not all(
+            isinstance(mb, (int, float)) and not isinstance(mb, bool) and mb >= 0
+            for mb in quotas.values()
+        ):
+            raise ValidationError({
+                "source_quotas": 'Expected an object mapping source names to megabytes, '
+                                 'e.g. {"telegram": 300}.',
+            })
+
     class Meta:
         verbose_name = "Cleanup Configuration"
         verbose_name_plural = "Cleanup Configuration"
@@ -95,8 +170,58 @@ class CleanupConfig(SingletonModel):
         return "Cleanup Configuration"
 
 
+class LogRetentionConfig(SingletonModel):
+    """Per-level retention periods for AppLog, enforced by prune_logs (singleton)."""
+
+    debug_days = models.PositiveIntegerField(
+        default=3,
+        help_text="Days to keep DEBUG entries; 0 keeps them forever.",
+    )
+    info_days = models.PositiveIntegerField(
+        default=14,
+        help_text="Days to keep INFO entries; 0 keeps them forever.",
+    )
+    warning_days = models.PositiveIntegerField(
+        default=30,
+        help_text="Days to keep WARNING entries; 0 keeps them forever.",
+    )
+    error_days = models.PositiveIntegerField(
+        default=90,
+        help_text="Days to keep ERROR entries; 0 keeps them forever.",
+    )
+    critical_days = models.PositiveIntegerField(
+        default=90,
+        help_text="Days to keep CRITICAL entries; 0 keeps them forever.",
+    )
+    archive_enabled = models.BooleanField(
+        default=False,
+        help_text="Write pruned entries to gzip-compressed JSON-lines files in logs/archive/.",
+    )
+
+    class Meta:
+        verbose_name = "Log Retention Configuration"
+        verbose_name_plural = "Log Retention Configuration"
+
+    def __str__(self) -> str:
+        return "Log Retention Configuration"
+
+    def retention_days(self) -> dict[str, int]:
+        """Return a mapping of log level name → retention in days (0 = forever)."""
+        return {
+            "DEBUG": self.debug_days,
+            "INFO": self.info_days,
+            "WARNING": self.warning_days,
+            "ERROR": self.error_days,
+            "CRITICAL": self.critical_days,
+        }
+
+
 class AppLog(models.Model):
-    """Persisted application log entries, written by DatabaseLogHandler."""
+    """Persisted application log entries, written by the database log handlers.
+
+    ``timestamp`` is the time the record was logged, not the time it was
+    written, since the buffered handler inserts records in delayed batches.
+    """
 
     LEVEL_CHOICES = [
         ("DEBUG", "Debug"),
@@ -106,15 +231,195 @@ class AppLog(models.Model):
         ("CRITICAL", "Critical"),
     ]
 
-    timestamp = models.DateTimeField(auto_now_add=True, db_index=True)
+    timestamp = models.DateTimeField(default=timezone.now, db_index=True)
     level = models.CharField(max_length=10, choices=LEVEL_CHOICES, db_index=True)
     logger_name = models.CharField(max_length=200, db_index=True)
     message = models.TextField()
 
     class Meta:
         ordering = ["-timestamp"]
+        # Matches the admin's level filter + date_hierarchy and prune_logs' scans
+        indexes = [models.Index(fields=["level", "timestamp"])]
         verbose_name = "Log Entry"
         verbose_name_plural = "Log Entries"
 
     def __str__(self) -> str:
         return f"[{self.level}] {self.logger_name}: {self.message[:80]}"
+
+
+class Image(models.Model):
+    """Index of ingested images, mirroring media/images/ and media/previews/.
+
+    Written by the ingestion pipeline and run_cleanup so that API views never
+    need to scan the media directories. Rebuild it from disk with the
+    ``rebuild_image_index`` command.
+    """
+
+    filename = models.CharField(max_length=100, unique=True)
+    source = models.CharField(
+        max_length=200,
+        blank=True,
+        help_text="Where the image came from, e.g. 'telegram' or 'http:<source name>'.",
+    )
+    width = models.PositiveIntegerField(default=0)
+    height = models.PositiveIntegerField(default=0)
+    size_bytes = models.PositiveBigIntegerField(default=0)
+    preview_width = models.PositiveIntegerField(default=0)
+    preview_height = models.PositiveIntegerField(default=0)
+    preview_size_bytes = models.PositiveBigIntegerField(
+        default=0,
+        help_text="Zero while no preview has been generated.",
+    )
+    renditions = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="Widths of the downscaled copies stored in media/renditions/<width>/.",
+    )
+    renditions_size_bytes = models.PositiveBigIntegerField(default=0)
+    alternates_size_bytes = models.PositiveBigIntegerField(
+        default=0,
+        help_text="Total size of the WebP/AVIF copies of the image, renditions and preview.",
+    )
+    content_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        db_index=True,
+        help_text="SHA-256 of the bytes as received, before decoding; used to skip duplicates.",
+    )
+    phash = models.CharField(
+        max_length=16,
+        blank=True,
+        help_text="64-bit difference hash (hex) for near-duplicate detection.",
+    )
+    display_count = models.PositiveBigIntegerField(
+        default=0,
+        help_text="How many times displays reported showing the image.",
+    )
+    last_displayed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When a display last showed the image; used by least-recently-displayed "
+                  "eviction.",
+    )
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        ordering = ["created_at"]
+        indexes = [
+            # Victim selection for the eviction policies (screensaver_app.eviction)
+            models.Index(fields=["source", "created_at"], name="image_source_created_idx"),
+            models.Index(Coalesce("last_displayed_at", "created_at"), "id",
+                         name="image_display_recency_idx"),
+            # Same expression as eviction._TOTAL_SIZE, so the planner can use it
+            models.Index(models.F("size_bytes") + models.F("preview_size_bytes")
+                         + models.F("renditions_size_bytes") + models.F("alternates_size_bytes"),
+                         "id", name="image_total_size_idx"),
+        ]
+        verbose_name = "Image"
+        verbose_name_plural = "Images"
+
+    def __str__(self) -> str:
+        return self.filename
+
+
+class ImageChange(models.Model):
+    """Append-only log of previews appearing in or leaving the Image index.
+
+    The auto-incrementing primary key doubles as the delta-sync cursor for
+    ``/api/previews?since=<cursor>``. Old rows are pruned by run_cleanup; the
+    newest row is always kept so the cursor never moves backwards.
+    """
+
+    ACTION_ADDED = "added"
+    ACTION_REMOVED = "removed"
+    ACTION_CHOICES = [
+        (ACTION_ADDED, "Added"),
+        (ACTION_REMOVED, "Removed"),
+    ]
+
+    filename = models.CharField(max_length=100)
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ["id"]
+        verbose_name = "Image Change"
+        verbose_name_plural = "Image Changes"
+
+    def __str__(self) -> str:
+        return f"#{self.pk} {self.action} {self.filename}"
+
+
+class MediaUsage(models.Model):
+    """Running byte total of one media subdirectory.
+
+    Adjusted by the image index on every register/unregister so run_cleanup
+    can compare usage with the limit without listing the media folder.
+    ``reconcile_usage`` periodically resets the totals from a disk scan.
+    """
+
+    DIRECTORY_IMAGES = "images"
+    DIRECTORY_PREVIEWS = "previews"
+    DIRECTORY_RENDITIONS = "renditions"
+    DIRECTORY_ALTERNATES = "alternates"
+    DIRECTORY_MOSAIC = "mosaic"
+    DIRECTORY_CHOICES = [
+        (DIRECTORY_IMAGES, "media/images/"),
+        (DIRECTORY_PREVIEWS, "media/previews/"),
+        (DIRECTORY_RENDITIONS, "media/renditions/"),
+        (DIRECTORY_ALTERNATES, "WebP/AVIF copies"),
+        (DIRECTORY_MOSAIC, "media/mosaic/"),
+    ]
+
+    directory = models.CharField(max_length=20, choices=DIRECTORY_CHOICES, unique=True)
+    size_bytes = models.BigIntegerField(default=0)
+    reconciled_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the total was last recounted from disk.",
+    )
+
+    class Meta:
+        ordering = ["directory"]
+        verbose_name = "Media Usage"
+        verbose_name_plural = "Media Usage"
+
+    def __str__(self) -> str:
+        return f"{self.directory}: {self.size_bytes / 1024 / 1024:.1f} MB"
+
+
+class Display(models.Model):
+    """A screen running the slideshow, known from its impression beacons."""
+
+    display_id = models.CharField(
+        max_length=64,
+        unique=True,
+        help_text="Identifier chosen by the display (?display=<id>, else a random id "
+                  "kept in the browser).",
+    )
+    impressions = models.PositiveBigIntegerField(default=0)
+    first_seen_at = models.DateTimeField(default=timezone.now)
+    last_seen_at = models.DateTimeField(default=timezone.now, db_index=True)
+    playlist_state = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Per-strategy position in the playlist (see screensaver_app.playlist).",
+    )
+
+    class Meta:
+        ordering = ["-last_seen_at"]
+        verbose_name = "Display"
+        verbose_name_plural = "Displays"
+
+    def __str__(self) -> str:
+        return self.display_id
+
+
+class ConfigVersion(models.Model):
+    """Change counter per singleton config model, read by the config cache."""
+
+    model = models.CharField(max_length=100, unique=True, help_text="app_label.modelname")
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f"{self.model} v{self.version}"
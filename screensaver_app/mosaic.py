@@ -0,0 +1,205 @@
+"""Preview sprite sheets for the collage phase.
+
+Previews are packed into sheets of SHEET_COLUMNS × SHEET_ROWS tiles stored in
+media/mosaic/, so the collage loads a handful of images instead of one per
+preview. media/mosaic/index.json records which filenames each sheet holds
+and the feed cursor it was built at. When the cursor moves, update_mosaic()
+drops removed previews from their sheets and appends new ones to the last
+sheet; only sheets whose membership changed are re-rendered. Rendering runs
+in the scheduler (see ingestion_app.services.scheduler); /api/mosaic only
+serves the last index written, so the collage never waits for Pillow.
+Builds are serialised with a lock file (see locks), so this is POSIX-only.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+from django.conf import settings
+from PIL import Image as PILImage, ImageOps
+
+from .image_index import adjust_media_usage, feed_cursor
+from .locks import file_lock
+from .models import Image, MediaUsage
+
+logger = logging.getLogger(__name__)
+
+TILE_WIDTH = 320
+TILE_HEIGHT = 240
+SHEET_COLUMNS = 8
+SHEET_ROWS = 8
+TILES_PER_SHEET = SHEET_COLUMNS * SHEET_ROWS
+
+_BACKGROUND = (34, 34, 34)
+
+
+def mosaic_dir() -> Path:
+    return Path(settings.MEDIA_ROOT) / "mosaic"
+
+
+def _empty_index() -> dict[str, Any]:
+    return {"cursor": -1, "next_id": 1, "sheets": []}
+
+
+def load_index() -> dict[str, Any]:
+    """Return the stored sheet map, or an empty one if missing or unreadable."""
+    try:
+        with (mosaic_dir() / "index.json").open(encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return _empty_index()
+
+
+def index_version() -> int:
+    """Modification time of index.json (0 if missing), for cheap ETags."""
+    try:
+        return (mosaic_dir() / "index.json").stat().st_mtime_ns
+    except OSError:
+        return 0
+
+
+def is_stale() -> bool:
+    """Return True if the sheets lag behind the image index."""
+    return load_index()["cursor"] != feed_cursor()
+
+
+def _save_index(index: dict[str, Any]) -> None:
+    tmp = mosaic_dir() / "index.json.tmp"
+    with tmp.open("w", encoding="utf-8") as fh:
+        json.dump(index, fh)
+    os.replace(tmp, mosaic_dir() / "index.json")
+
+
+@contextmanager
+def _build_lock() -> Iterator[None]:
+    # Only the scheduler renders sheets, but a second scheduler container
+    # would race it on index.json; the later build waits and then finds
+    # nothing left to do.
+    with file_lock(mosaic_dir() / ".lock"):
+        yield
+
+
+def _render_sheet(members: list[str], dest: Path) -> int:
+    """Render *members* into the sheet *dest* and return its size in bytes."""
+    previews_dir = Path(settings.MEDIA_ROOT) / "previews"
+    rows = max(1, -(-len(members) // SHEET_COLUMNS))
+    sheet = PILImage.new("RGB", (SHEET_COLUMNS * TILE_WIDTH, rows * TILE_HEIGHT), _BACKGROUND)
+    for i, filename in enumerate(members):
+        try:
+            with PILImage.open(previews_dir / filename) as img:
+                img.draft("RGB", (TILE_WIDTH, TILE_HEIGHT))
+                # Centre-crop like the collage's object-fit: cover thumbnails
+                tile = ImageOps.fit(img.convert("RGB"), (TILE_WIDTH, TILE_HEIGHT),
+                                    PILImage.LANCZOS)
+        except OSError as exc:
+            logger.warning("update_mosaic: could not read preview %s: %s", filename, exc)
+            continue
+        sheet.paste(tile, ((i % SHEET_COLUMNS) * TILE_WIDTH, (i // SHEET_COLUMNS) * TILE_HEIGHT))
+    sheet.save(dest, "JPEG", quality=85, optimize=True)
+    return dest.stat().st_size
+
+
+def _members_digest(members: list[str]) -> str:
+    return hashlib.sha1("\n".join(members).encode()).hexdigest()[:10]
+
+
+def update_mosaic() -> dict[str, Any]:
+    """Bring the sprite sheets in line with the image index and return the sheet map.
+
+    Cheap when nothing changed: the stored cursor is compared with the feed
+    cursor before any sheet is touched. Sheet bytes written and removed are
+    added to the ``mosaic`` MediaUsage total.
+    """
+    head = feed_cursor()
+    index = load_index()
+    if index["cursor"] == head:
+        return index
+
+    with _build_lock():
+        index = load_index()
+        if index["cursor"] == head:
+            return index
+
+        present = list(
+            Image.objects
+            .filter(preview_size_bytes__gt=0)
+            .order_by("id")
+            .values_list("filename", flat=True)
+        )
+        present_set = set(present)
+
+        sheets: list[dict[str, Any]] = []
+        placed: set[str] = set()
+        obsolete: list[str] = []
+        for sheet in index["sheets"]:
+            members = [name for name in sheet["members"] if name in present_set]
+            placed.update(members)
+            if members:
+                sheets.append({**sheet, "members": members})
+            else:
+                obsolete.append(sheet["file"])
+
+        next_id = index["next_id"]
+        for name in present:
+            if name in placed:
+                continue
+            if not sheets or len(sheets[-1]["members"]) >= TILES_PER_SHEET:
+                sheets.append({"id": next_id, "file": "", "members": []})
+                next_id += 1
+            sheets[-1]["members"].append(name)
+
+        rendered = 0
+        delta = 0
+        for sheet in sheets:
+            # The file name carries a digest of the members, so a re-rendered
+            # sheet gets a new URL and the immutable cache headers stay valid.
+            file = f"sheet-{sheet['id']}-{_members_digest(sheet['members'])}.jpg"
+            if file == sheet["file"] and (mosaic_dir() / file).exists():
+                continue
+            delta += _render_sheet(sheet["members"], mosaic_dir() / file)
+            if sheet["file"]:
+                obsolete.append(sheet["file"])
+            sheet["file"] = file
+            rendered += 1
+
+        index = {"cursor": head, "next_id": next_id, "sheets": sheets}
+        _save_index(index)
+        for file in obsolete:
+            path = mosaic_dir() / file
+            try:
+                delta -= path.stat().st_size
+                path.unlink()
+            except FileNotFoundError:
+                pass
+        adjust_media_usage(MediaUsage.DIRECTORY_MOSAIC, delta)
+
+        logger.info("update_mosaic: %d sheet(s) for %d preview(s), %d re-rendered, %d removed",
+                    len(sheets), len(present), rendered, len(obsolete))
+        return index
+
+
+def mosaic_map(index: dict[str, Any]) -> dict[str, Any]:
+    """Return the client-facing coordinate map for a sheet *index*."""
+    sheets = []
+    for sheet in index["sheets"]:
+        members = sheet["members"]
+        sheets.append({
+            "url": f"{settings.MEDIA_URL}mosaic/{sheet['file']}",
+            "columns": SHEET_COLUMNS,
+            "rows": max(1, -(-len(members) // SHEET_COLUMNS)),
+            "tiles": [
+                {"filename": name, "col": i % SHEET_COLUMNS, "row": i // SHEET_COLUMNS}
+                for i, name in enumerate(members)
+            ],
+        })
+    return {
+        "cursor": index["cursor"],
+        "tile_width": TILE_WIDTH,
+        "tile_height": TILE_HEIGHT,
+        "sheets": sheets,
+    }
@@ -0,0 +1,243 @@
+"""Server-side slide order for displays (/api/playlist).
+
+Each call hands a display its next N slides. Strategies only touch indexed
+columns of the Image table (the id, the created_at and (source, created_at)
+indexes) and keep their position per display in Display.playlist_state, so
+a call reads O(N) index rows however many images are stored and hundreds
+of displays can poll without scanning the table or the media directories.
+"""
+from __future__ import annotations
+
+import bisect
+import math
+import random
+from datetime import datetime
+from typing import Any, Callable
+
+from django.db.models import Q, QuerySet
+
+from .models import Image, ScreensaverConfig
+
+# Recency: half of the picks come from the newest RECENCY_HALF_SHARE of the images
+RECENCY_HALF_SHARE = 0.25
+
+# Sampling attempts per requested slide before recency gives up on filling the batch
+RECENCY_ATTEMPTS = 4
+
+# Shuffle: permutation steps examined per query
+SHUFFLE_CHUNK = 64
+
+Row = tuple[int, str, int, int, list[int], str, datetime]
+State = dict[str, Any]
+
+_FIELDS = ("id", "filename", "width", "height", "renditions", "source", "created_at")
+
+
+def _slides() -> QuerySet[Image]:
+    # The slideshow only shows images that have a preview, like /api/previews
+    return Image.objects.filter(preview_size_bytes__gt=0)
+
+
+def _id_bounds() -> tuple[int, int] | None:
+    # Two index seeks on the primary key instead of an aggregate over the table
+    low = _slides().order_by("id").values_list("id", flat=True).first()
+    high = _slides().order_by("-id").values_list("id", flat=True).first()
+    return None if low is None or high is None else (low, high)
+
+
+def sequential(state: State, count: int, rng: random.Random) -> list[Row]:
+    """Ingest order, oldest first, wrapping around at the newest image."""
+    rows: list[Row] = []
+    after = state.get("after", 0)
+    wrapped = False
+    while len(rows) < count:
+        batch = list(_slides().filter(id__gt=after).order_by("id")
+                     .values_list(*_FIELDS)[:count - len(rows)])
+        rows.extend(batch)
+        if batch:
+            after = batch[-1][0]
+        elif wrapped or after == 0:
+            break
+        else:
+            after, wrapped = 0, True
+    state["after"] = after
+    return rows
+
+
+def recency_weighted(state: State, count: int, rng: random.Random) -> list[Row]:
+    """Random picks weighted towards new images.
+
+    The distance from the newest image id is drawn from an exponential
+    distribution whose median is RECENCY_HALF_SHARE of the id range; each
+    draw is one index seek. Ids follow ingest order, so the newest quarter
+    of the images gets half of the screen time and old ones still appear.
+    Picks do not repeat within a batch or right after the previous batch.
+    """
+    bounds = _id_bounds()
+    if bounds is None:
+        return []
+    low, high = bounds
+    span = high - low + 1
+    mean = max(span * RECENCY_HALF_SHARE, 1.0) / math.log(2)
+
+    rows: list[Row] = []
+    seen = {state.get("last")}
+    for _ in range(count * RECENCY_ATTEMPTS):
+        if len(rows) >= count:
+            break
+        offset = int(rng.expovariate(1 / mean))
+        if offset >= span:
+            offset = rng.randrange(span)
+        row = (_slides().filter(id__lte=high - offset).order_by("-id")
+               .values_list(*_FIELDS).first())
+        if row is None or row[0] in seen:
+            continue
+        seen.add(row[0])
+        rows.append(row)
+    if rows:
+        state["last"] = rows[-1][0]
+    return rows
+
+
+def _new_cycle(rng: random.Random) -> State | None:
+    """Pick a random full-period LCG over the current id range."""
+    bounds = _id_bounds()
+    if bounds is None:
+        return None
+    low, high = bounds
+    span = high - low + 1
+    modulus = 1 << max(span - 1, 1).bit_length()
+    return {
+        "low": low,
+        "span": span,
+        "modulus": modulus,
+        # Hull–Dobell: c odd and a ≡ 1 (mod 4) give period == modulus
+        "a": rng.randrange(0, modulus, 4) + 1,
+        "c": rng.randrange(1, modulus, 2),
+        "x": rng.randrange(modulus),
+        "steps": 0,
+    }
+
+
+def shuffle(state: State, count: int, rng: random.Random) -> list[Row]:
+    """Every image once in random order before any image repeats.
+
+    A cycle walks a random linear congruential permutation of the id range
+    known when it started, so the state is a handful of integers instead of
+    a stored list of ids. Steps that land on ids that do not exist (deleted
+    images, ids without a preview) are skipped a chunk at a time; images
+    ingested during a cycle join the next one.
+    """
+    rows: list[Row] = []
+    cycles = 0
+    while len(rows) < count:
+        if not state or state["steps"] >= state["modulus"]:
+            # A second fresh cycle finding nothing means the table is empty
+            cycles += 1
+            fresh = _new_cycle(rng) if cycles <= 2 else None
+            if fresh is None:
+                break
+            state.clear()
+            state.update(fresh)
+
+        candidates: list[tuple[int, int, int]] = []  # (id, x after the step, steps)
+        x, steps = state["x"], state["steps"]
+        modulus, a, c = state["modulus"], state["a"], state["c"]
+        while len(candidates) < SHUFFLE_CHUNK and steps < modulus:
+            x = (a * x + c) % modulus
+            steps += 1
+            if x < state["span"]:
+                candidates.append((state["low"] + x, x, steps))
+
+        found = {row[0]: row for row in
+                 _slides().filter(id__in=[c[0] for c in candidates]).values_list(*_FIELDS)}
+        state["x"], state["steps"] = x, steps
+        for image_id, cx, csteps in candidates:
+            if image_id not in found:
+                continue
+            rows.append(found[image_id])
+            if len(rows) == count:
+                # Resume right after the last image handed out
+                state["x"], state["steps"] = cx, csteps
+                break
+    return rows
+
+
+def _sources() -> list[str]:
+    """Distinct sources via skip-scan seeks on the (source, created_at) index."""
+    sources: list[str] = []
+    while True:
+        queryset = _slides().order_by("source")
+        if sources:
+            queryset = queryset.filter(source__gt=sources[-1])
+        source = queryset.values_list("source", flat=True).first()
+        if source is None:
+            return sources
+        sources.append(source)
+
+
+def _source_rows(source: str, cursor: list[Any] | None, limit: int) -> list[Row]:
+    """The next *limit* rows of *source* after *cursor*, wrapping as often as needed."""
+    rows_qs = _slides().filter(source=source).order_by("created_at", "id").values_list(*_FIELDS)
+    rows: list[Row] = []
+    if cursor is not None:
+        created_at, image_id = datetime.fromisoformat(cursor[0]), cursor[1]
+        rows = list(rows_qs.filter(Q(created_at__gt=created_at)
+                                   | Q(created_at=created_at, id__gt=image_id))[:limit])
+    if len(rows) < limit:
+        # Wrap around to the source's oldest image; a source with fewer images
+        # than its share of the batch repeats them
+        head = list(rows_qs[:limit - len(rows)])
+        while head and len(rows) < limit:
+            rows.extend(head[:limit - len(rows)])
+    return rows
+
+
+def round_robin(state: State, count: int, rng: random.Random) -> list[Row]:
+    """Alternate between sources, each source in ingest order.
+
+    One slide per source per round until *count* is reached, so a feed that
+    posts hundreds of images gets as much screen time as one that posts a
+    few. Each source keeps its own ``(created_at, id)`` cursor and wraps
+    around independently, repeating its images within a batch if needed.
+    """
+    sources = _sources()
+    if not sources:
+        return []
+    # Continue with the source after the one that went last in the previous batch
+    start = bisect.bisect_right(sources, state["turn"]) % len(sources) if "turn" in state else 0
+    order = sources[start:] + sources[:start]
+
+    cursors: dict[str, list[Any]] = state.setdefault("cursors", {})
+    per_source = -(-count // len(order))
+    queues = {source: _source_rows(source, cursors.get(source), per_source) for source in order}
+
+    rows: list[Row] = []
+    while len(rows) < count and any(queues.values()):
+        for source in order:
+            if len(rows) >= count:
+                break
+            if queues[source]:
+                row = queues[source].pop(0)
+                rows.append(row)
+                cursors[source] = [row[6].isoformat(), row[0]]
+                state["turn"] = source
+    # Sources that are gone no longer need a cursor
+    state["cursors"] = {source: cursors[source] for source in sources if source in cursors}
+    return rows
+
+
+STRATEGIES: dict[str, Callable[[State, int, random.Random], list[Row]]] = {
+    ScreensaverConfig.PLAYLIST_SEQUENTIAL: sequential,
+    ScreensaverConfig.PLAYLIST_RECENCY: recency_weighted,
+    ScreensaverConfig.PLAYLIST_SHUFFLE: shuffle,
+    ScreensaverConfig.PLAYLIST_ROUND_ROBIN: round_robin,
+}
+
+
+def next_slides(strategy: str, state: State, count: int,
+                rng: random.Random | None = None) -> list[Row]:
+    """Return up to *count* ``(id, filename, width, height, renditions, source,
+    created_at)`` rows under *strategy*, advancing *state* in place.
+    """
+    return STRATEGIES[strategy](state, count, rng or random.Random())
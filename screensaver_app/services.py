@@ -1,68 +1,186 @@
 from __future__ import annotations
 
+import gzip
+import json
 import logging
+import time
+from datetime import timedelta
 from pathlib import Path
 
 from django.conf import settings
-
-from .models import CleanupConfig
+from django.utils import timezone
+
+from .eviction import select_victims
+from .image_index import (
+    image_files,
+    media_usage,
+    prune_changes,
+    reconcile_usage,
+    unregister_image,
+    usage_reconciled_at,
+)
+from .locks import file_lock
+from .models import AppLog, CleanupConfig, LogRetentionConfig
 
 logger = logging.getLogger(__name__)
 
 
-def run_cleanup() -> None:
-    """Delete the oldest images (and their previews) until the folder is under the limit."""
-    logger.info("run_cleanup: starting")
-    config = CleanupConfig.get()
-    images_dir = Path(settings.MEDIA_ROOT) / "images"
-    previews_dir = Path(settings.MEDIA_ROOT) / "previews"
-
-    if not images_dir.exists():
-        logger.info("run_cleanup: images directory does not exist yet, nothing to do")
-        return
-
-    # Collect all image files; sort ascending = oldest filename first
-    files = sorted(f for f in images_dir.iterdir() if f.is_file())
-    if not files:
-        logger.info("run_cleanup: no images found, nothing to do")
-        return
-
-    # Snapshot sizes before starting deletions
-    sizes: dict[Path, int] = {f: f.stat().st_size for f in files}
-    total_bytes = sum(sizes.values())
-    limit_bytes = config.max_folder_size_mb * 1024 * 1024
+def _cleanup_lock_path() -> Path:
+    # Serialises cleanups across the web, ingest, poller and scheduler processes
+    return Path(settings.MEDIA_ROOT) / ".cleanup.lock"
 
-    used_mb = total_bytes / 1024 / 1024
-    logger.info("run_cleanup: %d images, %.1f MB used / %d MB limit",
-                len(files), used_mb, config.max_folder_size_mb)
 
-    if total_bytes <= limit_bytes:
-        logger.info("run_cleanup: within limit, no action needed")
-        return
+def _reconcile_due() -> bool:
+    reconciled_at = usage_reconciled_at()
+    if reconciled_at is None:
+        return True
+    age = (timezone.now() - reconciled_at).total_seconds()
+    return age >= settings.MEDIA_USAGE_RECONCILE_SECONDS
 
-    logger.info("run_cleanup: over limit by %.1f MB, starting deletion",
-                (total_bytes - limit_bytes) / 1024 / 1024)
 
-    deleted_images = 0
-    deleted_previews = 0
+def run_cleanup(dry_run: bool = False, policy: str | None = None) -> dict[str, int]:
+    """Delete images (and all their derived files) until the folder is under the limit.
 
-    for f in files:
-        if total_bytes <= limit_bytes:
-            break
+    Usage comes from the running MediaUsage totals, recounted from disk once
+    every MEDIA_USAGE_RECONCILE_SECONDS. Victims are chosen by the
+    CleanupConfig eviction policy (or *policy*), see screensaver_app.eviction,
+    so a run costs O(images evicted) rather than a listing of the media
+    folder. With *dry_run* nothing is deleted. Returns the number of images
+    and bytes deleted (or, with *dry_run*, that would be).
+    """
+    with file_lock(_cleanup_lock_path()):
+        return _run_cleanup(dry_run, policy)
 
-        size_kb = sizes[f] / 1024
-        f.unlink()
-        total_bytes -= sizes[f]
+
+def _run_cleanup(dry_run: bool, policy: str | None) -> dict[str, int]:
+    logger.info("run_cleanup: starting")
+    config = CleanupConfig.get()
+    if not dry_run:
+        prune_changes()
+        if _reconcile_due():
+            reconcile_usage()
+
+    usage = media_usage()
+    total_bytes = sum(usage.values())
+    limit_bytes = config.max_folder_size_mb * 1024 * 1024
+    excess = total_bytes - limit_bytes
+    logger.info("run_cleanup: %.1f MB used / %d MB limit (%s), policy=%s",
+                total_bytes / 1024 / 1024, config.max_folder_size_mb,
+                ", ".join(f"{d}={b / 1024 / 1024:.1f} MB" for d, b in sorted(usage.items())),
+                policy or config.eviction_policy)
+
+    freed = 0
+    deleted_images = 0
+    for victim in select_victims(config, excess, policy):
+        if dry_run:
+            size = victim.size_bytes
+            logger.info("Would delete image: %s (%.1f KB, %s)",
+                        victim.filename, size / 1024, victim.reason)
+        else:
+            for path in image_files(victim.filename, victim.renditions):
+                path.unlink(missing_ok=True)
+            size = unregister_image(victim.filename)
+            logger.info("Deleted image: %s (%.1f KB with derived files, %s)",
+                        victim.filename, size / 1024, victim.reason)
+        freed += size
         deleted_images += 1
-        logger.info("Deleted image: %s (%.1f KB)", f.name, size_kb)
-
-        preview = previews_dir / f.name
-        if preview.exists():
-            preview.unlink()
-            deleted_previews += 1
-            logger.info("Deleted preview: %s", f.name)
-
-    logger.info(
-        "run_cleanup: finished — deleted %d image(s) + %d preview(s), %.1f MB remaining",
-        deleted_images, deleted_previews, total_bytes / 1024 / 1024,
-    )
+
+    if freed < excess:
+        logger.warning("run_cleanup: no indexed images left but still %.1f MB over; "
+                       "run rebuild_image_index to pick up unindexed files",
+                       (excess - freed) / 1024 / 1024)
+    if deleted_images == 0:
+        logger.info("run_cleanup: within limit, no action needed")
+    else:
+        logger.info(
+            "run_cleanup: finished — %s %d image(s), %.1f MB freed, %.1f MB remaining",
+            "would delete" if dry_run else "deleted", deleted_images,
+            freed / 1024 / 1024, (total_bytes - freed) / 1024 / 1024,
+        )
+    return {"images": deleted_images, "bytes": freed}
+
+
+def cleanup_if_over_limit() -> bool:
+    """Run run_cleanup() right away if the tracked usage exceeds the limit.
+
+    Called after every save so the folder never stays over budget until the
+    next scheduled cleanup. Skipped while any process holds the cleanup
+    lock (the next scheduled run picks up what that one missed); the usage
+    is checked again under the lock, so two processes never evict for the
+    same excess. Returns True if a cleanup ran.
+    """
+    limit_bytes = CleanupConfig.get().max_folder_size_mb * 1024 * 1024
+    if sum(media_usage().values()) <= limit_bytes:
+        return False
+    with file_lock(_cleanup_lock_path(), blocking=False) as acquired:
+        # Another process may have cleaned up between the check and the lock
+        if not acquired or sum(media_usage().values()) <= limit_bytes:
+            return False
+        _run_cleanup(dry_run=False, policy=None)
+    return True
+
+
+def _archive_logs(rows: list[dict[str, object]]) -> None:
+    """Append *rows* to today's gzip-compressed JSON-lines archive file."""
+    archive_dir = Path(settings.BASE_DIR) / "logs" / "archive"
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    dest = archive_dir / f"applog-{timezone.now():%Y%m%d}.jsonl.gz"
+    # Appending produces a multi-member gzip file, which gzip/zcat read as one stream
+    with gzip.open(dest, "at", encoding="utf-8") as fh:
+        for row in rows:
+            fh.write(json.dumps(row, default=str) + "\n")
+
+
+def prune_logs(chunk_size: int = 1000, pause: float = 0.05,
+               dry_run: bool = False) -> dict[str, int]:
+    """Delete AppLog entries older than their level's retention period.
+
+    Rows are deleted in chunks of *chunk_size*, each in its own short
+    transaction, sleeping *pause* seconds in between so that the SQLite write
+    lock is released for other writers. When archiving is enabled the rows of
+    each chunk are appended to logs/archive/ before deletion.
+    Returns a mapping of level → rows deleted (or, with *dry_run*, eligible).
+    """
+    config = LogRetentionConfig.get()
+    now = timezone.now()
+    result: dict[str, int] = {}
+
+    for level, days in config.retention_days().items():
+        if not days:
+            continue
+        cutoff = now - timedelta(days=days)
+        expired = AppLog.objects.filter(level=level, timestamp__lt=cutoff)
+
+        if dry_run:
+            result[level] = expired.count()
+            logger.info("prune_logs: %d %s entr(ies) older than %d day(s) would be deleted",
+                        result[level], level, days)
+            continue
+
+        deleted = 0
+        while True:
+            if config.archive_enabled:
+                rows = list(
+                    expired.order_by("timestamp")
+                    .values("id", "timestamp", "level", "logger_name", "message")[:chunk_size]
+                )
+                ids = [row["id"] for row in rows]
+                if rows:
+                    _archive_logs(rows)
+            else:
+                ids = list(expired.order_by("timestamp").values_list("id", flat=True)[:chunk_size])
+            if not ids:
+                break
+
+            count, _ = AppLog.objects.filter(id__in=ids).delete()
+            deleted += count
+            if len(ids) < chunk_size:
+                break
+            time.sleep(pause)
+
+        result[level] = deleted
+        if deleted:
+            logger.info("prune_logs: deleted %d %s entr(ies) older than %d day(s)",
+                        deleted, level, days)
+
+    return result
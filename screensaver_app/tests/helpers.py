@@ -0,0 +1,27 @@
+"""Shared fixtures for tests that write into MEDIA_ROOT."""
+from __future__ import annotations
+
+import tempfile
+from pathlib import Path
+
+from django.test import override_settings
+from PIL import Image as PILImage
+
+
+class TempMediaMixin:
+    """Point MEDIA_ROOT at an empty temporary directory for each test."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.media_root = Path(tmp.name)
+        override = override_settings(MEDIA_ROOT=tmp.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def write_jpeg(self, relpath: str, size: tuple[int, int] = (40, 30)) -> Path:
+        path = self.media_root / relpath
+        path.parent.mkdir(parents=True, exist_ok=True)
+        PILImage.new("RGB", size, "red").save(path, "JPEG")
+        return path
@@ -0,0 +1,72 @@
+import math
+from unittest import mock
+
+from django.test import TestCase
+
+from screensaver_app import config_cache
+from screensaver_app.config_cache import ConfigCache
+from screensaver_app.models import ScreensaverConfig
+
+
+class ConfigCacheTests(TestCase):
+    def setUp(self):
+        self.cache = ConfigCache(check_interval=60)
+        self.loads = 0
+
+    def _interval(self) -> int:
+        return self.cache.get(ScreensaverConfig, self._load).slideshow_interval_seconds
+
+    def _load(self):
+        self.loads += 1
+        return ScreensaverConfig(pk=1, slideshow_interval_seconds=self.loads)
+
+    def test_cached_until_bumped(self):
+        self.assertEqual((self._interval(), self._interval()), (1, 1))
+
+        self.cache.bump(ScreensaverConfig)
+
+        self.assertEqual(self._interval(), 2)
+
+    def test_callers_get_copies(self):
+        self.cache.get(ScreensaverConfig, self._load).slideshow_interval_seconds = 99
+        self.assertEqual(self._interval(), 1)
+
+    def test_load_racing_a_bump_is_not_cached(self):
+        def load_then_bump():
+            instance = self._load()
+            # Another thread saves the config while this load is in flight
+            self.cache.bump(ScreensaverConfig)
+            return instance
+
+        self.cache.get(ScreensaverConfig, load_then_bump)
+
+        self.assertNotIn("screensaver_app.screensaverconfig", self.cache._entries)
+        self.assertEqual(self._interval(), 2)
+
+    def test_counters_read_before_a_bump_are_not_cached(self):
+        original = ConfigCache._counters
+        calls = []
+
+        def counters():
+            queryset = original()
+            if calls:
+                return queryset
+            calls.append(None)
+            rows = list(queryset.values_list("model", "version"))
+            # The config is saved while this read is in flight
+            self.cache.bump(ScreensaverConfig)
+            return mock.Mock(values_list=lambda *fields: rows)
+
+        with mock.patch.object(self.cache, "_counters", counters):
+            self.cache._current_versions()
+
+        self.assertEqual(self.cache._checked_at, -math.inf)
+
+    @mock.patch.object(config_cache, "_cache", None)
+    def test_save_invalidates_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            config = ScreensaverConfig.get()
+            config.slideshow_interval_seconds = 42
+            config.save()
+
+        self.assertEqual(ScreensaverConfig.get().slideshow_interval_seconds, 42)
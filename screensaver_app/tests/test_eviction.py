@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from django.test import TestCase
+
+from screensaver_app import eviction
+from screensaver_app.eviction import select_victims
+from screensaver_app.models import CleanupConfig, Image
+
+_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _image(name: str, age: int, size: int, source: str = "a",
+           displayed: int | None = None) -> Image:
+    return Image.objects.create(
+        filename=name, source=source, size_bytes=size, preview_size_bytes=0,
+        created_at=_EPOCH + timedelta(days=age),
+        last_displayed_at=None if displayed is None else _EPOCH + timedelta(days=displayed),
+    )
+
+
+@mock.patch.object(eviction, "BATCH_SIZE", 2)
+class EvictionPolicyTests(TestCase):
+    def _names(self, excess: int, policy: str, **config) -> list[str]:
+        victims = select_victims(CleanupConfig(**config), excess, policy)
+        return [victim.filename for victim in victims]
+
+    def test_oldest_first_stops_once_excess_is_covered(self):
+        for age in (3, 1, 2, 5, 4):
+            _image(f"{age}.jpg", age, 100)
+
+        self.assertEqual(self._names(250, CleanupConfig.POLICY_OLDEST),
+                         ["1.jpg", "2.jpg", "3.jpg"])
+        self.assertEqual(self._names(0, CleanupConfig.POLICY_OLDEST), [])
+
+    def test_size_weighted_ranks_all_images(self):
+        _image("old-small.jpg", 0, 10)
+        _image("new-big.jpg", 9, 500)
+        _image("mid-a.jpg", 1, 200)
+        _image("mid-b.jpg", 2, 200)
+        _image("old-mid.jpg", 0, 50)
+
+        self.assertEqual(self._names(850, CleanupConfig.POLICY_SIZE_WEIGHTED),
+                         ["new-big.jpg", "mid-a.jpg", "mid-b.jpg"])
+
+    def test_least_displayed_counts_unshown_from_ingest(self):
+        _image("shown-long-ago.jpg", 0, 100, displayed=1)
+        _image("fresh.jpg", 5, 100)
+        _image("shown-recently.jpg", 0, 100, displayed=8)
+
+        self.assertEqual(self._names(300, CleanupConfig.POLICY_LEAST_DISPLAYED),
+                         ["shown-long-ago.jpg", "fresh.jpg", "shown-recently.jpg"])
+
+    def test_source_quotas_then_largest_source(self):
+        mb = 1024 * 1024
+        for age in range(3):
+            _image(f"chatty-{age}.jpg", age, mb, source="chatty")
+        _image("quiet-0.jpg", 0, mb // 2, source="quiet")
+        _image("capped-0.jpg", 0, mb, source="capped")
+        _image("capped-1.jpg", 1, mb, source="capped")
+
+        names = self._names(2 * mb, CleanupConfig.POLICY_SOURCE_QUOTA,
+                            source_quotas={"capped": 1})
+
+        # capped is trimmed to its quota first, then the biggest source pays the rest
+        self.assertEqual(names, ["capped-0.jpg", "chatty-0.jpg"])
+
+    def test_unknown_policy_falls_back_to_oldest(self):
+        _image("b.jpg", 1, 100)
+        _image("a.jpg", 0, 100)
+        self.assertEqual(self._names(100, "nope"), ["a.jpg"])
@@ -0,0 +1,92 @@
+from django.test import TestCase
+
+from screensaver_app.image_index import (
+    feed_cursor, prune_changes, register_image, register_preview, unregister_image,
+)
+from screensaver_app.models import ImageChange
+
+from .helpers import TempMediaMixin
+
+
+class PreviewFeedTests(TempMediaMixin, TestCase):
+    def _add(self, name: str) -> None:
+        register_image(self.write_jpeg(f"images/{name}"), source="test", width=40, height=30)
+        register_preview(self.write_jpeg(f"previews/{name}", (20, 15)), width=20, height=15)
+
+    def _get(self, query: str = "", **headers):
+        return self.client.get(f"/api/previews{query}", **headers)
+
+    def test_full_list_without_since(self):
+        self._add("a.jpg")
+        self._add("b.jpg")
+
+        response = self._get()
+
+        self.assertEqual([e["filename"] for e in response.json()], ["a.jpg", "b.jpg"])
+        self.assertEqual(response.json()[0]["preview_url"], "/media/previews/a.jpg")
+
+    def test_unchanged_feed_is_not_modified(self):
+        self._add("a.jpg")
+        etag = self._get("?since=0")["ETag"]
+
+        self.assertEqual(self._get("?since=0", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self._add("b.jpg")
+        self.assertEqual(self._get("?since=0", HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_delta_since_cursor(self):
+        self._add("a.jpg")
+        self._add("b.jpg")
+        cursor = self._get("?since=0").json()["cursor"]
+        self._add("c.jpg")
+        unregister_image("a.jpg")
+
+        body = self._get(f"?since={cursor}").json()
+
+        self.assertFalse(body["reset"])
+        self.assertEqual([e["filename"] for e in body["added"]], ["c.jpg"])
+        self.assertEqual(body["removed"], ["a.jpg"])
+        self.assertEqual(body["cursor"], feed_cursor())
+        self.assertIsNone(body["next"])
+
+    def test_added_then_removed_collapses_to_removed(self):
+        self._add("old.jpg")
+        cursor = feed_cursor()
+        self._add("a.jpg")
+        unregister_image("a.jpg")
+
+        body = self._get(f"?since={cursor}").json()
+
+        self.assertEqual((body["added"], body["removed"]), ([], ["a.jpg"]))
+
+    def test_snapshot_pages(self):
+        for name in ("a.jpg", "b.jpg", "c.jpg"):
+            self._add(name)
+
+        first = self._get("?since=0&limit=2").json()
+        second = self._get(first["next"][len("/api/previews"):]).json()
+
+        self.assertTrue(first["reset"])
+        self.assertEqual([e["filename"] for e in first["added"]], ["a.jpg", "b.jpg"])
+        self.assertEqual([e["filename"] for e in second["added"]], ["c.jpg"])
+        self.assertIsNone(second["next"])
+        self.assertEqual(second["cursor"], first["cursor"])
+
+    def test_pruned_cursor_falls_back_to_snapshot(self):
+        self._add("a.jpg")
+        since = feed_cursor()
+        self._add("b.jpg")
+        self._add("c.jpg")
+        # The change right after the cursor is gone, so it cannot be replayed
+        ImageChange.objects.filter(id__lt=feed_cursor()).delete()
+
+        body = self._get(f"?since={since}").json()
+
+        self.assertTrue(body["reset"])
+        self.assertEqual(len(body["added"]), 3)
+
+    def test_negative_parameters_are_rejected(self):
+        self.assertEqual(self._get("?since=-1").status_code, 400)
+
+    def test_prune_changes_keeps_recent(self):
+        self._add("a.jpg")
+        self.assertEqual(prune_changes(retention_days=1), 0)
@@ -0,0 +1,51 @@
+from datetime import datetime, timezone
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from screensaver_app.image_index import media_usage, rebuild_index
+from screensaver_app.models import Image, ImageChange, MediaUsage
+
+from .helpers import TempMediaMixin
+
+
+class RebuildIndexTests(TempMediaMixin, TestCase):
+    def test_indexes_files_on_disk(self):
+        image = self.write_jpeg("images/20240102_030405_000000.jpg", (40, 30))
+        preview = self.write_jpeg("previews/20240102_030405_000000.jpg", (20, 15))
+        self.write_jpeg("images/no-preview.jpg")
+
+        self.assertEqual(rebuild_index(), (2, 0, 0))
+
+        row = Image.objects.get(filename="20240102_030405_000000.jpg")
+        self.assertEqual((row.width, row.height), (40, 30))
+        self.assertEqual((row.preview_width, row.preview_height), (20, 15))
+        self.assertEqual(row.size_bytes, image.stat().st_size)
+        self.assertEqual(row.created_at, datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc))
+        # Only images with a preview enter the feed
+        self.assertEqual(list(ImageChange.objects.values_list("filename", "action")),
+                         [(row.filename, ImageChange.ACTION_ADDED)])
+        usage = media_usage()
+        self.assertEqual(usage[MediaUsage.DIRECTORY_PREVIEWS], preview.stat().st_size)
+
+    def test_rebuild_updates_and_removes(self):
+        self.write_jpeg("images/a.jpg")
+        gone = self.write_jpeg("images/b.jpg")
+        rebuild_index()
+        gone.unlink()
+        self.write_jpeg("previews/a.jpg")
+
+        self.assertEqual(rebuild_index(), (0, 1, 1))
+
+        self.assertEqual(list(Image.objects.values_list("filename", flat=True)), ["a.jpg"])
+        self.assertGreater(Image.objects.get().preview_size_bytes, 0)
+
+    def test_command_if_empty_skips_populated_index(self):
+        self.write_jpeg("images/a.jpg")
+        call_command("rebuild_image_index", "--if-empty", stdout=StringIO())
+        self.write_jpeg("images/b.jpg")
+
+        call_command("rebuild_image_index", "--if-empty", stdout=StringIO())
+
+        self.assertEqual(Image.objects.count(), 1)
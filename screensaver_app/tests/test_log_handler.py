@@ -0,0 +1,69 @@
+import logging
+import threading
+import time
+
+from django.test import TransactionTestCase
+
+from screensaver_app.log_handler import BufferedDatabaseLogHandler
+from screensaver_app.models import AppLog
+
+_LOGGER = "screensaver_app.tests.log_handler"
+
+
+class BufferedDatabaseLogHandlerTests(TransactionTestCase):
+    def setUp(self):
+        self.logger = logging.getLogger(_LOGGER)
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        self.addCleanup(setattr, self.logger, "propagate", True)
+
+    def _handler(self, **kwargs):
+        handler = BufferedDatabaseLogHandler(**kwargs)
+        self.logger.addHandler(handler)
+        self.addCleanup(handler.close)
+        self.addCleanup(self.logger.removeHandler, handler)
+        return handler
+
+    def _rows(self):
+        return AppLog.objects.filter(logger_name=_LOGGER).count()
+
+    def _wait_for_rows(self, count, timeout):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self._rows() >= count:
+                return True
+            time.sleep(0.02)
+        return False
+
+    def test_partial_batch_waits_for_flush_interval(self):
+        self._handler(batch_size=5, flush_interval=0.6)
+        started = time.monotonic()
+        self.logger.info("one")
+
+        self.assertFalse(self._wait_for_rows(1, 0.3))
+        self.assertTrue(self._wait_for_rows(1, 2))
+        self.assertGreaterEqual(time.monotonic() - started, 0.5)
+
+    def test_full_batch_flushes_immediately(self):
+        self._handler(batch_size=5, flush_interval=3)
+        for n in range(5):
+            self.logger.info("record %d", n)
+
+        self.assertTrue(self._wait_for_rows(5, 1))
+
+    def test_emit_does_not_wait_for_write_lock(self):
+        handler = self._handler(batch_size=5, flush_interval=0.2, max_buffer=1)
+        with handler._write_lock:
+            done = threading.Event()
+
+            def log():
+                # The writer may hold one record; the others overflow the buffer
+                for n in range(3):
+                    self.logger.info("record %d", n)
+                done.set()
+
+            threading.Thread(target=log).start()
+            self.assertTrue(done.wait(1))
+            self.assertGreaterEqual(handler.dropped, 1)
+        handler.flush()
+        self.assertTrue(AppLog.objects.filter(message__startswith="Log buffer full").exists())
@@ -0,0 +1,102 @@
+import tempfile
+from pathlib import Path
+
+from django.test import SimpleTestCase, override_settings
+
+from screensaver_app.media import negotiate, parse_range
+
+
+class NegotiateTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        override = override_settings(MEDIA_ROOT=str(self.root), MEDIA_SENDFILE_MODE="")
+        override.enable()
+        self.addCleanup(override.disable)
+        (self.root / "images").mkdir()
+        (self.root / "images" / "x.jpg").write_bytes(b"jpeg")
+        (self.root / "webp" / "images").mkdir(parents=True)
+        (self.root / "webp" / "images" / "x.webp").write_bytes(b"webp")
+
+    def test_swaps_for_accepted_alternate(self):
+        self.assertEqual(negotiate("images/x.jpg", "image/webp,*/*"), "webp/images/x.webp")
+
+    def test_wildcard_alone_keeps_jpeg(self):
+        self.assertEqual(negotiate("images/x.jpg", "*/*"), "images/x.jpg")
+
+    def test_absolute_path_is_not_negotiated(self):
+        # alternate_path() would otherwise join it onto the filesystem root
+        self.assertEqual(negotiate("/images/x.jpg", "image/webp"), "/images/x.jpg")
+
+    def test_parent_reference_is_not_negotiated(self):
+        self.assertEqual(negotiate("../images/x.jpg", "image/webp"), "../images/x.jpg")
+
+    def test_absolute_path_is_not_found(self):
+        response = self.client.get("/media//images/x.jpg", HTTP_ACCEPT="image/webp")
+        self.assertEqual(response.status_code, 404)
+
+    def test_serves_negotiated_file(self):
+        response = self.client.get("/media/images/x.jpg", HTTP_ACCEPT="image/webp")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), b"webp")
+        self.assertIn("Accept", response["Vary"])
+
+
+class ServeMediaTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        override = override_settings(MEDIA_ROOT=tmp.name, MEDIA_SENDFILE_MODE="")
+        override.enable()
+        self.addCleanup(override.disable)
+        (Path(tmp.name) / "images").mkdir()
+        (Path(tmp.name) / "images" / "x.jpg").write_bytes(b"0123456789")
+
+    def test_full_response_is_immutable(self):
+        response = self.client.get("/media/images/x.jpg")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertEqual(response["Content-Length"], "10")
+
+    def test_matching_etag_is_not_modified(self):
+        etag = self.client.get("/media/images/x.jpg")["ETag"]
+        response = self.client.get("/media/images/x.jpg", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_range(self):
+        response = self.client.get("/media/images/x.jpg", HTTP_RANGE="bytes=2-5")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], "bytes 2-5/10")
+        self.assertEqual(b"".join(response.streaming_content), b"2345")
+
+    def test_stale_if_range_sends_whole_file(self):
+        response = self.client.get("/media/images/x.jpg", HTTP_RANGE="bytes=2-5",
+                                   HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_unsatisfiable_range(self):
+        response = self.client.get("/media/images/x.jpg", HTTP_RANGE="bytes=20-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], "bytes */10")
+
+    @override_settings(MEDIA_SENDFILE_MODE="x-accel-redirect")
+    def test_sendfile_leaves_body_to_proxy(self):
+        response = self.client.get("/media/images/x.jpg")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("X-Accel-Redirect", response)
+        self.assertEqual(response.content, b"")
+
+
+class ParseRangeTests(SimpleTestCase):
+    def test_ranges(self):
+        self.assertEqual(parse_range("bytes=0-9", 100), (0, 9))
+        self.assertEqual(parse_range("bytes=90-", 100), (90, 99))
+        self.assertEqual(parse_range("bytes=-10", 100), (90, 99))
+        self.assertEqual(parse_range("bytes=0-999", 100), (0, 99))
+        self.assertIsNone(parse_range("bytes=0-1,5-6", 100))
+        self.assertIsNone(parse_range("", 100))
+
+    def test_unsatisfiable(self):
+        with self.assertRaises(ValueError):
+            parse_range("bytes=100-", 100)
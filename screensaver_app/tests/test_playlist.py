@@ -0,0 +1,45 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+from django.test import TestCase
+
+from screensaver_app.models import Image
+from screensaver_app.playlist import round_robin
+
+_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _image(source: str, n: int) -> Image:
+    return Image.objects.create(
+        filename=f"{source}-{n}.jpg", source=source,
+        preview_size_bytes=1, created_at=_EPOCH + timedelta(minutes=n),
+    )
+
+
+class RoundRobinTests(TestCase):
+    def test_small_source_gets_an_equal_share(self):
+        _image("small", 0)
+        for n in range(5):
+            _image("large", n)
+
+        rows = round_robin({}, 8, random.Random(0))
+
+        self.assertEqual(len(rows), 8)
+        sources = [row[5] for row in rows]
+        self.assertEqual(sources, ["large", "small"] * 4)
+
+    def test_large_source_resumes_after_cursor(self):
+        for n in range(5):
+            _image("large", n)
+        _image("small", 0)
+        state = {}
+
+        first = round_robin(state, 4, random.Random(0))
+        second = round_robin(state, 4, random.Random(0))
+
+        large = [row[1] for row in first + second if row[5] == "large"]
+        self.assertEqual(large, [f"large-{n}.jpg" for n in (0, 1, 2, 3)])
+        self.assertEqual([row[5] for row in second], ["large", "small"] * 2)
+
+    def test_no_images(self):
+        self.assertEqual(round_robin({}, 8, random.Random(0)), [])
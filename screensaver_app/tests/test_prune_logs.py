@@ -0,0 +1,75 @@
+import gzip
+import json
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from screensaver_app import config_cache
+from screensaver_app.models import AppLog, LogRetentionConfig
+from screensaver_app.services import prune_logs
+
+_LOGGER = "screensaver_app.tests.prune_logs"
+
+
+class PruneLogsTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(config_cache, "_cache", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.base_dir = Path(tmp.name)
+        override = override_settings(BASE_DIR=self.base_dir)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def _configure(self, **fields):
+        with self.captureOnCommitCallbacks(execute=True):
+            LogRetentionConfig(pk=1, **fields).save()
+
+    def _log(self, level: str, age_days: float, message: str = "") -> None:
+        AppLog.objects.create(timestamp=timezone.now() - timedelta(days=age_days),
+                              level=level, logger_name=_LOGGER, message=message)
+
+    def _remaining(self) -> list[tuple[str, str]]:
+        return list(AppLog.objects.filter(logger_name=_LOGGER)
+                    .order_by("level", "message").values_list("level", "message"))
+
+    def test_deletes_per_level_in_chunks(self):
+        self._configure(debug_days=1, info_days=10, error_days=0)
+        for n in range(5):
+            self._log("DEBUG", 2, f"old {n}")
+        self._log("DEBUG", 0, "new")
+        self._log("INFO", 2, "kept")
+        self._log("ERROR", 1000, "forever")
+
+        result = prune_logs(chunk_size=2, pause=0)
+
+        self.assertEqual(result["DEBUG"], 5)
+        self.assertNotIn("ERROR", result)
+        self.assertEqual(self._remaining(),
+                         [("DEBUG", "new"), ("ERROR", "forever"), ("INFO", "kept")])
+
+    def test_dry_run_deletes_nothing(self):
+        self._configure(debug_days=1)
+        self._log("DEBUG", 2)
+
+        self.assertEqual(prune_logs(dry_run=True)["DEBUG"], 1)
+        self.assertEqual(len(self._remaining()), 1)
+
+    def test_archives_before_deleting(self):
+        self._configure(debug_days=1, archive_enabled=True)
+        self._log("DEBUG", 2, "first")
+        self._log("DEBUG", 3, "second")
+
+        prune_logs(chunk_size=1, pause=0)
+
+        self.assertEqual(self._remaining(), [])
+        (archive,) = (self.base_dir / "logs" / "archive").glob("applog-*.jsonl.gz")
+        with gzip.open(archive, "rt", encoding="utf-8") as fh:
+            rows = [json.loads(line) for line in fh]
+        self.assertEqual([row["message"] for row in rows], ["second", "first"])
@@ -0,0 +1,83 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from screensaver_app import config_cache
+from screensaver_app.image_index import (
+    media_usage, reconcile_usage, register_image, register_preview, unregister_image,
+)
+from screensaver_app.locks import file_lock
+from screensaver_app.models import CleanupConfig, Image, MediaUsage
+from screensaver_app.services import _cleanup_lock_path, cleanup_if_over_limit
+
+from .helpers import TempMediaMixin
+
+
+class MediaUsageTests(TempMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(config_cache, "_cache", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        reconcile_usage()
+
+    def _add(self, name: str) -> tuple[int, int]:
+        image = self.write_jpeg(f"images/{name}", (400, 300))
+        register_image(image, source="test", width=400, height=300)
+        preview = self.write_jpeg(f"previews/{name}", (40, 30))
+        register_preview(preview, width=40, height=30)
+        return image.stat().st_size, preview.stat().st_size
+
+    def test_registering_and_unregistering_adjusts_totals(self):
+        image_size, preview_size = self._add("a.jpg")
+        usage = media_usage()
+        self.assertEqual(usage[MediaUsage.DIRECTORY_IMAGES], image_size)
+        self.assertEqual(usage[MediaUsage.DIRECTORY_PREVIEWS], preview_size)
+
+        self.assertEqual(unregister_image("a.jpg"), image_size + preview_size)
+        self.assertEqual(sum(media_usage().values()), 0)
+
+    def test_reregistering_counts_only_the_difference(self):
+        image_size, _ = self._add("a.jpg")
+        register_image(self.media_root / "images" / "a.jpg", source="test", width=400, height=300)
+        self.assertEqual(media_usage()[MediaUsage.DIRECTORY_IMAGES], image_size)
+
+    def test_reconcile_corrects_drift(self):
+        self._add("a.jpg")
+        stray = self.write_jpeg("images/unindexed.jpg")
+        MediaUsage.objects.update(size_bytes=0)
+
+        totals = reconcile_usage()
+
+        expected = sum(p.stat().st_size for p in (self.media_root / "images").iterdir())
+        self.assertEqual(totals[MediaUsage.DIRECTORY_IMAGES], expected)
+        self.assertEqual(media_usage()[MediaUsage.DIRECTORY_IMAGES], expected)
+        self.assertTrue(stray.exists())
+
+    def _set_limit(self, mb: int) -> None:
+        with self.captureOnCommitCallbacks(execute=True):
+            CleanupConfig(pk=1, max_folder_size_mb=mb).save()
+
+    def test_cleanup_runs_when_over_limit(self):
+        self._add("a.jpg")
+        self._set_limit(0)
+
+        self.assertTrue(cleanup_if_over_limit())
+
+        self.assertFalse(Image.objects.exists())
+        self.assertEqual(list((self.media_root / "images").iterdir()), [])
+
+    def test_cleanup_within_limit_does_nothing(self):
+        self._add("a.jpg")
+        self._set_limit(500)
+        self.assertFalse(cleanup_if_over_limit())
+        self.assertTrue(Image.objects.exists())
+
+    def test_cleanup_skipped_while_another_process_holds_the_lock(self):
+        self._add("a.jpg")
+        self._set_limit(0)
+
+        with file_lock(_cleanup_lock_path()):
+            self.assertFalse(cleanup_if_over_limit())
+
+        self.assertTrue(Image.objects.exists())
@@ -7,4 +7,7 @@ from . import views
 urlpatterns = [
     path("", views.index, name="index"),
     path("api/previews", views.api_previews, name="api_previews"),
+    path("api/mosaic", views.api_mosaic, name="api_mosaic"),
+    path("api/playlist", views.api_playlist, name="api_playlist"),
+    path("api/impressions", views.api_impressions, name="api_impressions"),
 ]
@@ -1,17 +1,36 @@
 from __future__ import annotations
 
+import json
 import logging
-from pathlib import Path
+import re
+from datetime import datetime, timezone as dt_timezone
+from typing import Any
 
 from django.conf import settings
 from django.http import HttpRequest, HttpResponse, JsonResponse
 from django.shortcuts import render
+from django.utils import timezone
+from django.views.decorators.cache import cache_control, never_cache
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import condition, require_POST
 
-from .models import ScreensaverConfig
+from .image_index import feed_cursor, oldest_cursor
+from .impressions import get_aggregator
+from .models import Display, Image, ImageChange, ScreensaverConfig
+from .mosaic import index_version, load_index, mosaic_map
+from .playlist import STRATEGIES, next_slides
 
 logger = logging.getLogger(__name__)
 
-_IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif"}
+FEED_PAGE_SIZE = 500
+FEED_MAX_PAGE_SIZE = 2000
+
+# Beacon limits: impressions per request, and accepted display ids
+IMPRESSION_MAX_BATCH = 500
+DISPLAY_ID_RE = re.compile(r"^[A-Za-z0-9_.:-]{1,64}$")
+
+PLAYLIST_DEFAULT_COUNT = 20
+PLAYLIST_MAX_COUNT = 100
 
 
 def index(request: HttpRequest) -> HttpResponse:
@@ -26,21 +45,240 @@ def index(request: HttpRequest) -> HttpResponse:
         "slideshow_interval_seconds": config.slideshow_interval_seconds,
         "transition": config.transition,
         "transition_mode": config.transition_mode,
+        "playlist_strategy": config.playlist_strategy,
     })
 
 
+ENTRY_FIELDS = ("filename", "width", "height", "renditions")
+
+
+def _preview_entry(filename: str, width: int, height: int,
+                   renditions: list[int]) -> dict[str, object]:
+    # width/height/renditions let the client pick the smallest rendition
+    # (media/renditions/<w>/<filename>) that covers its screen.
+    return {
+        "filename": filename,
+        "preview_url": f"{settings.MEDIA_URL}previews/{filename}",
+        "width": width,
+        "height": height,
+        "renditions": renditions,
+    }
+
+
+def _feed_etag(request: HttpRequest) -> str:
+    # Every change to the preview list appends an ImageChange row, so the
+    # newest change id identifies the feed state for any given query string.
+    return f"previews-{feed_cursor()}"
+
+
+def _int_param(request: HttpRequest, name: str, default: int) -> int:
+    value = int(request.GET.get(name, default))
+    if value < 0:
+        raise ValueError(f"{name} must not be negative")
+    return value
+
+
+@cache_control(no_cache=True)
+@condition(etag_func=_feed_etag)
 def api_previews(request: HttpRequest) -> JsonResponse:
-    """Return a JSON list of all available preview files, sorted chronologically."""
-    previews_dir = Path(settings.MEDIA_ROOT) / "previews"
-    result: list[dict[str, str]] = []
-
-    if previews_dir.exists():
-        for f in sorted(previews_dir.iterdir()):
-            if f.is_file() and f.suffix.lower() in _IMAGE_EXTENSIONS:
-                result.append({
-                    "filename": f.name,
-                    "preview_url": f"{settings.MEDIA_URL}previews/{f.name}",
-                })
-
-    logger.debug("api_previews: returning %d preview(s)", len(result))
-    return JsonResponse(result, safe=False)
+    """Return the preview feed, served from the Image index table.
+
+    Without parameters the full list is returned as a plain JSON array,
+    sorted chronologically. With ``?since=<cursor>`` the response is an
+    object holding only the previews ``added`` and ``removed`` after that
+    cursor, the new ``cursor`` and a ``next`` URL while more pages remain.
+    ``since=0``, or a cursor older than the retained change log, returns a
+    paginated snapshot flagged with ``reset``. Unchanged feeds are answered
+    with 304 via the ETag.
+    """
+    if "since" not in request.GET:
+        rows = (
+            Image.objects
+            .filter(preview_size_bytes__gt=0)
+            .order_by("created_at", "filename")
+            .values_list(*ENTRY_FIELDS)
+        )
+        result = [_preview_entry(*row) for row in rows]
+        logger.debug("api_previews: returning %d preview(s)", len(result))
+        return JsonResponse(result, safe=False)
+
+    try:
+        since = _int_param(request, "since", 0)
+        limit = min(max(_int_param(request, "limit", FEED_PAGE_SIZE), 1), FEED_MAX_PAGE_SIZE)
+        after = _int_param(request, "after", 0)
+        head = _int_param(request, "cursor", 0) or feed_cursor()
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+
+    # A cursor from before the retained log (or from a rebuilt database)
+    # cannot be replayed; fall back to a snapshot.
+    if since and (since < oldest_cursor() - 1 or since > head):
+        logger.debug("api_previews: cursor %d is outside the change log, sending snapshot", since)
+        since = 0
+
+    if since == 0:
+        return _snapshot_page(head, after, limit)
+    return _delta_page(since, limit)
+
+
+def _snapshot_page(head: int, after: int, limit: int) -> JsonResponse:
+    rows = list(
+        Image.objects
+        .filter(preview_size_bytes__gt=0, id__gt=after)
+        .order_by("id")
+        .values_list("id", *ENTRY_FIELDS)[:limit]
+    )
+    next_url = None
+    if len(rows) == limit:
+        next_url = f"/api/previews?since=0&cursor={head}&after={rows[-1][0]}&limit={limit}"
+
+    logger.debug("api_previews: snapshot page after id=%d with %d preview(s)", after, len(rows))
+    return JsonResponse({
+        "cursor": head,
+        "reset": True,
+        "added": [_preview_entry(*row[1:]) for row in rows],
+        "removed": [],
+        "next": next_url,
+    })
+
+
+def feed_delta(since: int, limit: int) -> dict[str, Any]:
+    """Return the previews added and removed in up to *limit* changes after *since*.
+
+    Shared by the paginated feed and the event stream (screensaver_app.events).
+    """
+    changes = list(
+        ImageChange.objects
+        .filter(id__gt=since)
+        .order_by("id")
+        .values_list("id", "filename", "action")[:limit]
+    )
+
+    # Collapse the log so each filename appears once, in its final state
+    added: dict[str, None] = {}
+    removed: dict[str, None] = {}
+    for _, filename, action in changes:
+        if action == ImageChange.ACTION_ADDED:
+            removed.pop(filename, None)
+            added[filename] = None
+        else:
+            added.pop(filename, None)
+            removed[filename] = None
+
+    # An "added" image may since have lost its preview or been deleted
+    # without the removal being in this page yet; skip it until it is.
+    entries = {
+        row[0]: row
+        for row in Image.objects
+        .filter(filename__in=list(added), preview_size_bytes__gt=0)
+        .values_list(*ENTRY_FIELDS)
+    }
+    return {
+        "cursor": changes[-1][0] if changes else since,
+        "reset": False,
+        "added": [_preview_entry(*entries[name]) for name in added if name in entries],
+        "removed": list(removed),
+        "complete": len(changes) < limit,
+    }
+
+
+def _delta_page(since: int, limit: int) -> JsonResponse:
+    delta = feed_delta(since, limit)
+    cursor = delta.pop("cursor")
+    complete = delta.pop("complete")
+    next_url = None if complete else f"/api/previews?since={cursor}&limit={limit}"
+
+    logger.debug("api_previews: delta since %d → %d (+%d / -%d)",
+                 since, cursor, len(delta["added"]), len(delta["removed"]))
+    return JsonResponse({"cursor": cursor, **delta, "next": next_url})
+
+
+@cache_control(no_cache=True)
+@condition(etag_func=lambda request: f"mosaic-{index_version()}")
+def api_mosaic(request: HttpRequest) -> JsonResponse:
+    """Return the preview sprite sheets and where each preview sits in them.
+
+    Serves the sheets last written by the scheduler and never renders; the
+    map's ``cursor`` may lag the feed, and previews not on a sheet yet are
+    shown individually. Unchanged sheets are answered with 304 via the ETag.
+    """
+    result = mosaic_map(load_index())
+    logger.debug("api_mosaic: %d sheet(s)", len(result["sheets"]))
+    return JsonResponse(result)
+
+
+@csrf_exempt
+@require_POST
+def api_impressions(request: HttpRequest) -> HttpResponse:
+    """Accept a batch of slide impressions from a display.
+
+    Body: ``{"display": "<id>", "impressions": [{"filename": "...", "ts": <ms>}]}``
+    with ``ts`` in milliseconds since the epoch. The counts are aggregated in
+    memory and written in bulk (see screensaver_app.impressions); the
+    response is an empty 204.
+    """
+    try:
+        body = json.loads(request.body)
+        display_id = str(body["display"])
+        entries = body["impressions"]
+        if not DISPLAY_ID_RE.match(display_id) or not isinstance(entries, list):
+            raise ValueError("invalid display id or impressions")
+        if len(entries) > IMPRESSION_MAX_BATCH:
+            raise ValueError(f"at most {IMPRESSION_MAX_BATCH} impressions per request")
+        now = timezone.now()
+        impressions = []
+        for entry in entries:
+            filename = str(entry["filename"])[:100]
+            shown_at = datetime.fromtimestamp(float(entry["ts"]) / 1000, tz=dt_timezone.utc)
+            # Clamp clocks that run ahead so last_displayed_at never lies in the future
+            impressions.append((filename, min(shown_at, now)))
+    except (ValueError, KeyError, TypeError, OverflowError) as exc:
+        logger.warning("api_impressions: rejected beacon: %s", exc)
+        return JsonResponse({"error": str(exc)}, status=400)
+
+    get_aggregator().record(display_id, impressions)
+    logger.debug("api_impressions: %d impression(s) from display %s",
+                 len(impressions), display_id)
+    return HttpResponse(status=204)
+
+
+@never_cache
+def api_playlist(request: HttpRequest) -> JsonResponse:
+    """Return the next slides for a display.
+
+    ``?display=<id>`` identifies the display whose position is advanced,
+    ``count`` (default 20, at most 100) the number of slides and
+    ``strategy`` overrides ScreensaverConfig.playlist_strategy. Without a
+    display id every call starts from a fresh position. See
+    screensaver_app.playlist for the strategies.
+    """
+    display_id = request.GET.get("display", "")
+    strategy = request.GET.get("strategy") or ScreensaverConfig.get().playlist_strategy
+    try:
+        count = min(max(_int_param(request, "count", PLAYLIST_DEFAULT_COUNT), 1),
+                    PLAYLIST_MAX_COUNT)
+        if display_id and not DISPLAY_ID_RE.match(display_id):
+            raise ValueError("invalid display id")
+        if strategy not in STRATEGIES:
+            raise ValueError(f"unknown strategy {strategy!r}, expected one of "
+                             f"{', '.join(STRATEGIES)}")
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+
+    states: dict[str, dict[str, object]] = {}
+    if display_id:
+        display, _ = Display.objects.get_or_create(display_id=display_id)
+        states = display.playlist_state
+    state = states.setdefault(strategy, {})
+    rows = next_slides(strategy, state, count)
+    if display_id:
+        # Only the state column is written; impression flushes update the counters
+        Display.objects.filter(pk=display.pk).update(playlist_state=states)
+
+    logger.debug("api_playlist: %d slide(s) for display %s (%s)",
+                 len(rows), display_id or "-", strategy)
+    return JsonResponse({
+        "display": display_id or None,
+        "strategy": strategy,
+        "slides": [_preview_entry(*row[1:5]) for row in rows],
+    })
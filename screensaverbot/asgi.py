@@ -1,9 +1,21 @@
 from __future__ import annotations
 
 import os
+from typing import Any
 
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "screensaverbot.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported after get_asgi_application() has loaded the app registry
+from screensaver_app.events import events_app  # noqa: E402
+
+
+async def application(scope: dict[str, Any], receive: Any, send: Any) -> None:
+    # /api/events is served outside Django; see screensaver_app.events
+    if scope["type"] == "http" and scope["path"] == "/api/events":
+        await events_app(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
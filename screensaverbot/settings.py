@@ -56,10 +56,21 @@ WSGI_APPLICATION = "screensaverbot.wsgi.application"
 
 # ── Database ──────────────────────────────────────────────────────────────────
 # SQLite stored in ./data/ so it can be bind-mounted separately in Docker.
+# web, ingest_worker and scheduler write to the same file; every connection
+# is set up by screensaver_app.db (WAL journal, synchronous=NORMAL).
+SQLITE_JOURNAL_MODE = os.environ.get("SQLITE_JOURNAL_MODE", "wal")
+SQLITE_SYNCHRONOUS = os.environ.get("SQLITE_SYNCHRONOUS", "normal")
+# How long (ms) a writer waits for another process's lock before "database is locked"
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "20000"))
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "data" / "db.sqlite3",
+        "OPTIONS": {"timeout": SQLITE_BUSY_TIMEOUT_MS / 1000},
+        # Keep connections (and their PRAGMA setup) across requests
+        "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", "300")),
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 
@@ -86,6 +97,96 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# run_cleanup works from running per-directory byte totals; they are recounted
+# from disk at most this often (seconds) to correct any drift.
+MEDIA_USAGE_RECONCILE_SECONDS = int(os.environ.get("MEDIA_USAGE_RECONCILE_SECONDS", "3600"))
+
+# Media filenames are unique timestamps and never rewritten, so browsers may
+# cache them for this long without revalidating.
+MEDIA_CACHE_MAX_AGE = int(os.environ.get("MEDIA_CACHE_MAX_AGE", "31536000"))
+
+# Hand file bodies to a front proxy instead of streaming them from Python:
+#   ""                  Django sends the bytes itself (no proxy)
+#   "x-accel-redirect"  NGINX; MEDIA_ACCEL_PREFIX must be an `internal`
+#                       location aliased to MEDIA_ROOT
+#   "x-sendfile"        Apache mod_xsendfile / lighttpd
+MEDIA_SENDFILE_MODE = os.environ.get("MEDIA_SENDFILE_MODE", "").lower()
+MEDIA_ACCEL_PREFIX = os.environ.get("MEDIA_ACCEL_PREFIX", "/protected-media/")
+
+# ── Ingestion ─────────────────────────────────────────────────────────────────
+# Number of queued Telegram photos the ingest worker processes concurrently.
+INGEST_WORKER_CONCURRENCY = int(os.environ.get("INGEST_WORKER_CONCURRENCY", "2"))
+
+# Photos of one Telegram album downloaded in parallel by each ingest job slot,
+# and how long a resolved file_path is reused (Telegram keeps it for an hour).
+TELEGRAM_ALBUM_CONCURRENCY = int(os.environ.get("TELEGRAM_ALBUM_CONCURRENCY", "4"))
+TELEGRAM_FILE_PATH_TTL_SECONDS = int(os.environ.get("TELEGRAM_FILE_PATH_TTL_SECONDS", "3000"))
+
+# Telegram Bot API base URL (point it at ``manage.py mock_telegram`` to test
+# offline) and how long run_telegram_poller's getUpdates calls wait for updates.
+TELEGRAM_API_URL = os.environ.get("TELEGRAM_API_URL", "https://api.telegram.org").rstrip("/")
+TELEGRAM_POLL_TIMEOUT_SECONDS = int(os.environ.get("TELEGRAM_POLL_TIMEOUT_SECONDS", "50"))
+
+# Redelivered updates and reposted photos are skipped for this long (Telegram
+# retries undelivered updates for up to 24 h); at most this many keys are kept.
+TELEGRAM_DEDUP_TTL_SECONDS = int(os.environ.get("TELEGRAM_DEDUP_TTL_SECONDS", "86400"))
+TELEGRAM_DEDUP_MAX_ENTRIES = int(os.environ.get("TELEGRAM_DEDUP_MAX_ENTRIES", "100000"))
+
+# Number of HTTP sources run_http_fetcher downloads in parallel.
+HTTP_FETCHER_CONCURRENCY = int(os.environ.get("HTTP_FETCHER_CONCURRENCY", "4"))
+
+# Exact duplicates (same bytes) are always skipped. Perceptual dedup also skips
+# recompressed/resized copies whose 64-bit dHash differs by at most
+# INGEST_PERCEPTUAL_MAX_DISTANCE bits.
+INGEST_PERCEPTUAL_DEDUP = os.environ.get("INGEST_PERCEPTUAL_DEDUP", "False") == "True"
+INGEST_PERCEPTUAL_MAX_DISTANCE = int(os.environ.get("INGEST_PERCEPTUAL_MAX_DISTANCE", "4"))
+
+# Downloads are streamed: bodies above DOWNLOAD_MAX_BYTES or not starting with
+# an image signature are abandoned early, and bodies above
+# DOWNLOAD_SPOOL_MEMORY_BYTES are spooled to a temporary file instead of memory.
+DOWNLOAD_MAX_BYTES = int(os.environ.get("DOWNLOAD_MAX_BYTES", str(50 * 1024 * 1024)))
+DOWNLOAD_SPOOL_MEMORY_BYTES = int(os.environ.get("DOWNLOAD_SPOOL_MEMORY_BYTES",
+                                                 str(2 * 1024 * 1024)))
+
+# Pillow decode/resize/encode runs in a pool of IMAGE_WORKER_PROCESSES worker
+# processes (0 = inline), each replaced after IMAGE_WORKER_MAX_TASKS jobs to
+# cap memory growth. Images above IMAGE_MAX_PIXELS are rejected before decoding.
+IMAGE_WORKER_PROCESSES = int(os.environ.get("IMAGE_WORKER_PROCESSES", "2"))
+IMAGE_WORKER_MAX_TASKS = int(os.environ.get("IMAGE_WORKER_MAX_TASKS", "50"))
+IMAGE_MAX_PIXELS = int(os.environ.get("IMAGE_MAX_PIXELS", "100000000"))
+
+# Widths of the downscaled copies generated at ingest in media/renditions/<w>/.
+# The slideshow loads the smallest one covering its viewport × devicePixelRatio.
+IMAGE_RENDITION_WIDTHS: list[int] = sorted(
+    int(w) for w in os.environ.get("IMAGE_RENDITION_WIDTHS", "1280,1920,3840").split(",")
+    if w.strip()
+)
+
+# Opt-in extra encodings (webp, avif) written beside every preview and
+# rendition under media/<format>/ and served to browsers that accept them.
+# Each format adds one encode per output at ingest, so none are on by
+# default. Formats this Pillow build lacks are skipped.
+IMAGE_ALTERNATE_FORMATS: list[str] = [
+    f.strip().lower() for f in os.environ.get("IMAGE_ALTERNATE_FORMATS", "").split(",")
+    if f.strip()
+]
+
+# ── Displays ──────────────────────────────────────────────────────────────────
+# Impression beacons are counted in memory and written at most this often (s).
+IMPRESSION_FLUSH_SECONDS = float(os.environ.get("IMPRESSION_FLUSH_SECONDS", "10"))
+
+# /api/events (ASGI only): how often each worker checks for feed and config
+# changes, and how long an idle stream waits before a keepalive comment (s).
+# The check runs off the thread Django uses for sync views, which under ASGI
+# serves them one at a time per web worker process.
+EVENTS_POLL_SECONDS = float(os.environ.get("EVENTS_POLL_SECONDS", "1"))
+EVENTS_KEEPALIVE_SECONDS = float(os.environ.get("EVENTS_KEEPALIVE_SECONDS", "15"))
+
+# ── Config cache ──────────────────────────────────────────────────────────────
+# Singleton configs (screensaver, cleanup, log retention, Telegram) are cached
+# per process; changes saved elsewhere are picked up within this many seconds.
+CONFIG_CACHE_CHECK_SECONDS = float(os.environ.get("CONFIG_CACHE_CHECK_SECONDS", "1"))
+
 # ── Misc ──────────────────────────────────────────────────────────────────────
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
@@ -113,10 +214,15 @@ LOGGING = {
             "class": "logging.StreamHandler",
             "formatter": "standard",
         },
+        # Records are queued in memory and bulk-inserted by a background
+        # thread; use DatabaseLogHandler instead for one INSERT per record.
         "database": {
-            "class": "screensaver_app.log_handler.DatabaseLogHandler",
+            "class": "screensaver_app.log_handler.BufferedDatabaseLogHandler",
             "formatter": "message_only",
             "level": "DEBUG",
+            "batch_size": 200,
+            "flush_interval": 2.0,
+            "max_buffer": 10_000,
         },
     },
     "root": {